@@ -1,34 +1,47 @@
 import os
+import sys
 import pandas as pd
 import numpy as np
-import seaborn as sns
-import matplotlib.pyplot as plt
 from sklearn.decomposition import PCA
 from sklearn.preprocessing import StandardScaler
 from sklearn.cluster import KMeans
-from sklearn.metrics import silhouette_score
+
+sys.path.append('../scripts')
+from storage import read_dataset
+from profiling import load_profile, compute_profile
+from correlation_engine import correlation_matrix
+from incremental_models import load_or_fit_models, transform
+from cluster_evaluation import evaluate_k, score_clustering, choose_k, elbow_k
+from plot_rendering import figure, pairplot_figure, draw_heatmap, draw_scatter, draw_bar, draw_line, render_figures
 
 results_dir = "./results"
 os.makedirs(results_dir, exist_ok=True)  
 
+# Figures are collected here and rendered headless, in parallel, at the end
+figures = []
+
 # Multivariate Analysis Description
 print("Multivariate Analysis")
 
 # Load the dataset
 file_path = "../data/dataset_05.csv" 
-df = pd.read_csv(file_path)
+df = read_dataset(file_path)
 
 # Data Cleaning and Preprocessing
 # Remove columns that are not relevant for multivariate analysis
 df_clean = df.select_dtypes(include=[np.number]).dropna()  # Only numeric columns, drop missing values
 
-# Calculate Range, Variance
+# Range, Variance, etc. come from the dataset's precomputed profile unless rows were dropped above
 print("Statistical Insights:")
-range_df = df_clean.max() - df_clean.min()
-variance_df = df_clean.var()
-mean_df = df_clean.mean()
-std_dev_df = df_clean.std()
-median_df = df_clean.median()
+if len(df_clean) == len(df):
+    profile = load_profile(file_path, columns=df_clean.columns).reindex(df_clean.columns)
+else:
+    profile = compute_profile(df_clean)
+range_df = profile['range']
+variance_df = profile['var']
+mean_df = profile['mean']
+std_dev_df = profile['std']
+median_df = profile['median']
 
 stats_df = pd.DataFrame({
     "Range": range_df,
@@ -45,28 +58,32 @@ stats_df.to_csv(stats_csv_path, index_label='Feature')
 print(f"Range, variance")
 
 # Correlation Analysis
-correlation_matrix = df_clean.corr()
-plt.figure(figsize=(12, 8))
-sns.heatmap(correlation_matrix, annot=True, cmap="coolwarm", fmt=".2f")
-plt.title("Correlation Heatmap")
-plt.savefig(os.path.join(results_dir, "correlation_heatmap.png"))
-plt.show()
+# Pairwise-complete, so rows with a missing value elsewhere still count for the columns they have
+correlations = correlation_matrix(df, columns=df_clean.columns)
+figures.append(figure(os.path.join(results_dir, "correlation_heatmap.png"), draw_heatmap, correlations,
+                      "Correlation Heatmap", figsize=(12, 8), tight=False))
 
 # Pair Plot for Multivariate Analysis --- MULTIVARIATE ANALYSIS
 pairplot_path = os.path.join(results_dir, "pairplot.png")
-sns.pairplot(df_clean, diag_kind="kde")  # Removed corner=True for full pairplot
-plt.savefig(pairplot_path)
-print(f"Pair plot saved to {pairplot_path}")
-plt.show()
+figures.append(pairplot_figure(pairplot_path, df_clean))  # Full grid with KDEs on the diagonal
 
 # Principal Component Analysis (PCA)
-# Standardize the data
-scaler = StandardScaler()
-scaled_data = scaler.fit_transform(df_clean)
+# Scalable mode: chunked IncrementalPCA and warm-started MiniBatchKMeans, persisted between runs
+incremental = '--incremental' in sys.argv
+if incremental:
+    # Rows are matched to the saved models by country, DataType and Year, so a new vintage is recognized
+    keyed = df_clean.join(df[['country', 'DataType']])
+    models = load_or_fit_models(keyed, df_clean.columns, refit='--refit' in sys.argv, keys=['country', 'DataType', 'Year'])
+    scaled_data, pca_result, incremental_labels = transform(models, df_clean)
+    pca = models['pca']
+else:
+    # Standardize the data
+    scaler = StandardScaler()
+    scaled_data = scaler.fit_transform(df_clean)
 
-# Apply PCA
-pca = PCA(n_components=3)  # Select 3 components for visualization
-pca_result = pca.fit_transform(scaled_data)
+    # Apply PCA
+    pca = PCA(n_components=3)  # Select 3 components for visualization
+    pca_result = pca.fit_transform(scaled_data)
 
 # PCA Variance Explained
 print("Explained Variance Ratio by Component:", pca.explained_variance_ratio_)
@@ -79,52 +96,50 @@ if 'country' in df.columns:
 else:
     pca_df["Country"] = ["Unknown"] * len(pca_df)  # If country column is missing, label as Unknown
 
-plt.figure(figsize=(10, 6))
-sns.scatterplot(data=pca_df, x="PC1", y="PC2", hue="Country", palette="tab10")
-plt.title("PCA Scatter Plot (First 2 Components)")
-plt.savefig(os.path.join(results_dir, "pca_scatter.png"))
-plt.show()
+figures.append(figure(os.path.join(results_dir, "pca_scatter.png"), draw_scatter, pca_df["PC1"], pca_df["PC2"],
+                      "PCA Scatter Plot (First 2 Components)", hue=pca_df["Country"], palette="tab10",
+                      xlabel="PC1", ylabel="PC2", figsize=(10, 6), tight=False))
 
 # PCA Explained Variance Visualization
-plt.figure(figsize=(8, 5))
-plt.bar(range(1, 4), pca.explained_variance_ratio_, alpha=0.7)
-plt.xlabel("Principal Components")
-plt.ylabel("Explained Variance Ratio")
-plt.title("PCA Explained Variance")
-plt.savefig(os.path.join(results_dir, "pca_explained_variance.png"))
-plt.show()
+figures.append(figure(os.path.join(results_dir, "pca_explained_variance.png"), draw_bar, range(1, 4),
+                      pca.explained_variance_ratio_, "PCA Explained Variance", "Principal Components",
+                      "Explained Variance Ratio", figsize=(8, 5), tight=False))
 
 # K-Means Clustering
-# Find optimal clusters using the Elbow Method
-inertia = []
-for k in range(1, 11):
-    kmeans = KMeans(n_clusters=k, random_state=42)
-    kmeans.fit(scaled_data)
-    inertia.append(kmeans.inertia_)
-
-plt.figure(figsize=(8, 5))
-plt.plot(range(1, 11), inertia, marker='o', linestyle='--')
-plt.xlabel("Number of Clusters")
-plt.ylabel("Inertia")
-plt.title("Elbow Method for Optimal Clusters")
-plt.savefig(os.path.join(results_dir, "elbow_method.png"))
-plt.show()
-
-# Apply K-Means with optimal clusters (choose based on elbow method)
-optimal_clusters = 4  # Replace with the number of clusters from the elbow method
-kmeans = KMeans(n_clusters=optimal_clusters, random_state=42)
-df_clean["Cluster"] = kmeans.fit_predict(scaled_data)
-
-# Silhouette Score for clustering evaluation
-sil_score = silhouette_score(scaled_data, kmeans.labels_)
-print(f"Silhouette Score for optimal clustering: {sil_score}")
+# Evaluate k = 1..10 (elbow inertia plus sampled silhouette with confidence bounds), in parallel
+if incremental:
+    # Models are already fitted; centroid-based silhouette keeps the scoring O(n * k)
+    k_results = pd.DataFrame([score_clustering(scaled_data, incremental_labels[k], kmeans.cluster_centers_,
+                                               models['inertia'][k], method='simplified')
+                              for k, kmeans in models['kmeans'].items()])
+else:
+    k_results = evaluate_k(scaled_data, range(1, 11))
+inertia = k_results['inertia'].tolist()
+k_results.to_csv(os.path.join(results_dir, "k_selection.csv"), index=False)
+
+figures.append(figure(os.path.join(results_dir, "elbow_method.png"), draw_line, k_results['k'], inertia,
+                      "Elbow Method for Optimal Clusters", "Number of Clusters", "Inertia", figsize=(8, 5), tight=False))
+
+# Apply K-Means with the number of clusters picked from the elbow and the silhouette
+optimal_clusters = choose_k(k_results)
+print(f"Number of clusters chosen: {optimal_clusters} (elbow at k={elbow_k(k_results)})")
+if incremental:
+    df_clean["Cluster"] = incremental_labels[optimal_clusters]
+else:
+    kmeans = KMeans(n_clusters=optimal_clusters, random_state=42)
+    df_clean["Cluster"] = kmeans.fit_predict(scaled_data)
+
+# Silhouette Score for clustering evaluation (estimate and 95% bounds)
+chosen = k_results.set_index('k').loc[optimal_clusters]
+print(f"Silhouette Score for optimal clustering: {chosen['silhouette']} "
+      f"[{chosen['silhouette_lower']:.4f}, {chosen['silhouette_upper']:.4f}]")
 
 # Clustering Visualization (2D Projection using PCA)
-plt.figure(figsize=(10, 6))
-sns.scatterplot(x=pca_df["PC1"], y=pca_df["PC2"], hue=df_clean["Cluster"], palette="Set2")
-plt.title("Clusters in PCA Space")
-plt.savefig(os.path.join(results_dir, "clusters_pca.png"))
-plt.show()
+figures.append(figure(os.path.join(results_dir, "clusters_pca.png"), draw_scatter, pca_df["PC1"], pca_df["PC2"],
+                      "Clusters in PCA Space", hue=df_clean["Cluster"].reset_index(drop=True), palette="Set2",
+                      xlabel="PC1", ylabel="PC2", figsize=(10, 6), tight=False))
+render_figures(figures)
+print(f"Pair plot saved to {pairplot_path}")
 
 # Save processed data with clusters
 output_path = os.path.join(results_dir, "processed_with_clusters.csv")
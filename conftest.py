@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Analysis modules import their shared helpers from scripts/, as the scripts do with '../scripts'
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
@@ -1,5 +1,7 @@
 import pandas as pd
 
+from helpers import aliases
+
 countries = ["Albania", "Croatia", "Egypt", "Germany", "United States", "United Arab Emirates", "Mexico", "Argentina", "China", "India"]
 years = [1960, 1970, 1980, 1990, 2000, 2010, 2020]
 indicators = ["SP.POP.TOTL", "SP.URB.TOTL"]
@@ -9,8 +11,10 @@ def filter_first_csv(file_path):
     filtered_df = df[(df['country'].isin(countries)) & (df['Year'].isin(years))].copy() 
     return filtered_df
 
-def filter_second_csv(file_path):
+def filter_second_csv(file_path, dataset_countries):
     df = pd.read_csv(file_path, skiprows=4)
+    # World Bank names (e.g. "Egypt, Arab Rep.") harmonized to the dataset's names with the cached alias table
+    df['Country Name'] = df['Country Name'].replace(aliases(df['Country Name'], dataset_countries, 'worldbank_country_aliases'))
     filtered_df = df[(df['Country Name'].isin(countries)) & (df['Indicator Code'].isin(indicators))].copy() 
     
     year_columns = ['Country Name', 'Indicator Code'] + [str(year) for year in years]
@@ -41,7 +45,8 @@ def difference_percentage(num1, num2):
 
 def create_combined_csv(file_first_csv, file_second_csv, output_file):
     first_csv_data = filter_first_csv(file_first_csv)
-    second_csv_data = filter_second_csv(file_second_csv)
+    dataset_countries = pd.read_csv(file_first_csv, usecols=['country'])['country'].unique()
+    second_csv_data = filter_second_csv(file_second_csv, dataset_countries)
     
     merged_df = pd.merge(
         first_csv_data,
@@ -1,5 +1,30 @@
+import re
+import sys
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
 import pandas as pd
-from fuzzywuzzy import process
+from rapidfuzz import fuzz, process
+
+sys.path.append('../scripts')
+from stage_cache import run_stage
+
+# Names scoring below this against every dataset country are treated as missing
+MATCH_THRESHOLD = 85
+
+# Character n-gram length of the blocking index
+NGRAM = 3
+
+# Candidates kept per name (those sharing the most n-grams); only these are scored
+MAX_CANDIDATES = 20
+
+# Curated name -> dataset country pairs for names fuzzy scoring gets wrong (e.g. "Congo, Dem. Rep.")
+OVERRIDES_FILE = 'country_overrides.csv'
+
+# Words that do not tell countries apart, and abbreviations expanded before tokens are compared
+GENERIC_TOKENS = {'the', 'of', 'and', 'rep', 'republic', 'island', 'islands'}
+ABBREVIATIONS = {'st': 'saint', 'dr': 'democratic', 'dem': 'democratic'}
 
 
 def count_unique_countries(file_path):
@@ -10,19 +35,179 @@ def count_unique_countries(file_path):
     return unique_countries
 
 
+def normalize_name(name):
+    """Matching key of a country name: ASCII, lowercase, '&' as 'and', punctuation dropped, single spaces."""
+    name = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode()
+    name = name.lower().replace('&', ' and ')
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', name).split())
+
+
+def name_grams(key, n=NGRAM):
+    """Padded character n-grams of every token of a key, plus the tokens themselves."""
+    grams = set()
+    for token in key.split():
+        padded = f" {token} "
+        grams.add(token)
+        grams.update(padded[i:i + n] for i in range(max(1, len(padded) - n + 1)))
+    return grams
+
+
+def build_gram_index(keys, n=NGRAM):
+    """Inverted index from every n-gram and token to the positions of the keys containing it."""
+    index = defaultdict(list)
+    for position, key in enumerate(keys):
+        for gram in name_grams(key, n):
+            index[gram].append(position)
+    return {gram: np.array(positions) for gram, positions in index.items()}
+
+
+def candidate_block(key, index, n_choices, max_candidates=MAX_CANDIDATES):
+    """Positions of the choices sharing the most n-grams with `key`, best first."""
+    postings = [index[gram] for gram in name_grams(key) if gram in index]
+    if not postings:
+        return np.array([], dtype=int)
+    shared = np.bincount(np.concatenate(postings), minlength=n_choices)
+    candidates = np.flatnonzero(shared)
+    return candidates[np.argsort(-shared[candidates], kind='stable')[:max_candidates]]
+
+
+def significant_tokens(key):
+    """Tokens of a key that identify a country, abbreviations expanded and generic words dropped."""
+    return [token for token in (ABBREVIATIONS.get(token, token) for token in key.split()) if token not in GENERIC_TOKENS]
+
+
+def _token_matches(left, right):
+    """Boolean matrix of which tokens of `left` match which of `right`: equal, one a prefix of the
+    other ("slovak", "slovakia"), or a close spelling variant, all pairs at once."""
+    if not len(left) or not len(right):
+        return np.zeros((len(left), len(right)), dtype=bool)
+    a, b = np.array(left)[:, None], np.array(right)[None, :]
+    prefix = (np.minimum(np.char.str_len(a), np.char.str_len(b)) >= 4) & (np.char.startswith(a, b) | np.char.startswith(b, a))
+    return (a == b) | prefix | (process.cdist(left, right, scorer=fuzz.ratio, workers=-1) >= MATCH_THRESHOLD)
+
+
+def _token_incidence(keys):
+    """Vocabulary of the significant tokens of `keys` and the keys x vocabulary incidence matrix."""
+    tokens = [significant_tokens(key) for key in keys]
+    vocabulary = sorted({token for key_tokens in tokens for token in key_tokens})
+    positions = {token: i for i, token in enumerate(vocabulary)}
+    incidence = np.zeros((len(keys), len(vocabulary)), dtype=np.int64)
+    for row, key_tokens in enumerate(tokens):
+        incidence[row, [positions[token] for token in key_tokens]] = 1
+    return vocabulary, incidence
+
+
+def token_coverage(keys, choice_keys):
+    """Matrix of whether every significant token of each key has a counterpart in each choice key.
+
+    WRatio alone rewards a shared generic word or a name contained in a longer one, so
+    "slovak republic" scores high against "central african republic" and "congo dem rep"
+    against "congo"; both fail this check. Returns (keys x choices, choices x keys): the
+    second matrix is the check the other way round.
+    """
+    key_vocabulary, key_incidence = _token_incidence(keys)
+    choice_vocabulary, choice_incidence = _token_incidence(choice_keys)
+    matches = _token_matches(key_vocabulary, choice_vocabulary).astype(np.int64)
+    # A token is covered by a key when it matches any of that key's tokens
+    key_tokens_covered = matches @ choice_incidence.T > 0
+    choice_tokens_covered = matches.T @ key_incidence.T > 0
+    return key_incidence @ ~key_tokens_covered == 0, choice_incidence @ ~choice_tokens_covered == 0
+
+
+def load_overrides(file_path=OVERRIDES_FILE):
+    """Curated overrides keyed by normalized name."""
+    overrides = pd.read_csv(file_path)
+    return dict(zip(overrides['name'].map(normalize_name), overrides['country']))
+
+
+def match_countries(names, choices, threshold=MATCH_THRESHOLD, overrides_file=OVERRIDES_FILE):
+    """Match table of `names` against the `choices` country names, in one call.
+
+    Keys are normalized once, and each name is restricted to the block of choices sharing the
+    most n-grams with it. All names are scored (rapidfuzz WRatio) against the union of their
+    blocks in one cdist call, and the token check runs on matrices of all names and candidates.
+    A name matches when its best candidate reaches `threshold` and passes token_coverage;
+    candidates failing the token check rank below those passing it, and among those passing,
+    candidates agreeing in both directions rank first. An exact key match always wins, and the
+    curated overrides win over everything. Returns one row per name with the best match, its
+    score, the runner-up and its score, and whether the name matched.
+    """
+    names, choices = list(pd.unique(pd.Series(names).dropna())), list(pd.unique(pd.Series(choices).dropna()))
+    columns = ['name', 'key', 'match', 'score', 'runner_up', 'runner_up_score', 'matched']
+    if not names:
+        return pd.DataFrame(columns=columns)
+    keys = [normalize_name(name) for name in names]
+    choice_keys = [normalize_name(choice) for choice in choices]
+    exact = {key: position for position, key in reversed(list(enumerate(choice_keys)))}
+    index = build_gram_index(choice_keys)
+    overrides = {key: exact[normalize_name(country)] for key, country in load_overrides(overrides_file).items()
+                 if normalize_name(country) in exact}
+    targets = np.array([overrides.get(key, exact.get(key, -1)) for key in keys])
+
+    # Rank of every candidate within its name's block; the exact or override target goes first when outside it
+    blocks = [candidate_block(key, index, len(choices)) for key in keys]
+    candidates = np.unique(np.concatenate([np.concatenate(blocks), targets[targets >= 0]])).astype(int)
+    block_rank = np.full((len(keys), len(candidates)), len(choices), dtype=np.int64)
+    for row, block in enumerate(blocks):
+        block_rank[row, np.searchsorted(candidates, block)] = np.arange(len(block))
+    rows, target_rows = np.arange(len(keys)), np.flatnonzero(targets >= 0)
+    target_columns = np.searchsorted(candidates, targets[target_rows])
+    block_rank[target_rows, target_columns] = np.minimum(block_rank[target_rows, target_columns], -1)
+    in_block = block_rank < len(choices)
+
+    candidate_keys = [choice_keys[i] for i in candidates]
+    scores = process.cdist(keys, candidate_keys, scorer=fuzz.WRatio, workers=-1).astype(np.float64)
+    agree, reverse = token_coverage(keys, candidate_keys)
+    mutual = agree & reverse.T
+    scores[target_rows, target_columns] = 100.0
+    agree[target_rows, target_columns] = mutual[target_rows, target_columns] = True
+    # Two placeholder candidates outside every block, so short or empty blocks still give two columns
+    candidates = np.append(candidates, [-1, -1])
+    pad = ((0, 0), (0, 2))
+    scores, agree, mutual = np.pad(scores, pad), np.pad(agree, pad), np.pad(mutual, pad)
+    block_rank, in_block = np.pad(block_rank, pad, constant_values=len(choices)), np.pad(in_block, pad)
+
+    # Per name: candidates in the block first, then passing the token check, agreeing both ways,
+    # by score, and by block rank on ties
+    order = np.lexsort((block_rank, -scores, ~mutual, ~agree, ~in_block), axis=-1)[:, :2]
+    valid = in_block[rows[:, None], order]
+    best = np.where(valid, candidates[order], -1)
+    best_scores = np.where(valid, scores[rows[:, None], order], np.nan)
+    matched = valid[:, 0] & agree[rows, order[:, 0]] & (best_scores[:, 0] >= threshold)
+    choice_names = np.array(choices + [None], dtype=object)
+    return pd.DataFrame({'name': names, 'key': keys, 'match': choice_names[best[:, 0]], 'score': best_scores[:, 0],
+                         'runner_up': choice_names[best[:, 1]], 'runner_up_score': best_scores[:, 1],
+                         'matched': matched}, columns=columns)
+
+
+def load_alias_table(names, choices, stage_name, threshold=MATCH_THRESHOLD, overrides_file=OVERRIDES_FILE):
+    """match_countries through the stage cache under its own stage name per caller: rebuilt only
+    when the names, choices, threshold, overrides or matching code change."""
+    return run_stage(stage_name, match_countries, list(names), list(choices), files=[overrides_file],
+                     threshold=threshold, overrides_file=overrides_file)
+
+
+def aliases(names, choices, stage_name, threshold=MATCH_THRESHOLD):
+    """Mapping of names to their harmonized dataset names, for the names that matched.
+
+    Each dataset name is claimed by one name only, the best scoring one, so an exact name always
+    wins over a looser variant.
+    """
+    table = load_alias_table(names, choices, stage_name, threshold)
+    table = table[table['matched']].sort_values('score', ascending=False, kind='stable')
+    table = table.drop_duplicates('match')
+    return dict(zip(table['name'], table['match']))
+
+
 def find_missing_countries(file_dataset, file_all_countries):
-    threshold = 85
+    threshold = MATCH_THRESHOLD
 
     df_population = pd.read_csv(file_dataset)
     unique_countries_population = df_population['country'].unique()
-    
+
     df_all_countries = pd.read_csv(file_all_countries)
     all_countries = df_all_countries['title'].unique()
-    
-    missing_countries = []
-    for country in all_countries:
-        match, score = process.extractOne(country.lower(), [c.lower() for c in unique_countries_population])
-        if score < threshold:  # If similarity score is below the threshold, consider it missing
-            missing_countries.append(country)
-    
-    return list(missing_countries)
+
+    # If the best similarity score is below the threshold, consider the country missing
+    table = load_alias_table(all_countries, unique_countries_population, 'missing_country_aliases', threshold)
+    return table.loc[~table['matched'], 'name'].tolist()
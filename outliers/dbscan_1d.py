@@ -0,0 +1,84 @@
+import numpy as np
+
+
+def neighbour_counts(sorted_values, eps):
+    """Number of points within eps (inclusive, the point itself counted) of every sorted point.
+
+    Window edges come from binary search and are then corrected with the same |a - b| <= eps
+    comparison DBSCAN uses, so rounding at the edges cannot change the result.
+    """
+    n = len(sorted_values)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    left = np.searchsorted(sorted_values, sorted_values - eps, side='left')
+    right = np.searchsorted(sorted_values, sorted_values + eps, side='right')
+
+    # Move each edge past whole runs of equal values until the exact comparison agrees
+    while True:
+        grow_left = (left > 0) & (sorted_values - sorted_values[np.maximum(left - 1, 0)] <= eps)
+        shrink_left = (left < n) & (sorted_values - sorted_values[np.minimum(left, n - 1)] > eps)
+        grow_right = (right < n) & (sorted_values[np.minimum(right, n - 1)] - sorted_values <= eps)
+        shrink_right = (right > 0) & (sorted_values[np.maximum(right - 1, 0)] - sorted_values > eps)
+        if not (grow_left.any() or shrink_left.any() or grow_right.any() or shrink_right.any()):
+            break
+        left[grow_left] = np.searchsorted(sorted_values, sorted_values[left[grow_left] - 1], side='left')
+        left[shrink_left] = np.searchsorted(sorted_values, sorted_values[left[shrink_left]], side='right')
+        right[grow_right] = np.searchsorted(sorted_values, sorted_values[right[grow_right]], side='right')
+        right[shrink_right] = np.searchsorted(sorted_values, sorted_values[right[shrink_right] - 1], side='left')
+    return right - left
+
+
+def nearest_cores(core):
+    """Position of the nearest core point at or before / at or after every sorted point (-1 / n if none)."""
+    positions = np.arange(len(core))
+    previous_core = np.maximum.accumulate(np.where(core, positions, -1)) if len(core) else positions
+    next_core = np.minimum.accumulate(np.where(core, positions, len(core))[::-1])[::-1] if len(core) else positions
+    return previous_core, next_core
+
+
+def dbscan_1d(values, eps, min_samples):
+    """DBSCAN cluster labels of one-dimensional data, identical to sklearn's DBSCAN on values.reshape(-1, 1).
+
+    The values are sorted once. Core points come from neighbour windows over the sorted array,
+    consecutive core points closer than eps form one cluster, and border points join the cluster
+    of an adjacent core point. Clusters are numbered like sklearn: in order of their first core
+    point in the input, and a border point reachable from two clusters joins the earlier one.
+    Noise points get -1. Runs in O(n log n) time and O(n) memory.
+    """
+    values = np.asarray(values, dtype=np.float64).ravel()
+    n = len(values)
+    order = np.argsort(values, kind='stable')
+    sorted_values = values[order]
+
+    core = neighbour_counts(sorted_values, eps) >= min_samples
+    core_positions = np.flatnonzero(core)
+    sorted_labels = np.full(n, -1, dtype=np.int64)
+    if len(core_positions) == 0:
+        return sorted_labels
+
+    # Chains of core points with gaps <= eps are density-connected clusters
+    gaps = np.abs(np.diff(sorted_values[core_positions]))
+    runs = np.r_[0, np.cumsum(gaps > eps)]
+
+    # Number clusters by the first input index of any of their core points
+    first_index = np.full(runs[-1] + 1, n)
+    np.minimum.at(first_index, runs, order[core_positions])
+    cluster_rank = np.empty_like(first_index)
+    cluster_rank[np.argsort(first_index, kind='stable')] = np.arange(len(first_index))
+    sorted_labels[core_positions] = cluster_rank[runs]
+
+    # Border points: reachable from the nearest core point on either side
+    previous_core, next_core = nearest_cores(core)
+    padded_values = np.r_[sorted_values, np.inf]
+    padded_labels = np.r_[sorted_labels, np.iinfo(np.int64).max]
+    from_previous = (previous_core >= 0) & (np.abs(sorted_values - sorted_values[np.maximum(previous_core, 0)]) <= eps)
+    from_next = (next_core < n) & (np.abs(padded_values[next_core] - sorted_values) <= eps)
+    previous_label = np.where(from_previous, sorted_labels[np.maximum(previous_core, 0)], np.iinfo(np.int64).max)
+    next_label = np.where(from_next, padded_labels[next_core], np.iinfo(np.int64).max)
+    border_label = np.minimum(previous_label, next_label)
+    border = ~core & (border_label != np.iinfo(np.int64).max)
+    sorted_labels[border] = border_label[border]
+
+    labels = np.empty(n, dtype=np.int64)
+    labels[order] = sorted_labels
+    return labels
@@ -0,0 +1,93 @@
+import os
+
+import joblib
+import numpy as np
+from sklearn.ensemble import IsolationForest
+from sklearn.neighbors import NearestNeighbors
+
+MODEL_PATH = '../processed/models/multivariate_outliers.joblib'
+
+# Share of the training rows flagged as outliers; sets the score threshold
+CONTAMINATION = 0.01
+
+# Rows are scored in batches so memory stays flat on very large inputs
+BATCH_ROWS = 100_000
+
+
+def _prepare(model, data):
+    """Scaled feature matrix of the model's columns, with missing values set to the training medians."""
+    values = data[model['columns']].to_numpy(dtype=np.float64)
+    values = np.where(np.isnan(values), model['medians'], values)
+    return (values - model['medians']) / model['scales']
+
+
+def _scores(model, scaled):
+    if model['method'] == 'isolation_forest':
+        return -model['estimator'].score_samples(scaled)
+    # The index returns n_neighbors + 1 matches. A training row finds itself first at distance 0,
+    # so that match is dropped; any other row keeps its n_neighbors nearest and drops the extra one
+    distances, _ = model['estimator'].kneighbors(scaled)
+    is_self = distances[:, :1] == 0
+    return np.where(is_self, distances[:, 1:], distances[:, :-1]).mean(axis=1)
+
+
+def fit_multivariate_model(data, columns, method='isolation_forest', contamination=CONTAMINATION,
+                           n_neighbors=10, max_train_rows=None, random_state=42):
+    """Fit a multivariate outlier model over `columns`.
+
+    Columns are robustly scaled (median and interquartile range) so no single column dominates.
+    'isolation_forest' scores rows by how quickly random splits isolate them; 'knn' scores them by
+    the mean distance to their n_neighbors nearest training rows (other than themselves), found
+    with a KD-tree. Rows scoring above the (1 - contamination) quantile of the training scores
+    are outliers.
+    """
+    values = data[columns].to_numpy(dtype=np.float64)
+    medians = np.nanmedian(values, axis=0)
+    scales = np.nanpercentile(values, 75, axis=0) - np.nanpercentile(values, 25, axis=0)
+    model = {'method': method, 'columns': list(columns), 'medians': medians,
+             'scales': np.where(scales > 0, scales, 1.0)}
+
+    scaled = _prepare(model, data)
+    if max_train_rows is not None and len(scaled) > max_train_rows:
+        sample = np.random.default_rng(random_state).choice(len(scaled), max_train_rows, replace=False)
+        scaled = scaled[sample]
+
+    if method == 'isolation_forest':
+        model['estimator'] = IsolationForest(random_state=random_state, n_jobs=-1).fit(scaled)
+    elif method == 'knn':
+        model['estimator'] = NearestNeighbors(n_neighbors=n_neighbors + 1, algorithm='kd_tree', n_jobs=-1).fit(scaled)
+    else:
+        raise ValueError(f"Unknown multivariate outlier method: {method}")
+
+    model['threshold'] = np.quantile(_scores(model, scaled), 1 - contamination)
+    return model
+
+
+def score_rows(model, data, batch_rows=BATCH_ROWS):
+    """Outlier scores of new rows against a fitted model (higher is more unusual), computed in batches."""
+    scores = np.empty(len(data))
+    for start in range(0, len(data), batch_rows):
+        batch = data.iloc[start:start + batch_rows]
+        scores[start:start + len(batch)] = _scores(model, _prepare(model, batch))
+    return scores
+
+
+def flag_outliers(model, data, batch_rows=BATCH_ROWS):
+    """Boolean mask of the rows whose score exceeds the model's threshold."""
+    return score_rows(model, data, batch_rows) > model['threshold']
+
+
+def save_model(model, path=MODEL_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    joblib.dump(model, path)
+
+
+def load_or_fit_model(data, columns, path=MODEL_PATH, method='isolation_forest', refit=False, **fit_params):
+    """Load the persisted model, or fit and persist one if it is missing, stale or refit is requested."""
+    if not refit and os.path.exists(path):
+        model = joblib.load(path)
+        if model['columns'] == list(columns) and model['method'] == method:
+            return model
+    model = fit_multivariate_model(data, columns, method=method, **fit_params)
+    save_model(model, path)
+    return model
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from dbscan_1d import neighbour_counts, nearest_cores
+
+ZSCORE_THRESHOLDS = [2.5, 3, 3.5]
+DBSCAN_EPS = [0.3, 0.5, 0.7]
+DBSCAN_MIN_SAMPLES = [3, 5, 10]
+
+
+def standardized_sorted(values):
+    """Z-scores of a column's non-missing values (population std, as StandardScaler/zscore use) and their sorted copy."""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    std = values.std()
+    scaled = (values - values.mean()) / (std if std > 0 else 1.0)
+    return scaled, np.sort(scaled)
+
+
+def dbscan_noise(sorted_values, counts, eps, min_samples):
+    """DBSCAN noise mask of sorted 1-D points: neither a core point nor within eps of one."""
+    core = counts >= min_samples
+    previous_core, next_core = nearest_cores(core)
+    padded = np.r_[sorted_values, np.inf]
+    near_previous = (previous_core >= 0) & (sorted_values - sorted_values[np.maximum(previous_core, 0)] <= eps)
+    near_next = (next_core < len(core)) & (padded[next_core] - sorted_values <= eps)
+    return ~core & ~near_previous & ~near_next
+
+
+def parameter_sweep(data, columns, thresholds=ZSCORE_THRESHOLDS, eps_values=DBSCAN_EPS, min_samples_values=DBSCAN_MIN_SAMPLES):
+    """Outlier counts for every column and parameter set of both detectors.
+
+    Each column is standardized and sorted once. Z-score counts then come from one comparison per
+    threshold, and DBSCAN counts from one neighbour count per eps plus one linear scan per
+    min_samples. Returns a tidy table with one row per method, column and parameter set.
+    """
+    rows = []
+    for col in columns:
+        if col not in data.columns:
+            continue
+        scaled, sorted_values = standardized_sorted(data[col])
+        magnitudes = np.abs(scaled)
+        for threshold in thresholds:
+            rows.append({'method': 'zscore', 'column': col, 'threshold': threshold,
+                         'outliers': int(np.count_nonzero(magnitudes > threshold))})
+        for eps in eps_values:
+            counts = neighbour_counts(sorted_values, eps)
+            for min_samples in min_samples_values:
+                noise = dbscan_noise(sorted_values, counts, eps, min_samples)
+                rows.append({'method': 'dbscan', 'column': col, 'eps': eps, 'min_samples': min_samples,
+                             'outliers': int(np.count_nonzero(noise))})
+    results = pd.DataFrame(rows, columns=['method', 'column', 'threshold', 'eps', 'min_samples', 'outliers'])
+    return results.astype({'min_samples': 'Int64'})
+
+
+def best_parameters(results):
+    """Parameter set with the fewest z-score plus DBSCAN outliers over all columns (first one on ties)."""
+    z_totals = results[results['method'] == 'zscore'].groupby('threshold', sort=False)['outliers'].sum()
+    dbscan_totals = results[results['method'] == 'dbscan'].groupby(['eps', 'min_samples'], sort=False)['outliers'].sum()
+
+    best, min_outliers = (None, None, None), float('inf')
+    for threshold, z_total in z_totals.items():
+        for (eps, min_samples), dbscan_total in dbscan_totals.items():
+            if z_total + dbscan_total < min_outliers:
+                min_outliers = z_total + dbscan_total
+                best = (threshold, eps, int(min_samples))
+    return best
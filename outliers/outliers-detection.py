@@ -1,12 +1,21 @@
+import sys
 import pandas as pd
 from scipy.stats import zscore
-from sklearn.cluster import DBSCAN
 from sklearn.preprocessing import StandardScaler
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+from dbscan_1d import dbscan_1d
+from multivariate_outliers import load_or_fit_model, flag_outliers, MODEL_PATH
+from robust_stats import collect_robust_stats, robust_outlier_mask
+from outlier_sweep import parameter_sweep, best_parameters, ZSCORE_THRESHOLDS, DBSCAN_EPS, DBSCAN_MIN_SAMPLES
+
+sys.path.append('../scripts')
+from storage import read_dataset, write_dataset
+from plot_rendering import figure, figure_path, draw_kde_comparison, render_figures
+
+results_dir = "./results"
 
 file_path = '../data/dataset_04.csv'
-data = pd.read_csv(file_path)
+data = read_dataset(file_path)
 
 base_columns = ["Population", "Median Age", "Yearly Change", "Density (P/Km²)", "Migration_Rate", "Annual_Population_Growth"]
 
@@ -15,53 +24,47 @@ def detect_outliers_zscore(data, columns, threshold):
     z_outliers = {}
     for col in columns:
         if col in data.columns:
-            z_scores = zscore(data[col].dropna())
-            z_outliers[col] = data[abs(z_scores) > threshold]
+            col_data = data[col].dropna()
+            z_scores = zscore(col_data)
+            z_outliers[col] = data.loc[col_data.index[abs(z_scores) > threshold]]
     return z_outliers
 
+# Step 1b: Robust alternative - median/MAD scores per group from mergeable quantile sketches
+def detect_outliers_robust(data, columns, threshold=3.5, by=('country', 'DataType'), method='mad', chunk_rows=100_000):
+    columns = [col for col in columns if col in data.columns]
+    # One streaming pass; chunks (or partitions in worker processes) merge into the same sketches
+    stats = collect_robust_stats((data.iloc[start:start + chunk_rows] for start in range(0, len(data), chunk_rows)),
+                                 columns, by=list(by))
+    return {col: data[robust_outlier_mask(data, stats, col, method, threshold)] for col in columns}
+
 # Step 2: Detect Outliers Using DBSCAN
 def detect_outliers_dbscan(data, columns, eps, min_samples):
     dbscan_outliers = {}
     scaler = StandardScaler()
     for col in columns:
         if col in data.columns:
-            col_data = data[col].dropna().values.reshape(-1, 1)
-            scaled_data = scaler.fit_transform(col_data)
-            dbscan = DBSCAN(eps=eps, min_samples=min_samples)
-            labels = dbscan.fit_predict(scaled_data)
-            dbscan_outliers[col] = data.iloc[data[col].dropna().index[labels == -1]]
+            col_data = data[col].dropna()
+            scaled_data = scaler.fit_transform(col_data.values.reshape(-1, 1))
+            labels = dbscan_1d(scaled_data, eps, min_samples)
+            dbscan_outliers[col] = data.loc[col_data.index[labels == -1]]
     return dbscan_outliers
 
 # Step 3: Experiment with Z-Score and DBSCAN Parameters
-def experiment_with_parameters(data, columns):
-    best_threshold = None
-    best_eps = None
-    best_min_samples = None
-    min_outliers = float('inf')
-
-    for threshold in [2.5, 3, 3.5]:
-        z_outliers = detect_outliers_zscore(data, columns, threshold)
-        z_total_outliers = sum([len(outliers) for outliers in z_outliers.values()])
-        
-        for eps in [0.3, 0.5, 0.7]:
-            for min_samples in [3, 5, 10]:
-                dbscan_outliers = detect_outliers_dbscan(data, columns, eps, min_samples)
-                dbscan_total_outliers = sum([len(outliers) for outliers in dbscan_outliers.values()])
-                total_outliers = z_total_outliers + dbscan_total_outliers
-                
-                if total_outliers < min_outliers:
-                    min_outliers = total_outliers
-                    best_threshold = threshold
-                    best_eps = eps
-                    best_min_samples = min_samples
+def experiment_with_parameters(data, columns, thresholds=ZSCORE_THRESHOLDS, eps_values=DBSCAN_EPS, min_samples_values=DBSCAN_MIN_SAMPLES):
+    # Every column is standardized and sorted once and the whole grid is evaluated from it
+    results = parameter_sweep(data, columns, thresholds, eps_values, min_samples_values)
+    best_threshold, best_eps, best_min_samples = best_parameters(results)
 
     print(f"Best Z-Score Threshold: {best_threshold}")
     print(f"Best DBSCAN eps: {best_eps}")
     print(f"Best DBSCAN min_samples: {best_min_samples}")
     return best_threshold, best_eps, best_min_samples
 
-def handle_outliers_with_zscore_and_dbscan(data, columns, threshold, eps, min_samples):
-    z_outliers = detect_outliers_zscore(data, columns, threshold)
+def handle_outliers_with_zscore_and_dbscan(data, columns, threshold, eps, min_samples, robust=False):
+    if robust:
+        z_outliers = detect_outliers_robust(data, columns, threshold)
+    else:
+        z_outliers = detect_outliers_zscore(data, columns, threshold)
     dbscan_outliers = detect_outliers_dbscan(data, columns, eps, min_samples)
 
     z_indices = set(pd.concat(z_outliers.values()).index)
@@ -86,19 +89,35 @@ def handle_outliers_with_zscore_and_dbscan(data, columns, threshold, eps, min_sa
 
     return data_after_removal
 
+# Step 4b: Multivariate mode - flags rows that are only unusual in combination
+def handle_outliers_multivariate(data, columns, method='isolation_forest', model_path=MODEL_PATH, refit=False):
+    columns = [col for col in columns if col in data.columns]
+    # The model is fitted once and persisted; later runs (e.g. a new yearly vintage) only score rows
+    model = load_or_fit_model(data, columns, path=model_path, method=method, refit=refit)
+
+    data['is_outlier'] = flag_outliers(model, data)
+
+    flagged_rows = data[data['is_outlier']].copy()
+    flagged_rows.to_csv('flagged_rows.csv', index=False)
+
+    data_after_removal = data[~data['is_outlier']].copy()
+    data_after_removal = data_after_removal.drop(columns=['is_outlier'])
+
+    print(f"Rows flagged as outliers: {data['is_outlier'].sum()}")
+    print(f"Rows remaining: {len(data_after_removal)}")
+
+    return data_after_removal
+
 
 # Step 5: Compare Distributions
-def compare_distributions(original_data, adjusted_data, columns):
+def compare_distributions(original_data, adjusted_data, columns, output_dir=results_dir):
+    figures = []
     for col in columns:
         if col in original_data.columns and col in adjusted_data.columns:
-            plt.figure(figsize=(10, 5))
-            sns.kdeplot(original_data[col], label="Original", color='red', fill=True, alpha=0.4)
-            sns.kdeplot(adjusted_data[col], label="Adjusted", color='blue', fill=True, alpha=0.4)
-            plt.title(f"Comparison of {col} Distributions (Original vs Adjusted)")
-            plt.xlabel(col)
-            plt.ylabel("Density")
-            plt.legend()
-            plt.show()
+            series = [(original_data[col], "Original", 'red'), (adjusted_data[col], "Adjusted", 'blue')]
+            figures.append(figure(figure_path(output_dir, f"comparison {col}"), draw_kde_comparison, series,
+                                  f"Comparison of {col} Distributions (Original vs Adjusted)", col))
+    return render_figures(figures)
 
 
 if __name__ == "__main__":
@@ -109,10 +128,14 @@ if __name__ == "__main__":
     # Best DBSCAN min_samples: 3
     # Best DBSCAN eps: 0.7
 
-    adjusted_data = handle_outliers_with_zscore_and_dbscan(data.copy(), base_columns, 3.5, 0.7, 3)
+    if '--multivariate' in sys.argv:
+        method = 'knn' if '--knn' in sys.argv else 'isolation_forest'
+        adjusted_data = handle_outliers_multivariate(data.copy(), base_columns, method=method, refit='--refit' in sys.argv)
+    else:
+        adjusted_data = handle_outliers_with_zscore_and_dbscan(data.copy(), base_columns, 3.5, 0.7, 3, robust='--robust' in sys.argv)
 
     adjusted_data_path = '../data/dataset_05.csv'
-    adjusted_data.to_csv(adjusted_data_path, index=False)
+    write_dataset(adjusted_data, adjusted_data_path)
 
     compare_distributions(data, adjusted_data, base_columns)
     print(f"Adjusted dataset (base columns) saved to: {adjusted_data_path}")
@@ -0,0 +1,199 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+# Capacity of the top compactor; rank error of a sketch is roughly 1.7 / SKETCH_K
+SKETCH_K = 256
+
+# Iglewicz-Hoaglin constant: 0.6745 * (x - median) / MAD is comparable to a z-score
+MAD_CONSTANT = 0.6745
+
+
+class QuantileSketch:
+    """Mergeable KLL quantile sketch of a stream of floats.
+
+    Items live in compactors (levels); an item at level h stands for 2**h input values. A level
+    that outgrows its capacity is sorted and every other item is promoted to the next level, so
+    memory stays O(k log(n / k)). While nothing has been compacted the sketch is exact.
+    """
+
+    def __init__(self, k=SKETCH_K, seed=0):
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        return max(2, int(np.ceil(self.k * (2 / 3) ** (len(self.levels) - 1 - level))))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                items = np.sort(items)
+                # Odd leftovers stay at this level so the total weight is preserved
+                kept, items = items[:len(items) % 2], items[len(items) % 2:]
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                promoted = items[self.rng.integers(2)::2]
+                self.levels[level] = kept
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.count += len(values)
+        self._compress()
+        return self
+
+    def merge(self, other):
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+        return self
+
+    def is_exact(self):
+        return len(self.levels) == 1
+
+    def _weighted_items(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level_items), 2.0 ** level) for level, level_items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], weights[order]
+
+    def quantile(self, q):
+        """Approximate q-quantile (exact, with linear interpolation, while the sketch is exact)."""
+        if self.count == 0:
+            return np.nan
+        if self.is_exact():
+            return np.quantile(self.levels[0], q)
+        items, weights = self._weighted_items()
+        return _weighted_quantile(items, weights, q)
+
+    def mad(self):
+        """Median absolute deviation from the median, estimated from the same items."""
+        if self.count == 0:
+            return np.nan
+        median = self.quantile(0.5)
+        if self.is_exact():
+            return np.median(np.abs(self.levels[0] - median))
+        items, weights = self._weighted_items()
+        deviations = np.abs(items - median)
+        order = np.argsort(deviations, kind='stable')
+        return _weighted_quantile(deviations[order], weights[order], 0.5)
+
+
+def _weighted_quantile(sorted_items, weights, q):
+    cumulative = np.cumsum(weights)
+    centers = (cumulative - weights / 2) / cumulative[-1]
+    return np.interp(q, centers, sorted_items)
+
+
+class RobustStats:
+    """Quantile sketches per column, overall and per group, filled in one pass over any number of chunks.
+
+    Two RobustStats built on different chunks or processes merge into the statistics of both.
+    """
+
+    def __init__(self, columns, by=None, k=SKETCH_K):
+        self.columns = list(columns)
+        self.by = [by] if isinstance(by, str) else list(by or [])
+        self.k = k
+        self.overall = {col: QuantileSketch(k) for col in self.columns}
+        self.groups = {col: {} for col in self.columns}
+
+    def update(self, chunk):
+        for col in self.columns:
+            self.overall[col].update(chunk[col].to_numpy(dtype=np.float64))
+        if self.by:
+            # A single key column gives scalar keys (a one-item list would give 1-tuples that never
+            # match the rows' values); several give tuples, matching a MultiIndex
+            by = self.by[0] if len(self.by) == 1 else self.by
+            for key, rows in chunk.groupby(by, observed=True, sort=False):
+                for col in self.columns:
+                    sketches = self.groups[col]
+                    if key not in sketches:
+                        sketches[key] = QuantileSketch(self.k)
+                    sketches[key].update(rows[col].to_numpy(dtype=np.float64))
+        return self
+
+    def merge(self, other):
+        for col in self.columns:
+            self.overall[col].merge(other.overall[col])
+            for key, sketch in other.groups[col].items():
+                if key in self.groups[col]:
+                    self.groups[col][key].merge(sketch)
+                else:
+                    self.groups[col][key] = sketch
+        return self
+
+    def table(self, col, grouped=True):
+        """Median, MAD, quartiles and IQR fences of a column, one row per group (or one overall row)."""
+        sketches = self.groups[col] if grouped and self.by else {None: self.overall[col]}
+        rows = []
+        for key, sketch in sketches.items():
+            q1, q3 = sketch.quantile(0.25), sketch.quantile(0.75)
+            rows.append({'key': key, 'count': sketch.count, 'median': sketch.quantile(0.5), 'mad': sketch.mad(),
+                         'q1': q1, 'q3': q3, 'lower_fence': q1 - 1.5 * (q3 - q1), 'upper_fence': q3 + 1.5 * (q3 - q1)})
+        table = pd.DataFrame(rows)
+        if grouped and self.by:
+            table.index = pd.MultiIndex.from_tuples(table.pop('key'), names=self.by) if len(self.by) > 1 \
+                else pd.Index(table.pop('key'), name=self.by[0])
+        else:
+            table = table.drop(columns='key')
+        return table
+
+
+def collect_robust_stats(chunks, columns, by=None, k=SKETCH_K):
+    """Robust statistics of an iterable of DataFrame chunks (e.g. pd.read_csv(..., chunksize=...))."""
+    stats = RobustStats(columns, by, k)
+    for chunk in chunks:
+        stats.update(chunk)
+    return stats
+
+
+def _partition_stats(path, columns, by, k):
+    return RobustStats(columns, by, k).update(pd.read_parquet(path, columns=list(columns) + list(by or [])))
+
+
+def robust_stats_from_partitions(paths, columns, by=None, workers=None, k=SKETCH_K):
+    """Build the sketches of every Parquet partition in a process pool and merge them."""
+    by = [by] if isinstance(by, str) else list(by or [])
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        parts = list(pool.map(_partition_stats, paths, [columns] * len(paths), [by] * len(paths), [k] * len(paths)))
+    return reduce(RobustStats.merge, parts, RobustStats(columns, by, k))
+
+
+def robust_outlier_mask(data, stats, col, method='mad', threshold=3.5, grouped=True):
+    """Rows of `data` whose value is an outlier against the column's (group) statistics.
+
+    'mad' flags |0.6745 * (x - median) / MAD| > threshold; 'iqr' flags values outside the
+    1.5 * IQR fences. Missing values and groups with a zero MAD are never flagged.
+    """
+    table = stats.table(col, grouped)
+    if grouped and stats.by:
+        keys = pd.MultiIndex.from_frame(data[stats.by]) if len(stats.by) > 1 else pd.Index(data[stats.by[0]])
+        table = table.reindex(keys)
+    else:
+        table = table.loc[np.zeros(len(data), dtype=int)]
+    values = data[col].to_numpy(dtype=np.float64)
+
+    if method == 'mad':
+        mad = table['mad'].to_numpy()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scores = np.abs(MAD_CONSTANT * (values - table['median'].to_numpy()) / mad)
+        mask = (mad > 0) & (scores > threshold)
+    elif method == 'iqr':
+        mask = (values < table['lower_fence'].to_numpy()) | (values > table['upper_fence'].to_numpy())
+    else:
+        raise ValueError(f"Unknown robust outlier method: {method}")
+    return pd.Series(mask & ~np.isnan(values), index=data.index)
@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+from sklearn.cluster import DBSCAN
+
+from dbscan_1d import dbscan_1d
+
+
+def _values(seed):
+    rng = np.random.default_rng(seed)
+    # Dense clusters, sparse outliers and many exact ties (rounded values)
+    values = np.r_[rng.normal(0, 1, 300), rng.normal(8, 0.3, 60), rng.uniform(-20, 30, 25)]
+    return np.round(rng.permutation(values), 1)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('eps', [0.1, 0.3, 0.5, 1.0])
+@pytest.mark.parametrize('min_samples', [1, 3, 5, 10])
+def test_labels_match_sklearn(seed, eps, min_samples):
+    values = _values(seed)
+    expected = DBSCAN(eps=eps, min_samples=min_samples).fit(values.reshape(-1, 1)).labels_
+    np.testing.assert_array_equal(dbscan_1d(values, eps, min_samples), expected)
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+from scipy.spatial.distance import cdist
+
+from multivariate_outliers import fit_multivariate_model, score_rows
+
+
+def _knn_model(train):
+    return fit_multivariate_model(train, list(train.columns), method='knn', n_neighbors=5)
+
+
+def test_knn_scores_of_training_rows_skip_the_row_itself():
+    rng = np.random.default_rng(0)
+    train = pd.DataFrame(rng.normal(size=(300, 3)), columns=['a', 'b', 'c'])
+    model = _knn_model(train)
+    scaled = (train.to_numpy() - model['medians']) / model['scales']
+    distances = np.sort(cdist(scaled, scaled), axis=1)[:, 1:6]
+    np.testing.assert_allclose(score_rows(model, train), distances.mean(axis=1))
+
+
+def test_knn_scores_of_new_rows_keep_their_nearest_neighbour():
+    rng = np.random.default_rng(1)
+    train = pd.DataFrame(rng.normal(size=(300, 3)), columns=['a', 'b', 'c'])
+    new = pd.DataFrame(rng.normal(size=(50, 3)), columns=['a', 'b', 'c'])
+    model = _knn_model(train)
+    to_train = cdist((new.to_numpy() - model['medians']) / model['scales'],
+                     (train.to_numpy() - model['medians']) / model['scales'])
+    np.testing.assert_allclose(score_rows(model, new), np.sort(to_train, axis=1)[:, :5].mean(axis=1))
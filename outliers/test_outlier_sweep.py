@@ -0,0 +1,30 @@
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from sklearn.cluster import DBSCAN
+
+from outlier_sweep import DBSCAN_EPS, DBSCAN_MIN_SAMPLES, ZSCORE_THRESHOLDS, parameter_sweep, standardized_sorted
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'dataset_04.csv')
+COLUMNS = ["Population", "Median Age", "Yearly Change", "Density (P/Km²)", "Migration_Rate", "Annual_Population_Growth"]
+
+
+def test_sweep_matches_sklearn_and_scipy():
+    data = pd.read_csv(DATA_PATH)
+    columns = [col for col in COLUMNS if col in data.columns]
+    results = parameter_sweep(data, columns)
+    zscore = results[results['method'] == 'zscore'].set_index(['column', 'threshold'])['outliers']
+    dbscan = results[results['method'] == 'dbscan'].set_index(['column', 'eps', 'min_samples'])['outliers']
+    assert len(zscore) == len(columns) * len(ZSCORE_THRESHOLDS)
+    assert len(dbscan) == len(columns) * len(DBSCAN_EPS) * len(DBSCAN_MIN_SAMPLES)
+    for col in columns:
+        values = data[col].dropna().to_numpy(dtype=np.float64)
+        scaled, _ = standardized_sorted(values)
+        for threshold in ZSCORE_THRESHOLDS:
+            assert zscore[(col, threshold)] == np.count_nonzero(np.abs(stats.zscore(values)) > threshold)
+        for eps in DBSCAN_EPS:
+            for min_samples in DBSCAN_MIN_SAMPLES:
+                labels = DBSCAN(eps=eps, min_samples=min_samples).fit(scaled.reshape(-1, 1)).labels_
+                assert dbscan[(col, eps, min_samples)] == np.count_nonzero(labels == -1)
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+import pytest
+
+from robust_stats import QuantileSketch, RobustStats, collect_robust_stats, robust_outlier_mask, \
+    robust_stats_from_partitions
+
+QUANTILES = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+
+def _rank_error(values, estimate, q):
+    return abs(np.searchsorted(np.sort(values), estimate) / len(values) - q)
+
+
+def test_exact_while_small():
+    values = np.random.default_rng(0).lognormal(size=200)
+    sketch = QuantileSketch().update(values)
+    assert sketch.is_exact()
+    for q in QUANTILES:
+        assert sketch.quantile(q) == np.quantile(values, q)
+    assert sketch.mad() == np.median(np.abs(values - np.median(values)))
+
+
+def test_quantiles_and_mad_within_rank_error():
+    values = np.random.default_rng(1).lognormal(size=200_000)
+    sketch = QuantileSketch()
+    for chunk in np.array_split(values, 37):
+        sketch.update(chunk)
+    assert not sketch.is_exact() and sketch.count == len(values)
+    for q in QUANTILES:
+        assert _rank_error(values, sketch.quantile(q), q) < 0.01
+    deviations = np.abs(values - np.median(values))
+    assert _rank_error(deviations, sketch.mad(), 0.5) < 0.02
+
+
+def test_merge_matches_single_pass():
+    values = np.random.default_rng(2).normal(size=100_000)
+    single = QuantileSketch().update(values)
+    merged = QuantileSketch(seed=1).update(values[:30_000]).merge(QuantileSketch(seed=2).update(values[30_000:]))
+    assert merged.count == single.count == len(values)
+    for q in QUANTILES:
+        assert _rank_error(values, merged.quantile(q), q) < 0.01
+        assert abs(merged.quantile(q) - single.quantile(q)) < 0.05
+
+
+def _frame(seed=0):
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame({'country': np.repeat(['Albania', 'Croatia', 'Egypt'], 200),
+                         'DataType': np.tile(['Historical', 'Forecasted'], 300)})
+    data['value'] = rng.normal(size=len(data)) + data['country'].map({'Albania': 0, 'Croatia': 50, 'Egypt': -50})
+    return data
+
+
+def test_partitions_match_one_pass(tmp_path):
+    data = _frame()
+    paths = []
+    for country, rows in data.groupby('country'):
+        paths.append(str(tmp_path / f'{country}.parquet'))
+        rows.to_parquet(paths[-1], index=False)
+    from_partitions = robust_stats_from_partitions(paths, ['value'], by='country', workers=2)
+    expected = collect_robust_stats([data], ['value'], by='country')
+    tm.assert_frame_equal(from_partitions.table('value').sort_index(), expected.table('value').sort_index())
+    tm.assert_frame_equal(from_partitions.table('value', grouped=False), expected.table('value', grouped=False))
+
+
+@pytest.mark.parametrize('by', ['country', ['country'], ['country', 'DataType']])
+@pytest.mark.parametrize('method', ['mad', 'iqr'])
+def test_grouped_mask_flags_planted_outliers(by, method):
+    data = _frame()
+    planted = [10, 450]
+    data.loc[planted[0], 'value'] += 100
+    data.loc[planted[1], 'value'] -= 100
+    stats = collect_robust_stats((data.iloc[i:i + 100] for i in range(0, len(data), 100)), ['value'], by=by)
+
+    table = stats.table('value')
+    assert table['median'].notna().all()
+    mask = robust_outlier_mask(data, stats, 'value', method=method)
+    assert mask[planted].all()
+    # Small groups keep exact sketches, so the mask equals the one from pandas' grouped statistics
+    grouped = data.groupby(by)['value']
+    median = grouped.transform('median')
+    if method == 'mad':
+        mad = (data['value'] - median).abs().groupby([data[key] for key in np.atleast_1d(by)]).transform('median')
+        expected = (0.6745 * (data['value'] - median) / mad).abs() > 3.5
+    else:
+        q1, q3 = grouped.transform(lambda x: x.quantile(0.25)), grouped.transform(lambda x: x.quantile(0.75))
+        expected = (data['value'] < q1 - 1.5 * (q3 - q1)) | (data['value'] > q3 + 1.5 * (q3 - q1))
+    tm.assert_series_equal(mask, expected, check_names=False)
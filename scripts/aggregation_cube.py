@@ -0,0 +1,166 @@
+import os
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from reference_data import attach_regions
+
+CUBE_DIMENSIONS = ['Region', 'country', 'Year', 'DataType']
+CUBE_MEASURES = ['Population', 'Yearly %   Change', 'Yearly  Change', 'Migrants (net)', 'Median Age',
+                 'Fertility Rate', 'Density (P/Km²)', 'Urban  Pop %', 'Urban Population',
+                 "Country's Share of  World Pop", 'World Population', 'Rank']
+
+# Levels derived from a cube dimension: name -> (dimension, function of its values)
+DERIVED_LEVELS = {'Decade': ('Year', lambda years: years // 10 * 10)}
+
+
+def _grouping_set_name(dims):
+    return '__'.join(dims) if dims else 'total'
+
+
+def _group_keys(keys):
+    """Grouping keys for a frame of key columns; a constant key when there are none."""
+    if keys.shape[1] == 0:
+        return [pd.Series(0, index=keys.index)]
+    return [keys[col] for col in keys.columns]
+
+
+def _base_partials(data, dims, measures):
+    """Count, sum and centered sum of squares (m2) of every measure per finest-grain cell."""
+    values = data[measures].astype(float)
+    keys = _group_keys(data[dims])
+    deviations = values - values.groupby(keys, observed=True, dropna=False).transform('mean')
+
+    frame = pd.concat([values.notna().add_suffix('|count'), values.add_suffix('|sum'),
+                       (deviations ** 2).add_suffix('|m2')], axis=1)
+    return frame.groupby(keys, sort=True, observed=True, dropna=False).sum()
+
+
+def _rollup(parts, keys, measures):
+    """Merge partial aggregates up to the grouping given by `keys`, without touching the raw rows.
+
+    Counts and sums add up; m2 uses the parallel variance merge
+    m2 = sum(m2_i + n_i * (mean_i - mean) ** 2).
+    """
+    parts = parts.reset_index(drop=True)
+    group_keys = _group_keys(keys.reset_index(drop=True))
+    grouped = parts.groupby(group_keys, sort=True, observed=True, dropna=False)
+    merged = grouped.sum()
+
+    count_cols = [f'{col}|count' for col in measures]
+    sum_cols = [f'{col}|sum' for col in measures]
+    m2_cols = [f'{col}|m2' for col in measures]
+
+    # All measures at once: group totals broadcast back to the merged cells
+    totals = grouped[count_cols + sum_cols].transform('sum')
+    counts = parts[count_cols].to_numpy(dtype=float)
+    group_counts = totals[count_cols].to_numpy(dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        part_means = parts[sum_cols].to_numpy() / counts
+        group_means = totals[sum_cols].to_numpy() / group_counts
+    spread = parts[m2_cols].to_numpy() + np.nan_to_num(counts * (part_means - group_means) ** 2)
+    merged[m2_cols] = pd.DataFrame(spread, columns=m2_cols).groupby(
+        group_keys, sort=True, observed=True, dropna=False).sum().to_numpy()
+
+    if keys.shape[1] == 0:
+        return merged.reset_index(drop=True)
+    merged.index.names = list(keys.columns)
+    return merged
+
+
+def build_cube(data, dimensions=CUBE_DIMENSIONS, measures=CUBE_MEASURES):
+    """Materialize every grouping set of the dimensions from a single scan of the data.
+
+    The rows are scanned once for the partial aggregates of the finest-grain cells, and every
+    coarser grouping set is rolled up from those partials. Returns a dict keyed by the tuple
+    of grouped dimensions.
+    """
+    if 'Region' in dimensions and 'Region' not in data.columns:
+        data = attach_regions(data.copy())
+    measures = [col for col in measures if col in data.columns]
+
+    base = _base_partials(data, list(dimensions), measures)
+    base_keys = base.index.to_frame(index=False)
+
+    cube = {tuple(dimensions): base}
+    for size in range(len(dimensions) - 1, -1, -1):
+        for dims in combinations(dimensions, size):
+            cube[dims] = _rollup(base, base_keys[list(dims)], measures)
+    return cube
+
+
+def _level_keys(keys, levels):
+    """Key columns of `levels`, computing derived levels from the dimensions they come from."""
+    keys = keys.copy()
+    for level in levels:
+        if level in DERIVED_LEVELS and level not in keys.columns:
+            dim, derive = DERIVED_LEVELS[level]
+            keys[level] = derive(keys[dim])
+    return keys
+
+
+def query_cube(cube, by=(), where=None, measures=None, stats=('mean',)):
+    """Return a slice of the cube.
+
+    `by` lists the dimensions to group by ('Decade' rolls 'Year' up to decades), `where` maps
+    dimensions or derived levels to a value or a list of values, and `stats` picks from 'count',
+    'sum', 'mean', 'var' and 'std'.
+    """
+    where = where or {}
+    by = list(by)
+    grain = [DERIVED_LEVELS[dim][0] if dim in DERIVED_LEVELS else dim for dim in by + list(where)]
+    dims = tuple(dim for dim in next(iter(cube)) if dim in grain)
+    parts = cube[dims]
+    measures = measures or list(dict.fromkeys(col.split('|')[0] for col in parts.columns))
+
+    if where:
+        keys = _level_keys(parts.index.to_frame(index=False), where)
+        mask = pd.Series(True, index=keys.index)
+        for dim, value in where.items():
+            mask &= keys[dim].isin(value if isinstance(value, (list, tuple, set)) else [value])
+        parts = parts[mask.to_numpy()]
+
+    # Roll filtered-out dimensions (and years into decades) up from the materialized cells
+    if list(dims) != by:
+        keys = _level_keys(parts.index.to_frame(index=False), by)
+        parts = _rollup(parts, keys[by], measures)
+
+    result = {}
+    for col in measures:
+        count, total, m2 = parts[f'{col}|count'], parts[f'{col}|sum'], parts[f'{col}|m2']
+        for stat in stats:
+            if stat == 'count':
+                value = count
+            elif stat == 'sum':
+                value = total
+            elif stat == 'mean':
+                value = total / count.where(count > 0)
+            elif stat == 'var':
+                value = m2 / (count - 1).where(count > 1)
+            elif stat == 'std':
+                value = (m2 / (count - 1).where(count > 1)) ** 0.5
+            else:
+                raise ValueError(f"Unknown statistic: {stat}")
+            result[col if len(stats) == 1 else f'{col} {stat}'] = value
+    return pd.DataFrame(result).reset_index(drop=not by)
+
+
+def save_cube(cube, cube_dir):
+    """Store every grouping set of the cube as its own Parquet file."""
+    os.makedirs(cube_dir, exist_ok=True)
+    for dims, parts in cube.items():
+        parts.reset_index(drop=not dims).to_parquet(os.path.join(cube_dir, f'{_grouping_set_name(dims)}.parquet'), index=False)
+
+
+def build_and_save_cube(data, cube_dir):
+    save_cube(build_cube(data), cube_dir)
+
+
+def load_cube(cube_dir, dimensions=CUBE_DIMENSIONS):
+    cube = {}
+    for size in range(len(dimensions), -1, -1):
+        for dims in combinations(dimensions, size):
+            parts = pd.read_parquet(os.path.join(cube_dir, f'{_grouping_set_name(dims)}.parquet'))
+            cube[dims] = parts.set_index(list(dims)) if dims else parts
+    return cube
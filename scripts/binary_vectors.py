@@ -0,0 +1,50 @@
+import numpy as np
+
+# Set bits of every byte value, for numpy versions without np.bitwise_count
+_BYTE_COUNTS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+
+def pack_bits(X, threshold=0):
+    """Threshold features (1 where a value is above `threshold`) and pack them 64 per uint64 word.
+
+    A 1-D input (one column of flags) gives one packed vector, a 2-D input one packed row per
+    vector. Returns (words, n_flags); padding bits are 0 in every vector, so they never count
+    as a match of ones, and SMC subtracts them out through n_flags.
+    """
+    flags = np.asarray(X) > threshold
+    n_flags = flags.shape[-1]
+    packed = np.packbits(np.atleast_2d(flags), axis=1)
+    padding = -packed.shape[1] % 8
+    if padding:
+        packed = np.pad(packed, ((0, 0), (0, padding)))
+    words = np.ascontiguousarray(packed).view(np.uint64)
+    return (words[0] if flags.ndim == 1 else words), n_flags
+
+
+def popcount(words):
+    """Number of set bits over the last axis, counted on whole words."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    counts = _BYTE_COUNTS[np.ascontiguousarray(words).view(np.uint8)]
+    return counts.sum(axis=-1, dtype=np.int64)
+
+
+def jaccard_pair(a, b):
+    """Jaccard index of two packed vectors; 0 when neither has a set flag."""
+    union = popcount(a | b)
+    return popcount(a & b) / union if union != 0 else 0
+
+
+def smc_pair(a, b, n_flags):
+    """Simple matching coefficient of two packed vectors: 1-1 and 0-0 matches over all flags."""
+    return (n_flags - popcount(a ^ b)) / n_flags
+
+
+def packed_tile(A, B, metric, n_flags):
+    """Jaccard or SMC similarities between every packed row of A and every packed row of B."""
+    if metric == 'smc':
+        return (n_flags - popcount(A[:, None, :] ^ B[None, :, :])) / n_flags
+    both = popcount(A[:, None, :] & B[None, :, :])
+    either = popcount(A[:, None, :] | B[None, :, :])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(either > 0, both / either, 0)
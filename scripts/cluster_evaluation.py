@@ -0,0 +1,145 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from sklearn.cluster import KMeans
+from sklearn.metrics import silhouette_samples
+
+# Points per silhouette sample; the exact score is O(n^2), a sample keeps it O(SAMPLE_SIZE^2)
+SAMPLE_SIZE = 2000
+
+# Independent samples drawn to put confidence bounds on the sampled score
+SAMPLE_REPEATS = 5
+
+
+def stratified_sample(labels, sample_size, rng):
+    """Row positions of a sample with every cluster represented in proportion to its size (at least 2 rows each)."""
+    clusters, counts = np.unique(labels, return_counts=True)
+    if len(labels) <= sample_size:
+        return np.arange(len(labels))
+    quotas = np.minimum(counts, np.maximum(2, np.round(counts / len(labels) * sample_size).astype(int)))
+    positions = [rng.choice(np.flatnonzero(labels == cluster), quota, replace=False)
+                 for cluster, quota in zip(clusters, quotas)]
+    return np.sort(np.concatenate(positions))
+
+
+def sampled_silhouette(X, labels, sample_size=SAMPLE_SIZE, repeats=SAMPLE_REPEATS, random_state=42, confidence=0.95):
+    """Silhouette score estimated on stratified samples, with a t-based confidence interval over the repeats.
+
+    Returns (estimate, lower, upper). When the data fits in one sample the exact score is returned
+    with zero-width bounds.
+    """
+    X, labels = np.asarray(X), np.asarray(labels)
+    if len(np.unique(labels)) < 2:
+        return np.nan, np.nan, np.nan
+    if len(labels) <= sample_size:
+        score = silhouette_samples(X, labels).mean()
+        return score, score, score
+
+    rng = np.random.default_rng(random_state)
+    scores = []
+    for _ in range(repeats):
+        sample = stratified_sample(labels, sample_size, rng)
+        scores.append(silhouette_samples(X[sample], labels[sample]).mean())
+    estimate = np.mean(scores)
+    margin = stats.t.ppf((1 + confidence) / 2, repeats - 1) * np.std(scores, ddof=1) / np.sqrt(repeats)
+    return estimate, estimate - margin, estimate + margin
+
+
+def simplified_silhouette(X, labels, centers, confidence=0.95):
+    """Centroid-based silhouette in O(n * k): a is the distance to the own centroid, b to the nearest other one.
+
+    Returns (estimate, lower, upper) with a normal confidence interval of the mean over points.
+    """
+    X, labels = np.asarray(X), np.asarray(labels)
+    if len(centers) < 2:
+        return np.nan, np.nan, np.nan
+    squared = (X ** 2).sum(axis=1)[:, None] - 2 * X @ centers.T + (centers ** 2).sum(axis=1)[None, :]
+    distances = np.sqrt(np.clip(squared, 0, None))
+    own = distances[np.arange(len(X)), labels]
+    distances[np.arange(len(X)), labels] = np.inf
+    nearest_other = distances.min(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        values = np.nan_to_num((nearest_other - own) / np.maximum(own, nearest_other))
+    estimate = values.mean()
+    margin = stats.norm.ppf((1 + confidence) / 2) * values.std(ddof=1) / np.sqrt(len(values))
+    return estimate, estimate - margin, estimate + margin
+
+
+def score_clustering(X, labels, centers, inertia, method='sampled', random_state=42):
+    """Inertia and silhouette (estimate with bounds) of one clustering."""
+    if method == 'simplified':
+        silhouette = simplified_silhouette(X, labels, centers)
+    else:
+        silhouette = sampled_silhouette(X, labels, random_state=random_state)
+    return {'k': len(centers), 'inertia': inertia, 'silhouette': silhouette[0],
+            'silhouette_lower': silhouette[1], 'silhouette_upper': silhouette[2]}
+
+
+# Data of the k evaluation, set in every worker process by _share_data
+_shared_X = None
+
+
+def _share_data(X):
+    global _shared_X
+    _shared_X = X
+
+
+def _fit_and_score_shared(k, method, random_state):
+    return _fit_and_score(_shared_X, k, method, random_state)
+
+
+def _fit_and_score(X, k, method, random_state):
+    kmeans = KMeans(n_clusters=k, random_state=random_state).fit(X)
+    return score_clustering(X, kmeans.labels_, kmeans.cluster_centers_, kmeans.inertia_, method, random_state)
+
+
+def evaluate_k(X, k_values=range(1, 11), method='sampled', workers=None, random_state=42):
+    """Fit KMeans for every candidate k in parallel worker processes and score each fit.
+
+    Returns one row per k with the inertia (for the elbow) and the silhouette estimate and bounds.
+    """
+    k_values = list(k_values)
+    workers = min(workers or os.cpu_count(), len(k_values))
+    if workers == 1:
+        rows = [_fit_and_score(X, k, method, random_state) for k in k_values]
+    else:
+        # X reaches every worker once through the initializer (inherited, not pickled, when forked),
+        # so the tasks only carry k; forked workers also do not re-run the calling script
+        context = multiprocessing.get_context('fork') if 'fork' in multiprocessing.get_all_start_methods() else None
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_share_data,
+                                 initargs=(X,)) as pool:
+            rows = list(pool.map(_fit_and_score_shared, k_values,
+                                 [method] * len(k_values), [random_state] * len(k_values)))
+    return pd.DataFrame(rows)
+
+
+def elbow_k(results):
+    """k at the elbow: the point of the inertia curve farthest from the line through its end points."""
+    k = results['k'].to_numpy(dtype=float)
+    inertia = results['inertia'].to_numpy(dtype=float)
+    if len(k) < 3:
+        return int(k[-1])
+    x = (k - k[0]) / (k[-1] - k[0])
+    y = (inertia - inertia[-1]) / max(inertia[0] - inertia[-1], 1e-12)
+    # Distance below the chord from (0, 1) to (1, 0)
+    return int(k[np.argmax(1 - x - y)])
+
+
+def choose_k(results):
+    """Pick k from the elbow and the silhouette.
+
+    Candidates are the k >= 2 whose silhouette interval overlaps the best one (statistically tied
+    with the best); of those, the one closest to the elbow wins, the smaller k on ties.
+    """
+    scored = results[(results['k'] >= 2) & results['silhouette'].notna()]
+    if scored.empty:
+        return elbow_k(results)
+    best_lower = scored.loc[scored['silhouette'].idxmax(), 'silhouette_lower']
+    candidates = scored[scored['silhouette_upper'] >= best_lower]
+    elbow = elbow_k(results)
+    distance = (candidates['k'] - elbow).abs()
+    return int(candidates.loc[distance == distance.min(), 'k'].min())
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+from correlation_engine import correlation_matrix
+
+# Common rule of thumb: a VIF above 10 means the feature is largely explained by the others
+VIF_THRESHOLD = 10.0
+
+# Added to the diagonal so perfectly collinear features get a huge VIF instead of a singular matrix
+RIDGE = 1e-10
+
+
+def _feature_columns(data, columns):
+    """The given columns, or every numeric non-boolean column."""
+    if columns is None:
+        return [col for col in data.select_dtypes(include='number').columns if data[col].dtype != bool]
+    return list(columns)
+
+
+def _complete_correlation(data, columns):
+    """Correlation matrix over the rows where every feature is present (the rows a regression would use).
+
+    Constant features have no correlation with anything, so they are left out of the matrix and
+    returned separately.
+    """
+    columns = _feature_columns(data, columns)
+    complete = data[columns].dropna()
+    constant = [col for col in columns if complete[col].nunique() < 2]
+    varying = [col for col in columns if col not in constant]
+    return correlation_matrix(complete, varying).fillna(0.0), constant
+
+
+def vif(data, columns=None):
+    """Variance inflation factor of every feature at once.
+
+    VIF_i = 1 / (1 - R_i^2) of regressing feature i on all the others, which equals the i-th
+    diagonal entry of the inverse correlation matrix, so one inversion replaces p regressions.
+    A constant feature is collinear with the intercept and gets an infinite VIF.
+    """
+    corr, constant = _complete_correlation(data, columns)
+    inverse = np.linalg.inv(corr.to_numpy() + RIDGE * np.eye(len(corr)))
+    factors = pd.Series(np.diag(inverse), index=corr.index, name='VIF')
+    return factors.reindex(_feature_columns(data, columns), fill_value=np.inf)
+
+
+def condition_indices(data, columns=None):
+    """Condition indices sqrt(largest eigenvalue / eigenvalue) of the correlation matrix, largest first.
+
+    Values above 30 point to a strong linear dependency; the matching eigenvector shows which
+    features take part in it. Constant features are left out.
+    """
+    corr, _ = _complete_correlation(data, columns)
+    eigenvalues, eigenvectors = np.linalg.eigh(corr.to_numpy())
+    eigenvalues = np.clip(eigenvalues, RIDGE, None)
+    indices = np.sqrt(eigenvalues.max() / eigenvalues)
+    order = np.argsort(-indices)
+    table = pd.DataFrame(eigenvectors[:, order].T, columns=corr.columns)
+    table.insert(0, 'condition_index', indices[order])
+    table.insert(1, 'eigenvalue', eigenvalues[order])
+    return table
+
+
+def prune_collinear(data, columns=None, threshold=VIF_THRESHOLD, keep=()):
+    """Drop features one at a time, highest VIF first, until every VIF is at most `threshold`.
+
+    The inverse correlation matrix is inverted once; after each drop it is updated with the
+    Schur complement of the removed feature in O(p^2), so the loop never re-inverts. Features
+    in `keep` are never dropped. Constant features (infinite VIF) are dropped first. Returns
+    the remaining features and a table of the dropped ones with their VIF at the time of removal.
+    """
+    corr, constant = _complete_correlation(data, columns)
+    names = list(corr.columns)
+    inverse = np.linalg.inv(corr.to_numpy() + RIDGE * np.eye(len(names)))
+    candidates = np.array([name not in keep for name in names])
+    dropped = [{'feature': name, 'VIF': np.inf} for name in constant if name not in keep]
+
+    while len(names) > 1:
+        factors = np.diag(inverse)
+        masked = np.where(candidates, factors, -np.inf)
+        worst = int(np.argmax(masked))
+        if masked[worst] <= threshold:
+            break
+        dropped.append({'feature': names[worst], 'VIF': factors[worst]})
+
+        # Inverse of the correlation matrix without `worst`: P_rest - P_rest,w P_w,rest / P_ww
+        rest = np.arange(len(names)) != worst
+        column = inverse[rest, worst]
+        inverse = inverse[np.ix_(rest, rest)] - np.outer(column, column) / inverse[worst, worst]
+        names = [name for name, kept in zip(names, rest) if kept]
+        candidates = candidates[rest]
+
+    remaining = set(names) | (set(constant) & set(keep))
+    names = [col for col in _feature_columns(data, columns) if col in remaining]
+    return names, pd.DataFrame(dropped, columns=['feature', 'VIF'])
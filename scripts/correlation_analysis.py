@@ -1,22 +1,28 @@
 import pandas as pd
+from storage import read_dataset, write_dataset
+from correlation_engine import correlation_matrix
+from collinearity import vif, condition_indices, prune_collinear, VIF_THRESHOLD
 
-# Function to calculate specific correlations
-def calculate_correlation(data, col1, col2):
-    correlation = data[[col1, col2]].corr(method='pearson').iloc[0, 1]
-    return correlation
+# Function to calculate specific correlations (from a precomputed matrix when one is given)
+def calculate_correlation(data, col1, col2, matrix=None):
+    if matrix is None:
+        matrix = correlation_matrix(data, [col1, col2], method='pearson')
+    return matrix.loc[col1, col2]
 
 # Load dataset for specific correlation calculations
-preprocessed_data = pd.read_csv('../processed/preprocessed_data.csv')
+preprocessed_data = read_dataset('../processed/preprocessed_data.csv',
+                                 columns=['Urban  Pop %', 'Urban Population', 'Yearly %   Change', 'Yearly  Change'])
 
-# Calculate specific correlations
-urban_correlation = calculate_correlation(preprocessed_data, 'Urban  Pop %', 'Urban Population')
-yearly_change_correlation = calculate_correlation(preprocessed_data, 'Yearly %   Change', 'Yearly  Change')
+# Calculate specific correlations from one matrix over the loaded columns
+pair_correlations = correlation_matrix(preprocessed_data, method='pearson')
+urban_correlation = calculate_correlation(preprocessed_data, 'Urban  Pop %', 'Urban Population', pair_correlations)
+yearly_change_correlation = calculate_correlation(preprocessed_data, 'Yearly %   Change', 'Yearly  Change', pair_correlations)
 
 print("Urban Pop % and Urban Population Correlation:", urban_correlation)
 print("Yearly % Change and Yearly Change Correlation:", yearly_change_correlation)
 
 # Load dataset for Rank correlation calculation
-data = pd.read_csv('../data/dataset_03.csv')
+data = read_dataset('../data/dataset_03.csv')
 
 # Define numeric columns explicitly for correlation, VIF, and PCA
 numeric_columns = ['Population', 'Yearly %   Change', 'Yearly  Change', 'Migrants (net)', 
@@ -26,11 +32,20 @@ numeric_columns = ['Population', 'Yearly %   Change', 'Yearly  Change', 'Migrant
 data_numeric = data[numeric_columns]
 
 # Calculate correlation for Rank with other features
-correlations = data_numeric.corr()  # Default method is Pearson
+correlations = correlation_matrix(data_numeric)  # Default method is Pearson
 print("\nCorrelation of Rank with other features:")
 print(correlations['Rank'].drop('Rank'))
 
+# Collinearity diagnostics for the same features
+vif_values = vif(data_numeric)
+print("\nVariance Inflation Factors:")
+print(vif_values.sort_values(ascending=False))
+print("\nLargest condition index:", condition_indices(data_numeric)['condition_index'].iloc[0])
+kept_features, dropped_features = prune_collinear(data_numeric)
+print(f"\nFeatures dropped to bring every VIF under {VIF_THRESHOLD:g}:")
+print(dropped_features.to_string(index=False) if not dropped_features.empty else "None")
+
 
 # Remove the Rank column and save the changes
 data = data.drop(columns=['Rank'])
-data.to_csv('../data/dataset_04.csv', index=False)
\ No newline at end of file
+write_dataset(data, '../data/dataset_04.csv')
\ No newline at end of file
@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+def _numeric_block(data, columns):
+    if columns is None:
+        columns = [col for col in data.select_dtypes(include='number').columns if data[col].dtype != bool]
+    return list(columns), data[list(columns)].to_numpy(dtype=np.float64)
+
+
+def _pairwise_pearson(values):
+    """Pearson correlations and pairwise-complete counts of all column pairs from matrix products.
+
+    Columns are standardized first so the sums below stay well conditioned; every pair then
+    uses only the rows where both of its columns are present.
+    """
+    valid = ~np.isnan(values)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        center = np.nanmean(values, axis=0)
+        scale = np.nanstd(values, axis=0)
+    scaled = np.where(valid, (values - center) / np.where(scale > 0, scale, 1.0), 0.0)
+    mask = valid.astype(np.float64)
+
+    counts = mask.T @ mask
+    sums = scaled.T @ mask                  # sums[i, j]: sum of column i over rows where j is present
+    squares = (scaled ** 2).T @ mask
+    products = scaled.T @ scaled
+    with np.errstate(invalid='ignore', divide='ignore'):
+        covariance = products - sums * sums.T / counts
+        variance = squares - sums ** 2 / counts
+        r = covariance / np.sqrt(variance * variance.T)
+    return np.clip(r, -1, 1), counts
+
+
+def _ranks(values):
+    """Average ranks of every column, NaN staying NaN."""
+    return pd.DataFrame(values).rank(method='average').to_numpy()
+
+
+def _spearman(values):
+    """Spearman correlations of all column pairs, ranked within each pair's pairwise-complete rows.
+
+    Columns are ranked once and correlated with matrix products. That is exact for every pair
+    whose columns are missing on the same rows (all pairs when nothing is missing); the other
+    pairs are re-ranked over the rows they share, as DataFrame.corr does.
+    """
+    r, counts = _pairwise_pearson(_ranks(values))
+    valid = ~np.isnan(values)
+    for i in range(values.shape[1]):
+        for j in range(i + 1, values.shape[1]):
+            if np.array_equal(valid[:, i], valid[:, j]):
+                continue
+            both = valid[:, i] & valid[:, j]
+            if both.sum() > 1:
+                pair_r, _ = _pairwise_pearson(_ranks(values[np.ix_(both, [i, j])]))
+                r[i, j] = r[j, i] = pair_r[0, 1]
+    return r, counts
+
+
+def _kendall(values):
+    """Kendall tau-b of all column pairs over their pairwise-complete rows.
+
+    Each pair uses scipy's O(n log n) merge-sort count; a matrix-product formulation would need
+    all O(n^2) row pairs, which is far slower beyond a few thousand rows.
+    """
+    p = values.shape[1]
+    valid = ~np.isnan(values)
+    tau = np.full((p, p), np.nan)
+    for i in range(p):
+        for j in range(i + 1, p):
+            both = valid[:, i] & valid[:, j]
+            if both.sum() > 1:
+                tau[i, j] = tau[j, i] = stats.kendalltau(values[both, i], values[both, j]).statistic
+    pair_counts = valid.T.astype(np.float64) @ valid.astype(np.float64)
+    return tau, pair_counts
+
+
+def _pvalues(r, counts, method):
+    """Two-sided p-values for every entry: t-test for Pearson/Spearman, normal approximation for Kendall."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if method == 'kendall':
+            z = 3 * r * np.sqrt(counts * (counts - 1)) / np.sqrt(2 * (2 * counts + 5))
+            p = 2 * stats.norm.sf(np.abs(z))
+        else:
+            dof = counts - 2
+            t = r * np.sqrt(dof / np.clip(1 - r ** 2, 0, None))
+            p = 2 * stats.t.sf(np.abs(t), dof)
+    p = np.where(counts > 2, p, np.nan)
+    np.fill_diagonal(p, 0.0)
+    return p
+
+
+def correlation_matrix(data, columns=None, method='pearson', min_periods=1, return_details=False):
+    """Pearson, Spearman or Kendall correlation matrix of the numeric columns in one shot.
+
+    Missing values are handled pairwise (each pair uses the rows where both columns are present),
+    like DataFrame.corr; Spearman ranks every pair over its shared rows. With
+    return_details, also returns the pairwise observation counts and two-sided p-values.
+    """
+    columns, values = _numeric_block(data, columns)
+    if method == 'pearson':
+        r, counts = _pairwise_pearson(values)
+    elif method == 'spearman':
+        r, counts = _spearman(values)
+    elif method == 'kendall':
+        r, counts = _kendall(values)
+    else:
+        raise ValueError(f"Unknown correlation method: {method}")
+
+    r = np.where(counts >= max(min_periods, 1), r, np.nan)
+    np.fill_diagonal(r, np.where(np.diag(counts) >= max(min_periods, 1), 1.0, np.nan))
+    matrix = pd.DataFrame(r, index=columns, columns=columns)
+    if not return_details:
+        return matrix
+    counts_frame = pd.DataFrame(counts.astype(np.int64), index=columns, columns=columns)
+    pvalues = pd.DataFrame(_pvalues(r, counts, method), index=columns, columns=columns)
+    return matrix, counts_frame, pvalues
+
+
+def grouped_correlations(data, by, columns=None, method='pearson', min_periods=1):
+    """Correlation matrices per group (e.g. by='Region' or 'DataType'), stacked with a (group, column) index."""
+    columns, _ = _numeric_block(data, columns)
+    matrices = {key: correlation_matrix(rows, columns, method, min_periods)
+                for key, rows in data.groupby(by, observed=True, sort=True)}
+    return pd.concat(matrices, names=([by] if isinstance(by, str) else list(by)) + ['column'])
+
+
+def correlation_table(data, columns=None, method='pearson', min_periods=1):
+    """Tidy table of every column pair: correlation, pairwise count and p-value."""
+    matrix, counts, pvalues = correlation_matrix(data, columns, method, min_periods, return_details=True)
+    upper = np.triu(np.ones(matrix.shape, dtype=bool), k=1)
+    first, second = np.nonzero(upper)
+    return pd.DataFrame({'column_1': matrix.index[first], 'column_2': matrix.columns[second],
+                         'correlation': matrix.to_numpy()[upper], 'count': counts.to_numpy()[upper],
+                         'p_value': pvalues.to_numpy()[upper]})
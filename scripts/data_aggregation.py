@@ -1,249 +1,13 @@
 import pandas as pd
-
-country_to_region = {
-    'Afghanistan': 'Asia',
-    'Albania': 'Europe',
-    'Algeria': 'Africa',
-    'Andorra': 'Europe',
-    'Angola': 'Africa',
-    'Anguilla': 'North America',
-    'Antigua And Barbuda': 'North America',
-    'Argentina': 'South America',
-    'Armenia': 'Asia',
-    'Aruba': 'North America',
-    'Australia': 'Oceania',
-    'Austria': 'Europe',
-    'Azerbaijan': 'Asia',
-    'Bahamas': 'North America',
-    'Bahrain': 'Asia',
-    'Bangladesh': 'Asia',
-    'Barbados': 'North America',
-    'Belarus': 'Europe',
-    'Belgium': 'Europe',
-    'Belize': 'North America',
-    'Benin': 'Africa',
-    'Bermuda': 'North America',
-    'Bhutan': 'Asia',
-    'Bolivia': 'South America',
-    'Bosnia And Herzegovina': 'Europe',
-    'Botswana': 'Africa',
-    'Brazil': 'South America',
-    'British Virgin Islands': 'North America',
-    'Brunei': 'Asia',
-    'Bulgaria': 'Europe',
-    'Burkina Faso': 'Africa',
-    'Burundi': 'Africa',
-    'Cabo Verde': 'Africa',
-    'Cambodia': 'Asia',
-    'Cameroon': 'Africa',
-    'Canada': 'North America',
-    'Caribbean Netherlands': 'North America',
-    'Cayman Islands': 'North America',
-    'Central African Republic': 'Africa',
-    'Chad': 'Africa',
-    'Channel Islands': 'Europe',
-    'Chile': 'South America',
-    'China': 'Asia',
-    'Colombia': 'South America',
-    'Comoros': 'Africa',
-    'Congo': 'Africa',
-    'Cook Islands': 'Oceania',
-    'Costa Rica': 'North America',
-    'Cote D Ivoire': 'Africa',
-    'Croatia': 'Europe',
-    'Cuba': 'North America',
-    'Curaçao': 'North America',
-    'Cyprus': 'Asia',
-    'Czech Republic': 'Europe',
-    'Democratic Republic Of The Congo': 'Africa',
-    'Denmark': 'Europe',
-    'Djibouti': 'Africa',
-    'Dominica': 'North America',
-    'Dominican Republic': 'North America',
-    'Ecuador': 'South America',
-    'Egypt': 'Africa',
-    'El Salvador': 'North America',
-    'Equatorial Guinea': 'Africa',
-    'Eritrea': 'Africa',
-    'Estonia': 'Europe',
-    'Ethiopia': 'Africa',
-    'Faeroe Islands': 'Europe',
-    'Falkland Islands Malvinas': 'South America',
-    'Fiji': 'Oceania',
-    'Finland': 'Europe',
-    'France': 'Europe',
-    'French Guiana': 'South America',
-    'French Polynesia': 'Oceania',
-    'Gabon': 'Africa',
-    'Gambia': 'Africa',
-    'Georgia': 'Asia',
-    'Germany': 'Europe',
-    'Ghana': 'Africa',
-    'Gibraltar': 'Europe',
-    'Greece': 'Europe',
-    'Greenland': 'North America',
-    'Grenada': 'North America',
-    'Guadeloupe': 'North America',
-    'Guam': 'Oceania',
-    'Guatemala': 'North America',
-    'Guinea': 'Africa',
-    'Guinea Bissau': 'Africa',
-    'Guyana': 'South America',
-    'Haiti': 'North America',
-    'Holy See': 'Europe',
-    'Honduras': 'North America',
-    'Hong Kong': 'Asia',
-    'Hungary': 'Europe',
-    'Iceland': 'Europe',
-    'India': 'Asia',
-    'Indonesia': 'Asia',
-    'Iran': 'Asia',
-    'Iraq': 'Asia',
-    'Ireland': 'Europe',
-    'Isle Of Man': 'Europe',
-    'Israel': 'Asia',
-    'Italy': 'Europe',
-    'Jamaica': 'North America',
-    'Japan': 'Asia',
-    'Jordan': 'Asia',
-    'Kazakhstan': 'Asia',
-    'Kenya': 'Africa',
-    'Kiribati': 'Oceania',
-    'Kuwait': 'Asia',
-    'Kyrgyzstan': 'Asia',
-    'Laos': 'Asia',
-    'Latvia': 'Europe',
-    'Lebanon': 'Asia',
-    'Lesotho': 'Africa',
-    'Liberia': 'Africa',
-    'Libya': 'Africa',
-    'Liechtenstein': 'Europe',
-    'Lithuania': 'Europe',
-    'Luxembourg': 'Europe',
-    'Macao': 'Asia',
-    'Madagascar': 'Africa',
-    'Malawi': 'Africa',
-    'Malaysia': 'Asia',
-    'Maldives': 'Asia',
-    'Mali': 'Africa',
-    'Malta': 'Europe',
-    'Marshall Islands': 'Oceania',
-    'Martinique': 'North America',
-    'Mauritania': 'Africa',
-    'Mauritius': 'Africa',
-    'Mayotte': 'Africa',
-    'Mexico': 'North America',
-    'Micronesia': 'Oceania',
-    'Moldova': 'Europe',
-    'Monaco': 'Europe',
-    'Mongolia': 'Asia',
-    'Montenegro': 'Europe',
-    'Montserrat': 'North America',
-    'Morocco': 'Africa',
-    'Mozambique': 'Africa',
-    'Myanmar': 'Asia',
-    'Namibia': 'Africa',
-    'Nauru': 'Oceania',
-    'Nepal': 'Asia',
-    'Netherlands': 'Europe',
-    'New Caledonia': 'Oceania',
-    'New Zealand': 'Oceania',
-    'Nicaragua': 'North America',
-    'Niger': 'Africa',
-    'Nigeria': 'Africa',
-    'Niue': 'Oceania',
-    'North Korea': 'Asia',
-    'North Macedonia': 'Europe',
-    'Northern Mariana Islands': 'Oceania',
-    'Norway': 'Europe',
-    'Oman': 'Asia',
-    'Pakistan': 'Asia',
-    'Palau': 'Oceania',
-    'Panama': 'North America',
-    'Papua New Guinea': 'Oceania',
-    'Paraguay': 'South America',
-    'Peru': 'South America',
-    'Philippines': 'Asia',
-    'Poland': 'Europe',
-    'Portugal': 'Europe',
-    'Puerto Rico': 'North America',
-    'Qatar': 'Asia',
-    'Reunion': 'Africa',
-    'Romania': 'Europe',
-    'Russia': 'Europe',
-    'Rwanda': 'Africa',
-    'Saint Barthelemy': 'North America',
-    'Saint Helena': 'Africa',
-    'Saint Kitts And Nevis': 'North America',
-    'Saint Lucia': 'North America',
-    'Saint Martin': 'North America',
-    'Saint Pierre And Miquelon': 'North America',
-    'Saint Vincent And The Grenadines': 'North America',
-    'Samoa': 'Oceania',
-    'San Marino': 'Europe',
-    'Sao Tome And Principe': 'Africa',
-    'Saudi Arabia': 'Asia',
-    'Senegal': 'Africa',
-    'Serbia': 'Europe',
-    'Seychelles': 'Africa',
-    'Sierra Leone': 'Africa',
-    'Singapore': 'Asia',
-    'Sint Maarten': 'North America',
-    'Slovakia': 'Europe',
-    'Slovenia': 'Europe',
-    'Solomon Islands': 'Oceania',
-    'Somalia': 'Africa',
-    'South Africa': 'Africa',
-    'South Korea': 'Asia',
-    'South Sudan': 'Africa',
-    'Spain': 'Europe',
-    'Sri Lanka': 'Asia',
-    'State Of Palestine': 'Asia',
-    'Sudan': 'Africa',
-    'Suriname': 'South America',
-    'Swaziland': 'Africa',
-    'Sweden': 'Europe',
-    'Switzerland': 'Europe',
-    'Syria': 'Asia',
-    'Taiwan': 'Asia',
-    'Tajikistan': 'Asia',
-    'Tanzania': 'Africa',
-    'Thailand': 'Asia',
-    'Timor Leste': 'Asia',
-    'Togo': 'Africa',
-    'Tokelau': 'Oceania',
-    'Tonga': 'Oceania',
-    'Trinidad And Tobago': 'North America',
-    'Tunisia': 'Africa',
-    'Turkey': 'Asia',
-    'Turkmenistan': 'Asia',
-    'Turks And Caicos Islands': 'North America',
-    'Tuvalu': 'Oceania',
-    'Uganda': 'Africa',
-    'Ukraine': 'Europe',
-    'United Arab Emirates': 'Asia',
-    'United Kingdom': 'Europe',
-    'United States': 'North America',
-    'United States Virgin Islands': 'North America',
-    'Uruguay': 'South America',
-    'Uzbekistan': 'Asia',
-    'Vanuatu': 'Oceania',
-    'Venezuela': 'South America',
-    'Vietnam': 'Asia',
-    'Wallis And Futuna Islands': 'Oceania',
-    'Western Sahara': 'Africa',
-    'Yemen': 'Asia',
-    'Zambia': 'Africa',
-    'Zimbabwe': 'Africa'
-}
+from reference_data import attach_regions
 
 def aggregate_data(data):
 
     # Map countries to their respective regions
-    data['Region'] = data['country'].map(country_to_region)
+    data = attach_regions(data)
 
     # Perform aggregation by region, year, and data type
-    region_yearly_aggregated_data = data.groupby(['Region', 'Year', 'DataType']).agg({
+    region_yearly_aggregated_data = data.groupby(['Region', 'Year', 'DataType'], observed=True).agg({
         'Population': 'mean',              
         'Yearly %   Change': 'mean',        
         'Yearly  Change': 'mean',         
@@ -1,9 +1,10 @@
 import pandas as pd
+from data_preprocessing import read_options
 
 def collect_data():
     """Collect and merge population data from historical and forecasted datasets."""
-    population_df = pd.read_csv('../data/original_world-population.csv')
-    forecast_df = pd.read_csv('../data/original_world-forecast.csv')
+    population_df = pd.read_csv('../data/original_world-population.csv', **read_options())
+    forecast_df = pd.read_csv('../data/original_world-forecast.csv', **read_options())
 
     population_df['DataType'] = 'Historical'
     forecast_df['DataType'] = 'Forecasted'
@@ -1,63 +1,119 @@
 import pandas as pd
 import numpy as np
 
+# Column schema: (name, source format, target dtype, null tokens, scale, coerce)
+# 'percent' columns hold strings like '2.33 %', 'number' columns hold plain numbers; parsed values are divided by scale.
+# With coerce, any other token that is not a number becomes NaN instead of raising (Urban Population has stray ones)
+COLUMN_SCHEMA = [
+    ('Population', 'number', 'int64', (), 1, False),
+    ('Year', 'number', 'int64', (), 1, False),
+    ('Yearly %   Change', 'percent', 'float64', ('N.A.',), 100, False),
+    ('Yearly  Change', 'number', 'float64', ('N.A.',), 1, False),
+    ('Migrants (net)', 'number', 'float64', (' ',), 1, False),
+    ('Median Age', 'number', 'float64', (' ',), 1, False),
+    ('Fertility Rate', 'number', 'float64', (' ',), 1, False),
+    ('Density (P/Km²)', 'number', 'int64', (), 1, False),
+    ('Urban  Pop %', 'percent', 'float64', ('N.A.',), 100, False),
+    ('Urban Population', 'number', 'float64', ('N.A.', ' '), 1, True),
+    ("Country's Share of  World Pop", 'percent', 'float64', ('N.A.',), 100, False),
+    ('World Population', 'number', 'int64', (), 1, False),
+    ('Rank', 'number', 'int64', (), 1, False),
+    ('country', 'text', 'str', (), 1, False),
+    ('DataType', 'text', 'str', (), 1, False),
+]
+
+def read_options():
+    """Keyword arguments for pd.read_csv that turn the schema's null tokens into NaN while parsing,
+    so that plain numeric columns are read directly as numbers."""
+    return {'na_values': {name: list(null_tokens) for name, _, _, null_tokens, _, _ in COLUMN_SCHEMA if null_tokens}}
+
+def parse_column(column, source_format, dtype, null_tokens, scale, coerce=False):
+    """Convert one raw column to its target dtype in a single vectorized step."""
+    if source_format == 'text':
+        return column.astype(dtype)
+    if not pd.api.types.is_numeric_dtype(column):
+        column = column.where(~column.isin(null_tokens))
+        if source_format == 'percent':
+            column = column.str.rstrip(' %')
+        column = pd.to_numeric(column, errors='coerce' if coerce else 'raise')
+        if scale != 1:
+            column = column / scale
+    return column.astype(dtype)
+
 def set_column_data_types(data):
     """Set data types for specific columns and clean percentage columns."""
-    # Convert population and integer columns
-    data['Population'] = data['Population'].astype(int)
-    data['Year'] = data['Year'].astype(int)
-    data['Density (P/Km²)'] = data['Density (P/Km²)'].astype(int)
-    data['World Population'] = data['World Population'].astype(int)
-    data['Rank'] = data['Rank'].astype(int)
-    
-    # Clean percentage columns and convert to float
-    if 'Yearly %   Change' in data.columns:
-        data['Yearly %   Change'] = data['Yearly %   Change'].str.replace('%', '').replace('N.A.', np.nan).astype(float) / 100
-    if 'Yearly  Change' in data.columns:
-        data['Yearly  Change'] = data['Yearly  Change'].replace('N.A.', np.nan).astype(float)
-    
-    data['Urban  Pop %'] = data['Urban  Pop %'].str.replace('%', '').replace('N.A.', np.nan).astype(float) / 100
-    data["Country's Share of  World Pop"] = data["Country's Share of  World Pop"].str.replace('%', '').replace('N.A.', np.nan).astype(float) / 100
-    
-    # Replace empty strings or spaces with NaN for certain columns
-    data['Migrants (net)'] = data['Migrants (net)'].replace(' ', np.nan).astype(float)
-    data['Median Age'] = data['Median Age'].replace(' ', np.nan).astype(float)
-    data['Fertility Rate'] = data['Fertility Rate'].replace(' ', np.nan).astype(float)
-    data['Urban Population'] = pd.to_numeric(data['Urban Population'].replace(' ', np.nan), errors='coerce')
-    
-    # Set object types for string columns
-    data['country'] = data['country'].astype(str)
-    data['DataType'] = data['DataType'].astype(str)
+    for name, *spec in COLUMN_SCHEMA:
+        if name in data.columns:
+            data[name] = parse_column(data[name], *spec)
     
     return data
 
-def remove_duplicates(data):
-    # Sort data to prioritize rows with fewer missing values
-    data_sorted = data.sort_values(by=data.columns.tolist(), ascending=False, na_position='last')
-    
-    initial_duplicate_count = data_sorted.duplicated(subset=['country', 'Year', 'DataType']).sum()
-    data_no_duplicates = data_sorted.drop_duplicates(subset=['country', 'Year', 'DataType'], keep='first')
-    
-    final_duplicate_count = data_no_duplicates.duplicated(subset=['country', 'Year', 'DataType']).sum()
+def remove_duplicates(data, return_discarded=False):
+    """Keep one row per 'country', 'Year' and 'DataType', preferring the row with the fewest missing values.
+
+    With `return_discarded=True` the dropped rows are returned as well.
+    """
+    key_columns = ['country', 'Year', 'DataType']
+
+    # Rank rows by completeness and pick the most complete row of each key with a hash-based grouped argmax
+    completeness = pd.Series(data.notna().sum(axis=1).to_numpy())
+    keys = [data[col].to_numpy() for col in key_columns]
+    winners = completeness.groupby(keys, sort=False, dropna=False).idxmax().to_numpy()
+
+    keep = np.zeros(len(data), dtype=bool)
+    keep[winners] = True
+    data_no_duplicates = data[keep]
+    discarded = data[~keep]
+
+    final_duplicate_count = data_no_duplicates.duplicated(subset=key_columns).sum()
     print(f"Number of duplicates after removal: {final_duplicate_count}")
     
+    if return_discarded:
+        return data_no_duplicates, discarded
     return data_no_duplicates
 
-def fill_missing_values(data):
-    """Fill missing values based on column and group level logic, with consideration for DataType."""
+def fill_missing_values(data, return_report=False, global_medians=None):
+    """Fill missing values based on column and group level logic, with consideration for DataType.
+
+    With `return_report=True` a table with the number of cells each strategy filled per column
+    is returned as well. `global_medians` overrides the last-resort medians, which are otherwise
+    computed from `data` (pass {} to skip that step, e.g. when filling one partition at a time).
+    """
     
     # Columns that will be filled with the median by 'country' and 'DataType' to avoid mixing Forecasted and Historical data
     datatype_fill_columns = ['Migrants (net)', 'Median Age', 'Fertility Rate', 'Urban  Pop %', 'Urban Population']
-    
-   # 1. Estimate 'Urban Population' based on 'Population' and 'Urban Pop %' if still missing
+    group_keys = ['country', 'DataType']
+    report = {}
+
+    def track(strategy, before):
+        report[strategy] = before.sum() - data[datatype_fill_columns].isna().sum()
+
+    # 1. Estimate 'Urban Population' based on 'Population' and 'Urban Pop %' if still missing
+    missing = data[datatype_fill_columns].isna()
     data['Urban Population'] = data['Urban Population'].fillna(data['Population'] * data['Urban  Pop %'])
+    track('urban_estimate', missing)
+
+    # 2. Fill columns with the median by 'country' and 'DataType', all columns in one grouped pass
+    missing = data[datatype_fill_columns].isna()
+    grouped = data.groupby(group_keys, sort=False, observed=True)
+    data[datatype_fill_columns] = data[datatype_fill_columns].fillna(grouped[datatype_fill_columns].transform('median'))
+    track('group_median', missing)
 
-    # 2. Fill columns with median by 'country' and 'DataType'
-    for col in datatype_fill_columns:
-        data[col] = data.groupby(['country', 'DataType'])[col].transform(lambda x: x.fillna(x.median()) if x.notnull().any() else x)
-    
     # 3. Forward-fill and backward-fill within each 'country' and 'DataType' for remaining missing values
-    data[datatype_fill_columns] = data.groupby(['country', 'DataType'])[datatype_fill_columns].ffill().bfill()
-    
-    return data
+    missing = data[datatype_fill_columns].isna()
+    grouped = data.groupby(group_keys, sort=False, observed=True)
+    data[datatype_fill_columns] = grouped[datatype_fill_columns].ffill()
+    grouped = data.groupby(group_keys, sort=False, observed=True)
+    data[datatype_fill_columns] = grouped[datatype_fill_columns].bfill()
+    track('group_ffill_bfill', missing)
 
+    # 4. Global median as a last resort for groups with no values at all
+    missing = data[datatype_fill_columns].isna()
+    if global_medians is None:
+        global_medians = data[datatype_fill_columns].median()
+    data[datatype_fill_columns] = data[datatype_fill_columns].fillna(global_medians)
+    track('global_median', missing)
+
+    if return_report:
+        return data, pd.DataFrame(report)
+    return data
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+from binary_vectors import pack_bits, packed_tile
+
+METRICS = ('euclidean', 'minkowski', 'smc', 'jaccard')
+
+# Memory budget of one tile and its temporaries; tile heights are derived from it
+TILE_MEMORY_MB = 64
+
+
+def country_vectors(data, features, by='country', year=None, standardize=True):
+    """One feature vector per country (mean over its rows), or per country-year row when `by` is None.
+
+    Features are z-scored by default so that Population does not dominate every distance.
+    """
+    if year is not None:
+        data = data[data['Year'] == year]
+    vectors = data.groupby(by)[list(features)].mean() if by is not None else data[list(features)]
+    vectors = vectors.dropna()
+    if standardize:
+        vectors = (vectors - vectors.mean()) / vectors.std(ddof=0).replace(0, 1)
+    return vectors
+
+
+def _tile_rows(n_columns, n_features, metric, dtype, memory_mb):
+    """Rows per tile so the tile and its temporaries stay inside the memory budget."""
+    itemsize = np.dtype(dtype).itemsize
+    # Minkowski broadcasts a rows x columns x features difference array, the binary metrics a
+    # rows x columns x words one; Euclidean needs a few rows x columns arrays
+    if metric == 'minkowski':
+        per_row = n_columns * n_features * itemsize
+    elif metric in ('smc', 'jaccard'):
+        per_row = n_columns * (3 * n_features * 8 + 4 * itemsize)
+    else:
+        per_row = n_columns * 4 * itemsize
+    return max(1, int(memory_mb * 1024 * 1024 / max(per_row, 1)))
+
+
+def _euclidean_tile(A, B, B_squared):
+    # ||a - b||^2 = ||a||^2 + ||b||^2 - 2 a.b, the cross term as one BLAS matrix product
+    squared = (A ** 2).sum(axis=1)[:, None] + B_squared[None, :] - 2 * (A @ B.T)
+    return np.sqrt(np.clip(squared, 0, None, out=squared), out=squared)
+
+
+def _minkowski_tile(A, B, p):
+    difference = np.abs(A[:, None, :] - B[None, :, :])
+    if np.isinf(p):
+        return difference.max(axis=2)
+    return (difference ** p).sum(axis=2) ** (1 / p)
+
+
+def iter_tiles(X, Y=None, metric='euclidean', p=2, dtype=np.float64, memory_mb=TILE_MEMORY_MB):
+    """Yield (start, end, tile): rows start:end of the pairwise matrix between the rows of X and Y.
+
+    Euclidean tiles are matrix products (BLAS); Minkowski-p broadcasts within the tile. SMC and
+    Jaccard are similarities over the features thresholded at 0, bit-packed and counted with
+    popcount over whole words.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric '{metric}', expected one of {METRICS}")
+    X = np.asarray(X, dtype=np.float64)
+    Y = X if Y is None else np.asarray(Y, dtype=np.float64)
+    if metric in ('smc', 'jaccard'):
+        (X, n_flags), (Y, _) = pack_bits(X), pack_bits(Y)
+    else:
+        # Centering first limits the cancellation of the squared-norm form, which matters in float32
+        center = Y.mean(axis=0)
+        X, Y = (X - center).astype(dtype), (Y - center).astype(dtype)
+        Y_extra = (Y ** 2).sum(axis=1)
+
+    rows = _tile_rows(len(Y), Y.shape[1], metric, dtype, memory_mb)
+    for start in range(0, len(X), rows):
+        A = X[start:start + rows]
+        if metric == 'euclidean':
+            tile = _euclidean_tile(A, Y, Y_extra)
+        elif metric == 'minkowski':
+            tile = _minkowski_tile(A, Y, p)
+        else:
+            tile = packed_tile(A, Y, metric, n_flags).astype(dtype)
+        yield start, start + len(A), tile
+
+
+def pairwise_matrix(X, Y=None, metric='euclidean', p=2, dtype=np.float64, out=None, memory_mb=TILE_MEMORY_MB):
+    """Full pairwise distance (Euclidean, Minkowski-p) or similarity (SMC, Jaccard) matrix.
+
+    The matrix is filled tile by tile, so only one tile of temporaries is alive at a time. `out`
+    may be an array or the path of a .npy file, which is then written as a memory map so
+    matrices larger than memory go straight to disk. A DataFrame X gives a labelled DataFrame
+    when the result is held in memory. Pass dtype=np.float32 to halve the size of very large
+    (e.g. memory-mapped country-year) matrices, at about 1e-4 relative error.
+    """
+    n_rows, n_columns = len(X), len(X if Y is None else Y)
+    if isinstance(out, str):
+        out = np.lib.format.open_memmap(out, mode='w+', dtype=dtype, shape=(n_rows, n_columns))
+    elif out is None:
+        out = np.empty((n_rows, n_columns), dtype=dtype)
+
+    for start, end, tile in iter_tiles(X, Y, metric, p, dtype, memory_mb):
+        out[start:end] = tile
+    if metric == 'euclidean' and Y is None:
+        # Exact zeros on the diagonal; the squared-norm form leaves rounding noise there
+        np.fill_diagonal(out, 0)
+    if isinstance(out, np.memmap):
+        out.flush()
+        return out
+    if isinstance(X, pd.DataFrame):
+        return pd.DataFrame(out, index=X.index, columns=(X if Y is None else Y).index)
+    return out
+
+
+def nearest_pairs(matrix, n=5, similarity=False):
+    """The n closest distinct pairs (i < j) of a square labelled matrix."""
+    values = matrix.to_numpy(dtype=np.float64)
+    upper = np.triu_indices(len(values), k=1)
+    order = np.argsort(-values[upper] if similarity else values[upper], kind='stable')[:n]
+    return pd.DataFrame({'first': matrix.index[upper[0][order]], 'second': matrix.columns[upper[1][order]],
+                         'value': values[upper][order]})
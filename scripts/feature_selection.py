@@ -1,8 +1,12 @@
+import sys
 import pandas as pd
+from storage import read_dataset, write_dataset
+from parallel_features import parallel_feature_engineering
+from rolling_windows import grouped_rolling
 
 def load_data(file_path):
     """Load the entire dataset without dropping any columns."""
-    data = pd.read_csv(file_path)
+    data = read_dataset(file_path)
     data['Year'] = pd.to_numeric(data['Year'], errors='coerce')
     data['Population'] = pd.to_numeric(data['Population'], errors='coerce')
     data['Median Age'] = pd.to_numeric(data['Median Age'], errors='coerce')
@@ -16,8 +20,14 @@ def feature_selection(data):
     selected_data.fillna(0, inplace=True)
     return selected_data
 
-def feature_engineering(selected_data):
-    """Engineer new properties to enhance analysis on the selected subset."""
+def feature_engineering(selected_data, workers=1):
+    """Engineer new properties to enhance analysis on the selected subset.
+
+    With `workers` > 1 the per-country features are computed in a process pool instead.
+    """
+    if workers > 1:
+        return parallel_feature_engineering(selected_data, workers)
+
     # Population growth rate
     selected_data['Annual_Population_Growth'] = selected_data.groupby('country')['Population'].pct_change().fillna(0)
 
@@ -28,26 +38,27 @@ def feature_engineering(selected_data):
     selected_data['Dependency_Ratio'] = selected_data['Population'] * (selected_data['Median Age'] / 100)
     selected_data['Dependency_Ratio'] = selected_data['Dependency_Ratio'] / (selected_data['Population'] - selected_data['Dependency_Ratio'])
 
-    # Rolling average for Population with index alignment
-    selected_data['3_Year_Pop_Avg'] = selected_data.groupby('country')['Population'].apply(lambda x: x.rolling(window=3, min_periods=1).mean()).reset_index(level=0, drop=True).fillna(0)
+    # Rolling average for Population within each country
+    selected_data['3_Year_Pop_Avg'] = grouped_rolling(selected_data, ['Population'], [3])['Population_mean_3'].fillna(0)
 
     return selected_data
 
-def save_to_csv(original_data, selected_data, output_file_path):
+def save_dataset(original_data, selected_data, output_file_path):
     engineered_data = original_data.copy()
     for column in ['Annual_Population_Growth', 'Migration_Rate', 'Dependency_Ratio', '3_Year_Pop_Avg']:
         engineered_data[column] = selected_data[column]
     
-    engineered_data.to_csv(output_file_path, index=False)
+    write_dataset(engineered_data, output_file_path)
     print(f"File saved to {output_file_path}")
 
-def main():
+def main(workers=1):
     file_path = '../data/dataset_02.csv'
     data = load_data(file_path)
     selected_data = feature_selection(data)
-    selected_data = feature_engineering(selected_data)
+    selected_data = feature_engineering(selected_data, workers)
     output_file_path = '../data/dataset_03.csv'
-    save_to_csv(data, selected_data, output_file_path)
+    save_dataset(data, selected_data, output_file_path)
 
 if __name__ == "__main__":
-    main()
+    # python feature_selection.py --workers 4
+    main(workers=int(sys.argv[sys.argv.index('--workers') + 1]) if '--workers' in sys.argv else 1)
@@ -0,0 +1,157 @@
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.decomposition import IncrementalPCA
+from sklearn.preprocessing import StandardScaler
+
+MODELS_PATH = '../processed/models/multivariate_incremental.joblib'
+
+# Rows per chunk; every model only ever sees one chunk at a time
+CHUNK_ROWS = 10_000
+
+# Rows sampled across all chunks to place the new center of each warm-started k
+SEED_ROWS = 5_000
+
+
+def iter_chunks(data, columns, chunk_rows=CHUNK_ROWS):
+    """Float chunks of the selected columns; a chunk too small to fit on its own is merged into the previous one."""
+    starts = list(range(0, len(data), chunk_rows))
+    if len(starts) > 1 and len(data) - starts[-1] < chunk_rows // 2:
+        starts.pop()
+    bounds = starts[1:] + [len(data)]
+    for start, end in zip(starts, bounds):
+        yield data[columns].iloc[start:end].to_numpy(dtype=np.float64)
+
+
+def _next_center(centers, seed_rows, rng, n_candidates=8):
+    """Greedy k-means++ step: of a few seed rows sampled by squared distance, the one lowering the potential most."""
+    distances = ((seed_rows[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+    # When every seed row already sits on a center, any row is as good as another
+    total = distances.sum()
+    candidates = rng.choice(len(seed_rows), size=n_candidates, p=distances / total if total > 0 else None)
+    to_candidates = ((seed_rows[:, None, :] - seed_rows[candidates][None, :, :]) ** 2).sum(axis=2)
+    potentials = np.minimum(distances[:, None], to_candidates).sum(axis=0)
+    return seed_rows[candidates[np.argmin(potentials)]]
+
+
+def _chunk_seed_rows(chunk, n_rows, rng, seed_rows=SEED_ROWS):
+    """Random rows of a chunk, in proportion to its share of all n_rows, so the seed sample spans every chunk."""
+    n_seed = min(len(chunk), int(np.ceil(seed_rows * len(chunk) / n_rows)))
+    return chunk[np.sort(rng.choice(len(chunk), n_seed, replace=False))]
+
+
+def _partial_fit_models(models, data, chunk_rows):
+    """One pass over the chunks updating the PCA and every KMeans model in place."""
+    for chunk in iter_chunks(data, models['columns'], chunk_rows):
+        scaled = models['scaler'].transform(chunk)
+        if len(scaled) >= models['pca'].n_components:
+            models['pca'].partial_fit(scaled)
+        for kmeans in models['kmeans'].values():
+            kmeans.partial_fit(scaled)
+
+
+def _inertia(models, data, chunk_rows):
+    """Sum of squared distances to the closest center for every k, in one pass over the chunks."""
+    inertia = {k: 0.0 for k in models['kmeans']}
+    for chunk in iter_chunks(data, models['columns'], chunk_rows):
+        scaled = models['scaler'].transform(chunk)
+        for k, kmeans in models['kmeans'].items():
+            inertia[k] -= kmeans.score(scaled)
+    return inertia
+
+
+def fit_incremental_models(data, columns, n_components=3, k_values=range(1, 11), chunk_rows=CHUNK_ROWS,
+                           passes=3, random_state=42):
+    """Fit a scaler, IncrementalPCA and a MiniBatchKMeans per k from chunks of `data`.
+
+    Each k starts from the centers of k - 1 plus one new center placed k-means++ style, so the
+    elbow curve is built from one chain of warm starts instead of independent refits.
+    """
+    columns = list(columns)
+    rng = np.random.default_rng(random_state)
+    scaler = StandardScaler()
+    seed_rows = []
+    for chunk in iter_chunks(data, columns, chunk_rows):
+        scaler.partial_fit(chunk)
+        seed_rows.append(_chunk_seed_rows(chunk, len(data), rng))
+    seed_rows = scaler.transform(np.vstack(seed_rows))
+
+    models = {'columns': columns, 'scaler': scaler, 'pca': IncrementalPCA(n_components=n_components), 'kmeans': {}}
+    centers = seed_rows.mean(axis=0, keepdims=True)
+    for k in k_values:
+        while len(centers) < k:
+            centers = np.vstack([centers, _next_center(centers, seed_rows, rng)])
+        kmeans = MiniBatchKMeans(n_clusters=k, init=centers[:k], n_init=1, batch_size=chunk_rows,
+                                 random_state=random_state)
+        models['kmeans'][k] = kmeans
+        for _ in range(passes):
+            for chunk in iter_chunks(data, columns, chunk_rows):
+                kmeans.partial_fit(scaler.transform(chunk))
+        centers = kmeans.cluster_centers_
+
+    for chunk in iter_chunks(data, columns, chunk_rows):
+        scaled = scaler.transform(chunk)
+        if len(scaled) >= n_components:
+            models['pca'].partial_fit(scaled)
+    models['inertia'] = _inertia(models, data, chunk_rows)
+    return models
+
+
+def update_incremental_models(models, data, new_rows=None, chunk_rows=CHUNK_ROWS):
+    """Fold the `new_rows` of `data` (a boolean mask; all rows by default) into fitted models with
+    one partial-fit pass; the inertia is recomputed over all rows.
+
+    Rows the models already saw must not be passed again, or they would count twice. The scaler
+    is kept as fitted so that the PCA axes and cluster centers stay comparable across vintages.
+    """
+    _partial_fit_models(models, data if new_rows is None else data[np.asarray(new_rows)], chunk_rows)
+    models['inertia'] = _inertia(models, data, chunk_rows)
+    return models
+
+
+def transform(models, data, chunk_rows=CHUNK_ROWS):
+    """Scaled data, PCA projection and cluster labels of every k, computed chunk by chunk."""
+    scaled, projected, labels = [], [], {k: [] for k in models['kmeans']}
+    for chunk in iter_chunks(data, models['columns'], chunk_rows):
+        chunk = models['scaler'].transform(chunk)
+        scaled.append(chunk)
+        projected.append(models['pca'].transform(chunk))
+        for k, kmeans in models['kmeans'].items():
+            labels[k].append(kmeans.predict(chunk))
+    return np.vstack(scaled), np.vstack(projected), {k: np.concatenate(parts) for k, parts in labels.items()}
+
+
+def row_hashes(data, columns, keys=None):
+    """Hash of every row's values, indexed by its key columns (the data's own index by default)."""
+    hashes = pd.util.hash_pandas_object(data[list(columns)], index=False)
+    hashes.index = pd.MultiIndex.from_frame(data[list(keys)]) if keys is not None else data.index
+    return hashes
+
+
+def load_or_fit_models(data, columns, path=MODELS_PATH, refit=False, keys=None, **fit_params):
+    """Persisted models for `data`: reused as-is for the same data, partially fitted on the rows
+    that are new since they were saved, or fitted from scratch when missing, built on other
+    columns, when rows they saw changed or disappeared, or when refit is requested.
+
+    Rows are matched by `keys` (e.g. ['country', 'DataType', 'Year']), so a new yearly vintage is
+    recognized wherever its rows land in the sort order; without keys the data's index is used.
+    """
+    hashes = row_hashes(data, columns, keys)
+    models = joblib.load(path) if os.path.exists(path) and not refit else None
+    seen = models.get('row_hashes') if models is not None and models['columns'] == list(columns) else None
+    if seen is not None and hashes.index.is_unique and seen.index.isin(hashes.index).all() \
+            and (hashes.reindex(seen.index) == seen).all():
+        new_rows = ~hashes.index.isin(seen.index)
+        if not new_rows.any():
+            return models
+        models = update_incremental_models(models, data, new_rows)
+    else:
+        models = fit_incremental_models(data, columns, **fit_params)
+    models['row_hashes'] = hashes
+    models['n_rows'] = len(data)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    joblib.dump(models, path)
+    return models
@@ -1,25 +1,39 @@
+import sys
+
 from data_collection import collect_data
 from data_preprocessing import set_column_data_types, remove_duplicates, fill_missing_values
 from data_aggregation import aggregate_data
+from aggregation_cube import build_and_save_cube
 from data_sampling import sample_data
 from correlation_analysis import calculate_correlation
+from reference_data import attach_regions, COUNTRY_REFERENCE_FILE
+from stage_cache import run_stage, run_directory_stage, save_stage_output, print_cache_report
 import pandas as pd
 
+# Pass --force to recompute every stage even when its inputs did not change
+force = '--force' in sys.argv
+
 # Step 1: Data Collection
-data = collect_data()
+data = run_stage('collect_data', collect_data, force=force,
+                 files=['../data/original_world-population.csv', '../data/original_world-forecast.csv'])
 
 # Step 2: Data Preprocessing
-data = set_column_data_types(data)
-data = remove_duplicates(data)
-data = fill_missing_values(data)
-data.to_csv('../processed/preprocessed_data.csv', index=False)
+data = run_stage('set_column_data_types', set_column_data_types, data, force=force)
+data = run_stage('remove_duplicates', remove_duplicates, data, force=force)
+data = run_stage('fill_missing_values', fill_missing_values, data, force=force)
+save_stage_output(data, '../processed/preprocessed_data.csv', 'fill_missing_values')
 
 # Step 3: Aggregation by Region and Year
-aggregated_data = aggregate_data(data)
-aggregated_data.to_csv('../processed/regional_migration_forecast.csv', index=False)
+aggregated_data = run_stage('aggregate_data', aggregate_data, data, files=[COUNTRY_REFERENCE_FILE], force=force)
+save_stage_output(aggregated_data, '../processed/regional_migration_forecast.csv', 'aggregate_data')
 
-# Step 4: Sampling
-sampled_data = sample_data(data)
-sampled_data.to_csv('../processed/sampled_data.csv', index=False)
+# Materialize every Region/country/Year/DataType rollup for query_cube
+run_directory_stage('aggregation_cube', build_and_save_cube, data, output_dir='../processed/aggregation_cube',
+                    files=[COUNTRY_REFERENCE_FILE], force=force)
 
+# Step 4: Sampling
+data = attach_regions(data)
+sampled_data = run_stage('sample_data', sample_data, data, force=force)
+save_stage_output(sampled_data, '../processed/sampled_data.csv', 'sample_data')
 
+print_cache_report()
@@ -0,0 +1,163 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sklearn.neighbors import NearestNeighbors
+
+# Neighbours each synthetic sample may interpolate towards (SMOTE's k_neighbors)
+K_NEIGHBORS = 5
+
+# Synthetic rows generated per batch; memory grows with this, not with the total to generate
+BATCH_ROWS = 10_000
+
+
+def sampling_targets(y):
+    """Synthetic rows needed per class to bring every class up to the size of the largest one."""
+    counts = pd.Series(y).value_counts(sort=False)
+    counts = counts[counts > 0]
+    return (counts.max() - counts).to_dict()
+
+
+def _oversampled_classes(y):
+    """sampling_targets of the classes that get synthetic rows. A class with a single row has no
+    neighbour to interpolate towards, so it is passed through unchanged, as are balanced classes."""
+    counts = pd.Series(y).value_counts(sort=False)
+    return {label: n for label, n in sampling_targets(y).items() if n > 0 and counts[label] >= 2}
+
+
+class ClassSampler:
+    """SMOTE generator for the rows of one class.
+
+    The KD-tree is built and queried once, so every batch only draws random base rows,
+    neighbours and gaps and interpolates them in one vectorized step.
+    """
+
+    def __init__(self, X, k_neighbors=K_NEIGHBORS, random_state=42):
+        self.X = np.asarray(X, dtype=np.float64)
+        self.k = min(k_neighbors, len(self.X) - 1)
+        if self.k < 1:
+            raise ValueError("SMOTE needs at least 2 rows in a class")
+        index = NearestNeighbors(n_neighbors=self.k + 1, algorithm='kd_tree').fit(self.X)
+        # The first neighbour of every row is the row itself
+        self.neighbours = index.kneighbors(self.X, return_distance=False)[:, 1:]
+        self.rng = np.random.default_rng(random_state)
+
+    def sample(self, n_samples):
+        """n_samples synthetic rows, each on the segment between a random row and one of its neighbours."""
+        base = self.rng.integers(len(self.X), size=n_samples)
+        neighbour = self.neighbours[base, self.rng.integers(self.k, size=n_samples)]
+        gaps = self.rng.random((n_samples, 1))
+        return self.X[base] + gaps * (self.X[neighbour] - self.X[base])
+
+    def batches(self, n_samples, batch_rows=BATCH_ROWS):
+        """Generator of the n_samples synthetic rows in arrays of at most batch_rows."""
+        for start in range(0, n_samples, batch_rows):
+            yield self.sample(min(batch_rows, n_samples - start))
+
+
+def iter_synthetic(X, y, k_neighbors=K_NEIGHBORS, batch_rows=BATCH_ROWS, random_state=42):
+    """Stream the synthetic rows that balance `y`, class by class, as (X_batch, y_batch) pairs."""
+    X, y = np.asarray(X, dtype=np.float64), np.asarray(y)
+    for i, (label, n_samples) in enumerate(_oversampled_classes(y).items()):
+        sampler = ClassSampler(X[y == label], k_neighbors, random_state + i)
+        for batch in sampler.batches(n_samples, batch_rows):
+            yield batch, np.full(len(batch), label, dtype=y.dtype)
+
+
+def _synthetic_for_class(X_class, n_samples, k_neighbors, batch_rows, random_state):
+    return np.vstack(list(ClassSampler(X_class, k_neighbors, random_state).batches(n_samples, batch_rows)))
+
+
+def smote_resample(X, y, k_neighbors=K_NEIGHBORS, batch_rows=BATCH_ROWS, workers=None, random_state=42):
+    """Balanced copy of (X, y): the original rows followed by the synthetic rows of every minority class.
+
+    Drop-in for SMOTE().fit_resample. Classes are oversampled in parallel worker processes, each
+    building its own kNN index; a DataFrame X comes back as a DataFrame with the same columns.
+    Classes with a single row are kept but not oversampled. The whole result is held in memory;
+    write_resampled streams it to Parquet instead when it would not fit.
+    """
+    X_values, y_values = np.asarray(X, dtype=np.float64), np.asarray(y)
+    targets = _oversampled_classes(y_values)
+    labels = list(targets)
+    tasks = ([X_values[y_values == label] for label in labels], [targets[label] for label in labels],
+             [k_neighbors] * len(labels), [batch_rows] * len(labels),
+             [random_state + i for i in range(len(labels))])
+
+    workers = min(workers or os.cpu_count(), len(labels))
+    if workers <= 1:
+        synthetic = list(map(_synthetic_for_class, *tasks))
+    else:
+        context = multiprocessing.get_context('fork') if 'fork' in multiprocessing.get_all_start_methods() else None
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            synthetic = list(pool.map(_synthetic_for_class, *tasks))
+
+    X_resampled = np.vstack([X_values] + synthetic)
+    y_resampled = np.concatenate([y_values] + [np.full(len(rows), label, dtype=y_values.dtype)
+                                               for label, rows in zip(labels, synthetic)])
+    if isinstance(X, pd.DataFrame):
+        X_resampled = pd.DataFrame(X_resampled, columns=X.columns)
+    if isinstance(y, pd.Series):
+        y_resampled = pd.Series(pd.Categorical(y_resampled, categories=y.cat.categories)
+                                if isinstance(y.dtype, pd.CategoricalDtype) else y_resampled, name=y.name)
+    return X_resampled, y_resampled
+
+
+def grouped_smote_resample(data, features, target, group, **params):
+    """smote_resample within every `group` value separately, so rows of different groups
+    (e.g. Historical and Forecasted) are never interpolated into each other.
+
+    Returns the features, target and group column of the balanced groups, one after another.
+    """
+    parts = []
+    for key, rows in data.groupby(group, sort=False, observed=True):
+        X_resampled, y_resampled = smote_resample(rows[features], rows[target], **params)
+        part = X_resampled.assign(**{target: np.asarray(y_resampled)})
+        part[group] = key
+        parts.append(part)
+    resampled = pd.concat(parts, ignore_index=True)
+    if isinstance(data[target].dtype, pd.CategoricalDtype):
+        resampled[target] = pd.Categorical(resampled[target], categories=data[target].cat.categories)
+    return resampled
+
+
+def _resampled_parts(rows, features, target, group, key, **params):
+    """The original rows of one group, then its synthetic rows batch by batch, as frames with the same columns."""
+    original = rows[list(features) + [target]].astype({col: np.float64 for col in features})
+    if group is not None:
+        original[group] = key
+    yield original
+    for X_batch, y_batch in iter_synthetic(rows[features], rows[target], **params):
+        part = pd.DataFrame(X_batch, columns=list(features))
+        part[target] = pd.Series(y_batch).astype(original[target].dtype)
+        if group is not None:
+            part[group] = pd.Series([key] * len(part)).astype(original[group].dtype)
+        yield part
+
+
+def write_resampled(data, features, target, path, group=None, k_neighbors=K_NEIGHBORS, batch_rows=BATCH_ROWS,
+                    random_state=42):
+    """Write the balanced rows of `data` to one Parquet file without holding them in memory.
+
+    Balances like smote_resample, or like grouped_smote_resample when `group` is given, but
+    generates the rows serially and writes them batch by batch, so memory grows with batch_rows
+    rather than with the number of synthetic rows. Returns the number of rows written.
+    """
+    groups = data.groupby(group, sort=False, observed=True) if group is not None else [(None, data)]
+    writer, written = None, 0
+    try:
+        for key, rows in groups:
+            for part in _resampled_parts(rows, features, target, group, key, k_neighbors=k_neighbors,
+                                         batch_rows=batch_rows, random_state=random_state):
+                table = pa.Table.from_pandas(part, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table.cast(writer.schema))
+                written += len(part)
+    finally:
+        if writer is not None:
+            writer.close()
+    return written
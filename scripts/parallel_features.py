@@ -0,0 +1,97 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from rolling_windows import rolling_kernel
+
+INPUT_COLUMNS = ['Population', 'Migrants (net)', 'Median Age']
+FEATURE_COLUMNS = ['Annual_Population_Growth', 'Migration_Rate', 'Dependency_Ratio', '3_Year_Pop_Avg']
+
+
+def country_features(population, migrants, median_age):
+    """Engineered features of one country's rows, in the same operation order as feature_engineering."""
+    population = pd.Series(population)
+    growth = (population / population.shift(1) - 1).fillna(0)
+    migration_rate = (pd.Series(migrants) / population).fillna(0)
+    dependency = population * (pd.Series(median_age) / 100)
+    dependency = dependency / (population - dependency)
+    n = len(population)
+    pop_avg = pd.Series(rolling_kernel(population.to_numpy(), np.zeros(n, dtype=int), np.full(n, n), 3)['mean']).fillna(0)
+    return [growth, migration_rate, dependency, pop_avg]
+
+
+def _attach(name, shape):
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+
+
+def _run_segments(input_name, output_name, n_rows, segments):
+    """Worker: compute the features of the given country segments straight into shared memory."""
+    input_block, inputs = _attach(input_name, (len(INPUT_COLUMNS), n_rows))
+    output_block, outputs = _attach(output_name, (len(FEATURE_COLUMNS), n_rows))
+    try:
+        for start, end in segments:
+            features = country_features(*(inputs[i, start:end] for i in range(len(INPUT_COLUMNS))))
+            for i, values in enumerate(features):
+                outputs[i, start:end] = values.to_numpy()
+    finally:
+        del inputs, outputs
+        input_block.close()
+        output_block.close()
+
+
+def _balanced_tasks(bounds, n_tasks):
+    """Split consecutive country segments into tasks with roughly equal row counts."""
+    segments = list(zip(bounds[:-1], bounds[1:]))
+    target = bounds[-1] / max(n_tasks, 1)
+    tasks, current, size = [], [], 0
+    for start, end in segments:
+        current.append((int(start), int(end)))
+        size += end - start
+        if size >= target:
+            tasks.append(current)
+            current, size = [], 0
+    if current:
+        tasks.append(current)
+    return tasks
+
+
+def parallel_feature_engineering(selected_data, workers=2):
+    """Compute the engineered features per country across a process pool.
+
+    Rows are stably ordered by country so each country is a contiguous segment of shared-memory
+    column buffers; workers read their segments and write the features in place, and the results
+    are scattered back to the original row order. Output matches the serial path bit for bit.
+    """
+    codes = pd.factorize(selected_data['country'])[0]
+    order = np.argsort(codes, kind='stable')
+    bounds = np.flatnonzero(np.r_[True, np.diff(codes[order]) != 0, True])
+    n_rows = len(selected_data)
+
+    input_block = shared_memory.SharedMemory(create=True, size=max(1, 8 * len(INPUT_COLUMNS) * n_rows))
+    output_block = shared_memory.SharedMemory(create=True, size=max(1, 8 * len(FEATURE_COLUMNS) * n_rows))
+    try:
+        inputs = np.ndarray((len(INPUT_COLUMNS), n_rows), dtype=np.float64, buffer=input_block.buf)
+        outputs = np.ndarray((len(FEATURE_COLUMNS), n_rows), dtype=np.float64, buffer=output_block.buf)
+        for i, col in enumerate(INPUT_COLUMNS):
+            inputs[i] = selected_data[col].to_numpy(dtype=np.float64)[order]
+
+        tasks = _balanced_tasks(bounds, workers * 4)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_run_segments, [input_block.name] * len(tasks), [output_block.name] * len(tasks),
+                          [n_rows] * len(tasks), tasks))
+
+        for i, col in enumerate(FEATURE_COLUMNS):
+            values = np.empty(n_rows)
+            values[order] = outputs[i]
+            selected_data[col] = values
+        del inputs, outputs
+    finally:
+        input_block.close()
+        input_block.unlink()
+        output_block.close()
+        output_block.unlink()
+
+    return selected_data
@@ -0,0 +1,214 @@
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import seaborn as sns
+
+# Above this many points scatter plots switch to hexbins (or a random subsample when colored by
+# group) and KDEs are computed on a fixed grid, so plot time does not grow with the row count
+MAX_POINTS = 20_000
+
+# Grid size of the binned KDE
+KDE_GRID = 512
+
+
+def figure_path(output_dir, name):
+    """PNG path for a figure name, e.g. 'Density (P/Km²)' -> 'density_p_km².png'."""
+    slug = re.sub(r'[^\w]+', '_', name.lower()).strip('_')
+    return os.path.join(output_dir, f'{slug}.png')
+
+
+def figure(path, draw, *args, figsize=(10, 5), tight=True, **kwargs):
+    """Spec of a single-panel figure: `draw(*args, **kwargs)` renders it onto the current axes."""
+    return {'path': path, 'figsize': figsize, 'panels': [(draw, args, kwargs)], 'grid': (1, 1), 'tight': tight}
+
+
+def panel_figure(path, panels, grid, figsize=(12, 12)):
+    """Spec of a figure with subplots; `panels` is a list of (draw, args, kwargs) in grid order."""
+    return {'path': path, 'figsize': figsize, 'panels': panels, 'grid': grid, 'tight': True}
+
+
+def _render(spec):
+    fig = plt.figure(figsize=spec['figsize'])
+    try:
+        for i, (draw, args, kwargs) in enumerate(spec['panels']):
+            plt.subplot(*spec['grid'], i + 1)
+            draw(*args, **kwargs)
+        if spec['tight']:
+            plt.tight_layout()
+        os.makedirs(os.path.dirname(spec['path']) or '.', exist_ok=True)
+        fig.savefig(spec['path'])
+    finally:
+        plt.close(fig)
+    return spec['path']
+
+
+def render_figures(specs, workers=None):
+    """Render a set of figure specs to their files in parallel worker processes, without a display."""
+    specs = list(specs)
+    if not specs:
+        return []
+    workers = min(workers or os.cpu_count(), len(specs))
+    if workers == 1:
+        return [_render(spec) for spec in specs]
+    # Forked workers do not re-run the calling script, most of which are plain top-level code
+    context = multiprocessing.get_context('fork') if 'fork' in multiprocessing.get_all_start_methods() else None
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        paths = list(pool.map(_render, specs))
+    return paths
+
+
+def downsample(data, max_points=MAX_POINTS, seed=42):
+    """Random subsample of at most max_points rows (the data itself if it is small enough)."""
+    if len(data) <= max_points:
+        return data
+    positions = np.sort(np.random.default_rng(seed).choice(len(data), max_points, replace=False))
+    return data.iloc[positions] if isinstance(data, (pd.Series, pd.DataFrame)) else np.asarray(data)[positions]
+
+
+def binned_kde(values, grid_size=KDE_GRID):
+    """Gaussian KDE (Scott's bandwidth) evaluated on a grid from binned counts, in O(n + grid) time."""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if len(values) < 2 or values.std() == 0:
+        return np.array([]), np.array([])
+    bandwidth = values.std(ddof=1) * len(values) ** (-1 / 5)
+    edges = np.linspace(values.min() - 3 * bandwidth, values.max() + 3 * bandwidth, grid_size + 1)
+    counts, _ = np.histogram(values, edges)
+    step = edges[1] - edges[0]
+    # Kernel out to 4 bandwidths, but never wider than the grid (no two bins are further apart)
+    half = min(int(np.ceil(4 * bandwidth / step)), grid_size - 1)
+    offsets = np.arange(-half, half + 1) * step
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+    # The full convolution is shifted by `half` bins; slicing it back keeps every bin on its own center
+    density = np.convolve(counts, kernel)[half:half + grid_size] / len(values)
+    return (edges[:-1] + edges[1:]) / 2, density
+
+
+def draw_histogram(values, title, xlabel, color='blue', bins=30, kde=True, lines=(), ylabel="Frequency"):
+    """Histogram with a count-scaled KDE line and optional vertical (value, color, label) lines."""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    counts, edges = np.histogram(values, bins=bins)
+    plt.stairs(counts, edges, fill=True, color=color, alpha=0.4)
+    plt.stairs(counts, edges, color=color)
+    if kde:
+        grid, density = binned_kde(values)
+        plt.plot(grid, density * len(values) * (edges[1] - edges[0]), color=color)
+    for value, line_color, label in lines:
+        plt.axvline(value, color=line_color, linestyle='--', label=label)
+    if lines:
+        plt.legend()
+    plt.title(title, fontsize=14)
+    plt.xlabel(xlabel, fontsize=12)
+    plt.ylabel(ylabel, fontsize=12)
+    plt.grid(axis='y', linestyle='--', alpha=0.7)
+
+
+def draw_kde_comparison(series, title, xlabel):
+    """Filled binned KDEs of several (values, label, color) distributions on one axis."""
+    for values, label, color in series:
+        grid, density = binned_kde(values)
+        plt.fill_between(grid, density, color=color, alpha=0.4, label=label)
+        plt.plot(grid, density, color=color)
+    plt.title(title)
+    plt.xlabel(xlabel)
+    plt.ylabel("Density")
+    plt.legend()
+
+
+def draw_dots(values, title, xlabel, color='blue', seed=0):
+    """Jittered one-dimensional dot plot, subsampled above MAX_POINTS."""
+    values = downsample(np.asarray(values, dtype=np.float64))
+    jitter = np.random.default_rng(seed).normal(0, 0.02, size=len(values))
+    plt.scatter(values, jitter, alpha=0.6, color=color, s=10)
+    plt.title(title, fontsize=12)
+    plt.xlabel(xlabel, fontsize=10)
+    plt.ylabel("Density (Dots)", fontsize=10)
+    plt.grid(axis='y', linestyle='--', alpha=0.7)
+
+
+def draw_category_dots(categories, title, xlabel, color='purple', seed=0):
+    """Jittered dot plot of a categorical column, subsampled above MAX_POINTS."""
+    categories = downsample(pd.Series(categories).astype(str))
+    jitter = np.random.default_rng(seed).normal(0, 0.02, size=len(categories))
+    sns.scatterplot(x=categories.to_numpy(), y=jitter, color=color, alpha=0.6)
+    plt.title(title, fontsize=14)
+    plt.xlabel(xlabel, fontsize=12)
+    plt.ylabel("Density (Dots)", fontsize=12)
+    plt.grid(axis='y', linestyle='--', alpha=0.7)
+
+
+def draw_scatter(x, y, title, hue=None, palette=None, legend=True, xlabel=None, ylabel=None):
+    """Scatter plot; above MAX_POINTS a hexbin, or a random subsample when points are colored by hue."""
+    x, y = np.asarray(x), np.asarray(y)
+    if hue is None and len(x) > MAX_POINTS:
+        plt.hexbin(x, y, gridsize=60, bins='log', cmap='viridis', mincnt=1)
+    else:
+        hue_name = getattr(hue, 'name', None) or 'hue'
+        frame = downsample(pd.DataFrame({'x': x, 'y': y, hue_name: np.asarray(hue) if hue is not None else 0}))
+        sns.scatterplot(data=frame, x='x', y='y', hue=hue_name if hue is not None else None,
+                        palette=palette, legend=legend)
+    plt.title(title)
+    plt.xlabel(xlabel or '')
+    plt.ylabel(ylabel or '')
+
+
+def draw_heatmap(matrix, title):
+    sns.heatmap(matrix, annot=True, cmap="coolwarm", fmt=".2f")
+    plt.title(title)
+
+
+def draw_line(x, y, title, xlabel, ylabel):
+    plt.plot(x, y, marker='o', linestyle='--')
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    plt.title(title)
+
+
+def draw_bar(x, heights, title, xlabel, ylabel):
+    plt.bar(x, heights, alpha=0.7)
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    plt.title(title)
+
+
+def draw_pairplot(data):
+    """Pair plot on the current figure: binned KDEs on the diagonal and scatter plots elsewhere.
+
+    Above MAX_POINTS rows the off-diagonal panels are hexbins of a subsample of at most
+    10 * MAX_POINTS rows; the diagonal KDEs always use every row.
+    """
+    fig = plt.gcf()
+    fig.clf()
+    columns = list(data.columns)
+    axes = fig.subplots(len(columns), len(columns), squeeze=False)
+    sample = downsample(data, 10 * MAX_POINTS)
+    for i, row in enumerate(columns):
+        for j, col in enumerate(columns):
+            ax = axes[i, j]
+            if i == j:
+                grid, density = binned_kde(data[col].to_numpy(dtype=np.float64))
+                ax.plot(grid, density)
+            elif len(data) > MAX_POINTS:
+                ax.hexbin(sample[col], sample[row], gridsize=40, bins='log', cmap='viridis', mincnt=1)
+            else:
+                ax.scatter(data[col], data[row], s=4, alpha=0.5)
+            ax.set_xticks([])
+            ax.set_yticks([])
+            if i == len(columns) - 1:
+                ax.set_xlabel(col, fontsize=8)
+            if j == 0:
+                ax.set_ylabel(row, fontsize=8)
+
+
+def pairplot_figure(path, data, panel_size=1.6):
+    """Spec of a pair plot over every column of `data`."""
+    # tight_layout is quadratic in the number of panels, so the pair grid keeps the default spacing
+    return figure(path, draw_pairplot, data, figsize=(panel_size * len(data.columns),) * 2, tight=False)
@@ -0,0 +1,137 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from stage_cache import file_fingerprint
+from storage import binary_path, read_dataset
+
+PROFILE_COLUMNS = ['count', 'nulls', 'mean', 'std', 'var', 'min', 'max', 'range',
+                   'q1', 'median', 'q3', 'mode', 'skewness', 'kurtosis']
+
+
+def _lerp(low, high, fraction):
+    # Same interpolation as np.quantile, so quartiles match pandas/numpy exactly
+    diff = high - low
+    return np.where(fraction >= 0.5, high - diff * (1 - fraction), low + diff * fraction)
+
+
+def _column_profile(codes, values, n_groups):
+    """Statistics of one column for every group, from a single sort by (group, value)."""
+    has_group = codes >= 0
+    valid = has_group & ~np.isnan(values)
+    nulls = np.bincount(codes[has_group & ~valid], minlength=n_groups)
+
+    order = np.lexsort((values[valid], codes[valid]))
+    groups, x = codes[valid][order], values[valid][order]
+    count = np.bincount(groups, minlength=n_groups)
+    start = np.r_[0, np.cumsum(count)[:-1]]
+    last = np.maximum(start + count - 1, 0)
+    empty = count == 0
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.bincount(groups, x, minlength=n_groups) / count
+        deviations = x - mean[groups]
+        m2 = np.bincount(groups, deviations ** 2, minlength=n_groups)
+        m3 = np.bincount(groups, deviations ** 3, minlength=n_groups)
+        m4 = np.bincount(groups, deviations ** 4, minlength=n_groups)
+        # Sample variance needs two values; empty and single-value groups get NaN, as in pandas
+        var = np.where(count >= 2, m2 / (count - 1), np.nan)
+        # Biased moment estimates, as scipy.stats.skew / kurtosis compute them by default
+        skewness = (m3 / count) / (m2 / count) ** 1.5
+        kurtosis = (m4 / count) / (m2 / count) ** 2 - 3
+
+    profile = {'count': count, 'nulls': nulls, 'mean': mean, 'std': np.sqrt(var), 'var': var}
+    if len(x) == 0:
+        x = np.full(1, np.nan)
+    profile['min'] = np.where(empty, np.nan, x[start.clip(max=len(x) - 1)])
+    profile['max'] = np.where(empty, np.nan, x[last])
+    profile['range'] = profile['max'] - profile['min']
+
+    for name, q in [('q1', 0.25), ('median', 0.5), ('q3', 0.75)]:
+        position = q * (count - 1)
+        low = (start + np.floor(position).astype(int)).clip(0, len(x) - 1)
+        high = (start + np.ceil(position).astype(int)).clip(0, len(x) - 1)
+        if name == 'median':
+            quantile = (x[low] + x[high]) / 2
+        else:
+            quantile = _lerp(x[low], x[high], position - np.floor(position))
+        profile[name] = np.where(empty, np.nan, quantile)
+
+    # Mode: the longest run of equal values in each group, the smallest value on ties (as Series.mode()[0])
+    run_starts = np.flatnonzero(np.r_[True, (x[1:] != x[:-1]) | (groups[1:] != groups[:-1])]) if len(groups) else np.array([], dtype=int)
+    run_lengths = np.diff(np.r_[run_starts, len(groups)])
+    run_groups = groups[run_starts]
+    best = np.lexsort((run_starts, -run_lengths, run_groups))
+    first_of_group = best[np.r_[True, run_groups[best][1:] != run_groups[best][:-1]]] if len(best) else best
+    mode = np.full(n_groups, np.nan)
+    mode[run_groups[first_of_group]] = x[run_starts[first_of_group]]
+    profile['mode'] = mode
+
+    profile['skewness'] = np.where(count > 0, skewness, np.nan)
+    profile['kurtosis'] = np.where(count > 0, kurtosis, np.nan)
+    return profile
+
+
+def compute_profile(data, columns=None, by=None):
+    """Descriptive statistics of every numeric column, optionally per group.
+
+    Count, null count, mean, std/var (ddof=1), min, max, range, quartiles, mode, skewness and
+    kurtosis are computed for all groups at once from one sort per column. Returns one row per
+    column, indexed by (group keys..., column) when `by` is given.
+    """
+    if columns is None:
+        columns = [col for col in data.select_dtypes(include='number').columns if data[col].dtype != bool]
+    if by:
+        grouped = data.groupby(by, observed=True, sort=True)
+        codes = grouped.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+        keys = grouped.size().index
+    else:
+        codes, keys = np.zeros(len(data), dtype=np.int64), None
+    n_groups = len(keys) if keys is not None else 1
+
+    parts = []
+    for col in columns:
+        part = pd.DataFrame(_column_profile(codes, data[col].to_numpy(dtype=np.float64), n_groups))[PROFILE_COLUMNS]
+        part['column'] = col
+        if keys is not None:
+            part = pd.concat([keys.to_frame(index=False), part], axis=1)
+        parts.append(part)
+    profile = pd.concat(parts, ignore_index=True)
+    index = ([by] if isinstance(by, str) else list(by)) + ['column'] if by else 'column'
+    return profile.set_index(index)
+
+
+def profile_path(csv_path, key, by=None):
+    """Profile file stored next to the dataset, named by the dataset's content hash."""
+    suffix = f"-by-{'-'.join([by] if isinstance(by, str) else by)}" if by else ''
+    return f"{os.path.splitext(csv_path)[0]}.profile{suffix}-{key[:16]}.parquet"
+
+
+def load_profile(csv_path, by=None, columns=None):
+    """Profile of a dataset, computed once per dataset content and then read from disk.
+
+    The key is the hash of the stored dataset file, so scripts get the statistics without
+    parsing or scanning the data; profiles of older versions of the dataset are removed.
+    """
+    data = None
+    if not os.path.exists(binary_path(csv_path)) or (
+            os.path.exists(csv_path) and os.path.getmtime(csv_path) > os.path.getmtime(binary_path(csv_path))):
+        # Refreshes the binary copy, which is what the key is computed from
+        data = read_dataset(csv_path)
+    path = profile_path(csv_path, file_fingerprint(binary_path(csv_path)), by)
+
+    if os.path.exists(path):
+        profile = pd.read_parquet(path)
+    else:
+        profile = compute_profile(data if data is not None else read_dataset(csv_path), by=by)
+        prefix = os.path.basename(path)[:-len('0123456789abcdef.parquet')]
+        directory = os.path.dirname(path) or '.'
+        for old_file in os.listdir(directory):
+            if old_file.startswith(prefix) and len(old_file) == len(os.path.basename(path)):
+                os.remove(os.path.join(directory, old_file))
+        profile.to_parquet(path)
+
+    if columns is not None:
+        profile = profile[profile.index.get_level_values('column').isin(columns)]
+    return profile
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+# Versioned country reference table: bump the file version when regions or codes change
+COUNTRY_REFERENCE_FILE = '../data/reference/country_regions_v1.csv'
+
+_reference_cache = {}
+
+# Countries already reported as missing from the reference table, so each is reported once per process
+_reported_unmatched = set()
+
+
+def load_country_reference(file_path=COUNTRY_REFERENCE_FILE):
+    """Load the country -> region / ISO code table, indexed by country and read once per process."""
+    if file_path not in _reference_cache:
+        reference = pd.read_csv(file_path, keep_default_na=False, na_values=[''])
+        reference['region'] = reference['region'].astype('category')
+        _reference_cache[file_path] = reference.set_index('country')
+    return _reference_cache[file_path]
+
+
+def attach_regions(data, file_path=COUNTRY_REFERENCE_FILE):
+    """Add a categorical 'Region' column to the data.
+
+    'country' is converted to a Categorical once, the region of each category is looked up
+    in the reference table, and rows get their region through an integer take on the codes.
+    Countries missing from the reference table get no region and are reported, once per process.
+    """
+    reference = load_country_reference(file_path)
+
+    if not isinstance(data['country'].dtype, pd.CategoricalDtype):
+        data['country'] = data['country'].astype('category')
+    countries = data['country'].cat.categories
+
+    # Region code of every country category, -1 where the country is not in the reference table
+    positions = reference.index.get_indexer(countries)
+    region_codes = np.where(positions >= 0, reference['region'].cat.codes.to_numpy()[positions], -1)
+
+    country_codes = data['country'].cat.codes.to_numpy()
+    row_codes = np.where(country_codes >= 0, region_codes[country_codes], -1)
+    data['Region'] = pd.Categorical.from_codes(row_codes, categories=reference['region'].cat.categories)
+
+    unmatched = [country for country in countries[region_codes == -1] if (file_path, country) not in _reported_unmatched]
+    if unmatched:
+        _reported_unmatched.update((file_path, country) for country in unmatched)
+        print(f"Countries without a region: {', '.join(unmatched)}")
+
+    return data
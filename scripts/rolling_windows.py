@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+
+# Windows up to this size are summed directly from shifted copies (exact and independent of
+# other groups); larger windows use differences of cumulative sums
+DIRECT_WINDOW_LIMIT = 16
+
+def group_bounds(groups):
+    """Stable country-sorted order of the rows plus, per sorted row, the start and end of its group."""
+    codes = pd.factorize(groups, use_na_sentinel=False)[0]
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    ends = np.r_[starts[1:], len(sorted_codes)]
+    group_ids = np.cumsum(np.r_[False, sorted_codes[1:] != sorted_codes[:-1]])
+    return order, starts[group_ids], ends[group_ids]
+
+
+def _window_limits(n, row_start, row_end, window, center):
+    """[lo, hi) positions of every row's window, clipped to the row's group (pandas' window alignment)."""
+    offset = (window - 1) // 2 if center else 0
+    positions = np.arange(n)
+    hi = np.minimum(positions + offset + 1, row_end)
+    lo = np.maximum(positions + offset + 1 - window, row_start)
+    return lo, np.maximum(hi, lo)
+
+
+def _direct_sums(values, lo, hi, window, center):
+    """Windowed count, sum and centered sum of squares from `window` shifted copies of the data."""
+    n = len(values)
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    last = np.arange(n) + ((window - 1) // 2 if center else 0)
+
+    count = np.zeros(n)
+    total = np.zeros(n)
+    for k in range(window):
+        j = last - k
+        inside = (j >= lo) & (j < hi)
+        jc = np.clip(j, 0, max(n - 1, 0))
+        count += inside & valid[jc]
+        total += np.where(inside, filled[jc], 0.0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+    m2 = np.zeros(n)
+    for k in range(window):
+        j = last - k
+        inside = (j >= lo) & (j < hi)
+        jc = np.clip(j, 0, max(n - 1, 0))
+        m2 += np.where(inside & valid[jc], (filled[jc] - mean) ** 2, 0.0)
+    return count, total, m2
+
+
+def _prefix_sums(values, lo, hi, row_start):
+    """Windowed count, sum and centered sum of squares from cumulative sums.
+
+    Values are shifted by their group's first valid value before summing so the running sums
+    stay small and differences of prefixes keep their precision.
+    """
+    valid = ~np.isnan(values)
+    first_valid = pd.Series(np.where(valid, values, np.nan)).groupby(row_start).transform('first').to_numpy()
+    shift = np.where(np.isnan(first_valid), 0.0, first_valid)
+    shifted = np.where(valid, values - shift, 0.0)
+
+    counts = np.r_[0, np.cumsum(valid)]
+    sums = np.r_[0.0, np.cumsum(shifted)]
+    squares = np.r_[0.0, np.cumsum(shifted ** 2)]
+
+    count = (counts[hi] - counts[lo]).astype(float)
+    shifted_total = sums[hi] - sums[lo]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        m2 = np.clip(squares[hi] - squares[lo] - shifted_total ** 2 / count, 0, None)
+    return count, shifted_total + count * shift, np.nan_to_num(m2)
+
+
+def rolling_kernel(values, row_start, row_end, window, stats=('mean',), min_periods=1, center=False):
+    """Rolling statistics of a group-sorted float array, with windows reset at group boundaries.
+
+    Returns a dict of arrays for the requested 'mean', 'sum' and 'std' statistics.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    lo, hi = _window_limits(len(values), row_start, row_end, window, center)
+    if window <= DIRECT_WINDOW_LIMIT:
+        count, total, m2 = _direct_sums(values, lo, hi, window, center)
+    else:
+        count, total, m2 = _prefix_sums(values, lo, hi, row_start)
+
+    enough = count >= max(min_periods, 1)
+    result = {}
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if 'mean' in stats:
+            result['mean'] = np.where(enough, total / count, np.nan)
+        if 'sum' in stats:
+            result['sum'] = np.where(enough, total, np.nan)
+        if 'std' in stats:
+            result['std'] = np.where(enough & (count > 1), np.sqrt(m2 / (count - 1)), np.nan)
+    return result
+
+
+def grouped_rolling(data, columns, windows, stats=('mean',), group='country', min_periods=1, center=False):
+    """Rolling statistics of several columns and window sizes in one sweep over group-sorted arrays.
+
+    Rows keep their order within each group and windows never cross group boundaries.
+    `stats` picks from 'mean', 'sum', 'std' and 'ewma' (exponentially weighted mean with span =
+    window). Returns a frame aligned with `data` with one '<column>_<stat>_<window>' column per
+    combination.
+    """
+    groups = data[group] if group else np.zeros(len(data))
+    order, row_start, row_end = group_bounds(groups)
+    window_stats = [stat for stat in stats if stat != 'ewma']
+
+    result = {}
+    for col in columns:
+        values = data[col].to_numpy(dtype=np.float64)[order]
+        for window in windows:
+            computed = rolling_kernel(values, row_start, row_end, window, window_stats, min_periods, center) if window_stats else {}
+            if 'ewma' in stats:
+                # Pandas' exponentially weighted kernel already runs once over the sorted array with group resets
+                computed['ewma'] = pd.Series(values).groupby(row_start, sort=False).ewm(
+                    span=window, min_periods=min_periods).mean().droplevel(0).sort_index().to_numpy()
+            for stat in stats:
+                scattered = np.empty(len(values))
+                scattered[order] = computed[stat]
+                result[f'{col}_{stat}_{window}'] = scattered
+    return pd.DataFrame(result, index=data.index)
@@ -0,0 +1,115 @@
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+from sklearn.neighbors import BallTree
+
+from stage_cache import value_fingerprint
+
+INDEX_PATH = '../processed/models/similar_countries.joblib'
+
+FEATURES = ['Population', 'Median Age', 'Fertility Rate', 'Annual_Population_Growth', 'Migration_Rate',
+            'Density (P/Km²)', 'Urban  Pop %', 'Dependency_Ratio']
+
+# Minkowski exponents of the metrics the KD-tree serves; any other metric name goes to a ball tree
+MINKOWSKI_P = {'euclidean': 2, 'manhattan': 1, 'chebyshev': np.inf}
+
+
+def country_year_vectors(data, features=FEATURES):
+    """One row per country and year; for a year present in both, the historical row wins over the forecast."""
+    if 'DataType' in data.columns:
+        data = data.sort_values('DataType', ascending=False, kind='stable')
+    rows = data.drop_duplicates(['country', 'Year']).dropna(subset=list(features))
+    return rows[['country', 'Year'] + list(features)].sort_values(['Year', 'country']).reset_index(drop=True)
+
+
+def _year_entry(index, rows):
+    vectors = (rows[index['features']].to_numpy(dtype=np.float64) - index['mean']) / index['std']
+    return {'countries': rows['country'].to_numpy(), 'vectors': vectors,
+            'positions': {country: i for i, country in enumerate(rows['country'])},
+            'fingerprint': value_fingerprint(rows.reset_index(drop=True)), 'trees': {'kd_tree': cKDTree(vectors)}}
+
+
+def build_index(data, features=FEATURES):
+    """Standardized country vectors of every year, each year with its own neighbour trees.
+
+    The feature means and standard deviations are fixed at build time, so years added later are
+    placed on the same scale.
+    """
+    rows = country_year_vectors(data, features)
+    values = rows[list(features)].to_numpy(dtype=np.float64)
+    std = values.std(axis=0)
+    index = {'features': list(features), 'mean': values.mean(axis=0), 'std': np.where(std > 0, std, 1), 'years': {}}
+    for year, year_rows in rows.groupby('Year'):
+        index['years'][int(year)] = _year_entry(index, year_rows)
+    return index
+
+
+def update_index(index, data):
+    """Add new years and rebuild only the years whose rows changed; unchanged years keep their trees.
+
+    Returns the index and the list of years that were (re)built.
+    """
+    rows = country_year_vectors(data, index['features'])
+    rebuilt = []
+    for year, year_rows in rows.groupby('Year'):
+        year = int(year)
+        current = index['years'].get(year)
+        if current is None or current['fingerprint'] != value_fingerprint(year_rows.reset_index(drop=True)):
+            index['years'][year] = _year_entry(index, year_rows)
+            rebuilt.append(year)
+    return index, rebuilt
+
+
+def _tree(entry, metric):
+    """Neighbour tree of one year: the shared KD-tree for the Minkowski family, otherwise a ball
+    tree for the metric, built on first use and kept with the index."""
+    key = 'kd_tree' if metric == 'minkowski' or metric in MINKOWSKI_P else metric
+    if key not in entry['trees']:
+        entry['trees'][key] = BallTree(entry['vectors'], metric=metric)
+    return entry['trees'][key]
+
+
+def similar_countries(index, country, year, k=5, metric='euclidean', p=None, approximate=False, eps=0.5):
+    """The k countries closest to `country` in `year`, nearest first, with their distances.
+
+    Euclidean, Manhattan, Chebyshev and Minkowski-p are served by a KD-tree; with `approximate`
+    the search may stop early, and every returned distance is within (1 + eps) of the exact
+    k-th neighbour distance. Other metric names of sklearn's BallTree (e.g. 'canberra') are
+    always exact.
+    """
+    entry = index['years'].get(int(year))
+    if entry is None or country not in entry['positions']:
+        raise KeyError(f"No vector for {country} in {year}")
+    query = entry['vectors'][entry['positions'][country]]
+    # No more neighbours than the other countries of that year
+    k = max(0, min(k, len(entry['countries']) - 1))
+    tree = _tree(entry, metric)
+
+    # One extra neighbour because the country itself is always found at distance 0
+    if isinstance(tree, cKDTree):
+        order = (p or 2) if metric == 'minkowski' else MINKOWSKI_P[metric]
+        # A list of neighbour ranks always returns arrays, also for a single neighbour
+        distances, positions = tree.query(query, k=list(range(1, k + 2)), p=order, eps=eps if approximate else 0)
+    else:
+        distances, positions = tree.query(query[None, :], k=k + 1)
+        distances, positions = distances[0], positions[0]
+    keep = entry['countries'][positions] != country
+    return pd.DataFrame({'country': entry['countries'][positions][keep][:k], 'distance': distances[keep][:k]})
+
+
+def load_or_build_index(data, path=INDEX_PATH, refit=False, features=FEATURES):
+    """Persisted index for `data`: reused when unchanged, updated year by year when years were
+    added or changed, or built from scratch when missing, built on other features, or refit is requested."""
+    index = joblib.load(path) if os.path.exists(path) and not refit else None
+    if index is not None and index['features'] == list(features):
+        index, rebuilt = update_index(index, data)
+        if not rebuilt:
+            return index
+    else:
+        index = build_index(data, features)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    joblib.dump(index, path)
+    return index
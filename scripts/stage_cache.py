@@ -0,0 +1,165 @@
+import hashlib
+import inspect
+import os
+import shutil
+import sysconfig
+
+import pandas as pd
+
+from storage import dataset_exists, write_dataset
+
+CACHE_DIR = '../processed/.cache'
+
+# Hit/miss record of every stage executed in this process
+cache_report = []
+
+# Modules installed here are libraries; only the project's own modules count as stage code
+_LIBRARY_PATHS = tuple({os.path.realpath(sysconfig.get_paths()[key]) for key in ('stdlib', 'platstdlib', 'purelib', 'platlib')})
+
+
+def file_fingerprint(file_path):
+    """Hash the raw bytes of an input file."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def value_fingerprint(value):
+    """Hash a stage argument: DataFrames by content, everything else by repr."""
+    if isinstance(value, pd.DataFrame):
+        digest = hashlib.sha256()
+        digest.update(repr(list(value.columns)).encode())
+        digest.update(repr([str(dtype) for dtype in value.dtypes]).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+        return digest.hexdigest()
+    return hashlib.sha256(repr(value).encode()).hexdigest()
+
+
+def _is_project_module(module):
+    path = getattr(module, '__file__', None)
+    return path is not None and not os.path.realpath(path).startswith(_LIBRARY_PATHS)
+
+
+def code_fingerprint(func):
+    """Hash the source of the module defining `func` and of every project module it depends on.
+
+    Dependencies are the modules, functions and classes a module imports, followed transitively,
+    so a change to a helper, a module constant or the schema of another project module changes
+    the key as well as a change to the stage function itself.
+    """
+    modules, pending = {}, [inspect.getmodule(func)]
+    while pending:
+        module = pending.pop()
+        if module is None or module.__name__ in modules or not _is_project_module(module):
+            continue
+        modules[module.__name__] = module
+        for value in vars(module).values():
+            if inspect.ismodule(value):
+                pending.append(value)
+            elif inspect.isfunction(value) or inspect.isclass(value):
+                pending.append(inspect.getmodule(value))
+    digest = hashlib.sha256()
+    for name in sorted(modules):
+        digest.update(name.encode())
+        digest.update(inspect.getsource(modules[name]).encode())
+    return digest.hexdigest()
+
+
+def stage_key(name, func, args, files, params):
+    """Build the cache key of a stage from its inputs, parameters and code (see code_fingerprint).
+
+    Data files a stage reads on its own, such as reference tables, must be listed in `files`.
+    """
+    digest = hashlib.sha256()
+    digest.update(name.encode())
+    digest.update(code_fingerprint(func).encode())
+    for arg in args:
+        digest.update(value_fingerprint(arg).encode())
+    for file_path in files:
+        digest.update(file_fingerprint(file_path).encode())
+    for param in sorted(params):
+        digest.update(f"{param}={params[param]!r}".encode())
+    return digest.hexdigest()
+
+
+def run_stage(name, func, *args, files=(), force=False, **params):
+    """Run a pipeline stage, reusing its stored output when nothing it depends on changed.
+
+    `args` are passed to `func` and hashed by content, `files` are extra input files the
+    stage reads on its own, and `params` are keyword arguments for `func`. Stages receive
+    copies of DataFrame inputs so that a cached and a recomputed run behave the same.
+    Outputs are stored as Parquet, falling back to pickle for mixed-type columns.
+    """
+    key = stage_key(name, func, args, files, params)
+    cache_path = os.path.join(CACHE_DIR, f"{name}-{key[:16]}")
+
+    if not force:
+        if os.path.exists(cache_path + '.parquet'):
+            cache_report.append((name, 'hit'))
+            return pd.read_parquet(cache_path + '.parquet')
+        if os.path.exists(cache_path + '.pkl'):
+            cache_report.append((name, 'hit'))
+            return pd.read_pickle(cache_path + '.pkl')
+
+    inputs = [arg.copy() if isinstance(arg, pd.DataFrame) else arg for arg in args]
+    result = func(*inputs, **params)
+
+    # Keep only the latest output of each stage
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    for old_file in os.listdir(CACHE_DIR):
+        if old_file.startswith(f"{name}-"):
+            os.remove(os.path.join(CACHE_DIR, old_file))
+    try:
+        result.to_parquet(cache_path + '.parquet')
+    except (ValueError, TypeError):
+        # Raw stages can hold mixed-type object columns that Parquet cannot store
+        if os.path.exists(cache_path + '.parquet'):
+            os.remove(cache_path + '.parquet')
+        result.to_pickle(cache_path + '.pkl')
+
+    cache_report.append((name, 'forced' if force else 'miss'))
+    return result
+
+
+def run_directory_stage(name, func, *args, output_dir, files=(), force=False, **params):
+    """Run a stage that writes a directory of files, as func(*args, output_dir, **params).
+
+    The stage key is stored in the directory, and the stage is skipped while it matches, so
+    the directory is rebuilt from scratch whenever the inputs, files, parameters or code change.
+    """
+    key = stage_key(name, func, args, files, params)
+    key_path = os.path.join(output_dir, '.stage_key')
+    if not force and os.path.exists(key_path):
+        with open(key_path) as f:
+            if f.read() == key:
+                cache_report.append((name, 'hit'))
+                return
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    func(*args, output_dir, **params)
+    os.makedirs(output_dir, exist_ok=True)
+    with open(key_path, 'w') as f:
+        f.write(key)
+    cache_report.append((name, 'forced' if force else 'miss'))
+
+
+def stage_was_cached(name):
+    """Whether the most recent run of a stage was served from the cache."""
+    statuses = [status for stage, status in cache_report if stage == name]
+    return bool(statuses) and statuses[-1] == 'hit'
+
+
+def save_stage_output(data, output_path, name):
+    """Write a stage output unless the stage was a cache hit and the dataset already exists."""
+    if stage_was_cached(name) and dataset_exists(output_path):
+        return
+    write_dataset(data, output_path)
+
+
+def print_cache_report():
+    hits = sum(1 for _, status in cache_report if status == 'hit')
+    print(f"Stage cache: {hits} hit(s), {len(cache_report) - hits} recomputed")
+    for name, status in cache_report:
+        print(f"  {name}: {status}")
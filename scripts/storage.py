@@ -0,0 +1,93 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Binary format used for datasets handed between stages: 'parquet' or 'feather'
+STORAGE_FORMAT = os.environ.get('POPULATION_STORAGE_FORMAT', 'parquet')
+
+# The committed CSV files are kept up to date; set POPULATION_EXPORT_CSV=0 to write only the binary copy
+EXPORT_CSV = os.environ.get('POPULATION_EXPORT_CSV', '1') == '1'
+
+# Explicit dtypes so that readers never have to re-infer them
+CATEGORY_COLUMNS = ['country', 'DataType', 'Region', 'Median Age Binned', 'Yearly Change Binned']
+INTEGER_COLUMNS = ['Year', 'Population', 'Density (P/Km²)', 'World Population', 'Rank']
+
+
+def binary_path(csv_path):
+    """Path of the binary copy that sits next to a dataset's CSV path."""
+    return os.path.splitext(csv_path)[0] + '.' + STORAGE_FORMAT
+
+
+def apply_schema(data):
+    """Cast the columns with a known dtype; other columns keep their inferred types.
+
+    Integer columns are cast only when every value is whole, so aggregated means (e.g. a regional
+    mean Population) stay float instead of being truncated.
+    """
+    for col in CATEGORY_COLUMNS:
+        if col in data.columns and not isinstance(data[col].dtype, pd.CategoricalDtype):
+            data[col] = data[col].astype('category')
+    for col in INTEGER_COLUMNS:
+        if col in data.columns and _is_integral(data[col]):
+            data[col] = data[col].astype('int64')
+    return data
+
+
+def _is_integral(values):
+    """Whether a column can be stored as int64 without losing anything: numeric, complete and whole."""
+    if not pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values) or values.isna().any():
+        return False
+    if pd.api.types.is_integer_dtype(values):
+        return True
+    values = values.to_numpy(dtype=np.float64)
+    return bool(np.isfinite(values).all() and (values == np.round(values)).all())
+
+
+def dataset_exists(csv_path):
+    """Whether a dataset is stored, with its CSV copy too when CSVs are exported."""
+    if EXPORT_CSV:
+        return os.path.exists(binary_path(csv_path)) and os.path.exists(csv_path)
+    return os.path.exists(binary_path(csv_path)) or os.path.exists(csv_path)
+
+
+def _read_binary(path, columns):
+    if STORAGE_FORMAT == 'feather':
+        return pd.read_feather(path, columns=columns)
+    return pd.read_parquet(path, columns=columns)
+
+
+def read_dataset(csv_path, columns=None):
+    """Read a dataset, reading only `columns` when given.
+
+    The binary copy is used unless the CSV is newer (e.g. edited by hand), in which case
+    the CSV is parsed once, typed with the schema and stored in binary form for next time.
+    """
+    path = binary_path(csv_path)
+    if not os.path.exists(path) and not os.path.exists(csv_path):
+        raise FileNotFoundError(f"Dataset {csv_path} does not exist: run main.py first to build it")
+    csv_is_newer = os.path.exists(csv_path) and (
+        not os.path.exists(path) or os.path.getmtime(csv_path) > os.path.getmtime(path))
+
+    if not csv_is_newer:
+        return _read_binary(path, columns)
+
+    data = apply_schema(pd.read_csv(csv_path))
+    _write_binary(data, path)
+    return data[columns] if columns is not None else data
+
+
+def _write_binary(data, path):
+    if STORAGE_FORMAT == 'feather':
+        data.reset_index(drop=True).to_feather(path)
+    else:
+        data.to_parquet(path, index=False)
+
+
+def write_dataset(data, csv_path, export_csv=None):
+    """Write a dataset in the binary format, plus a CSV copy if requested."""
+    data = apply_schema(data.copy())
+    if export_csv if export_csv is not None else EXPORT_CSV:
+        data.to_csv(csv_path, index=False)
+    # Written after the CSV so that the binary copy is never considered stale
+    _write_binary(data, binary_path(csv_path))
@@ -0,0 +1,254 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data_preprocessing import read_options, set_column_data_types, remove_duplicates, fill_missing_values
+
+SOURCES = [('../data/original_world-population.csv', 'Historical'),
+           ('../data/original_world-forecast.csv', 'Forecasted')]
+SORT_KEYS = ['country', 'Year']
+
+# Peak memory budget for the streaming pipeline; batch sizes are derived from it
+MAX_MEMORY_MB = 256
+
+# Pandas operations on a batch keep a few temporary copies alive at once
+COPY_FACTOR = 4
+
+# Bins per pass of the exact out-of-core median, and the number of values finally selected in memory
+HISTOGRAM_BINS = 4096
+EXACT_VALUES = 100_000
+
+
+def estimate_row_bytes(file_path, sample_rows=1000):
+    """Estimate the in-memory size of one parsed row from a small sample of the file."""
+    sample = set_column_data_types(pd.read_csv(file_path, nrows=sample_rows, **read_options()).assign(DataType=''))
+    return max(1, int(sample.memory_usage(deep=True).sum() / max(len(sample), 1)))
+
+
+def batch_rows(file_path, max_memory_mb=MAX_MEMORY_MB, parts=1):
+    """Number of rows per batch so that `parts` batches fit in the memory budget together."""
+    budget = max_memory_mb * 1024 * 1024 / (COPY_FACTOR * parts)
+    return max(100, int(budget / estimate_row_bytes(file_path)))
+
+
+def _sort_batch(batch):
+    return batch.sort_values(SORT_KEYS, kind='stable').reset_index(drop=True)
+
+
+def write_sorted_runs(sources, run_dir, max_memory_mb=MAX_MEMORY_MB):
+    """Read the sources in batches, coerce types per batch and spill every batch as a sorted run."""
+    run_paths = []
+    for file_path, data_type in sources:
+        chunk_rows = batch_rows(file_path, max_memory_mb)
+        for batch in pd.read_csv(file_path, chunksize=chunk_rows, **read_options()):
+            batch['DataType'] = data_type
+            batch = _sort_batch(set_column_data_types(batch))
+            run_path = os.path.join(run_dir, f'run-{len(run_paths):05d}.parquet')
+            batch.to_parquet(run_path, index=False)
+            run_paths.append(run_path)
+    return run_paths
+
+
+def _rows_up_to(batch, country, year):
+    """Number of leading rows of a sorted batch whose (country, Year) is <= the given key."""
+    countries = batch['country'].to_numpy()
+    years = batch['Year'].to_numpy()
+    before = (countries < country) | ((countries == country) & (years <= year))
+    return int(np.count_nonzero(before))
+
+
+def merge_runs(run_paths, max_memory_mb=MAX_MEMORY_MB, block_rows=None):
+    """K-way merge of sorted runs by (country, Year), yielding sorted blocks.
+
+    Each run is read a block at a time. At every step the rows of all buffers up to the
+    smallest buffered last key are safe to emit, so only one block per run is held in memory.
+    """
+    if block_rows is None:
+        sample = next(pq.ParquetFile(run_paths[0]).iter_batches(batch_size=1000)).to_pandas()
+        row_bytes = max(1, int(sample.memory_usage(deep=True).sum() / max(len(sample), 1)))
+        block_rows = max(100, int(max_memory_mb * 1024 * 1024 / (COPY_FACTOR * row_bytes * (len(run_paths) + 1))))
+
+    readers = [pq.ParquetFile(path).iter_batches(batch_size=block_rows) for path in run_paths]
+    buffers = [None] * len(readers)
+
+    def refill(i):
+        batch = next(readers[i], None)
+        buffers[i] = batch.to_pandas() if batch is not None else None
+
+    for i in range(len(readers)):
+        refill(i)
+
+    while any(buffer is not None for buffer in buffers):
+        active = [i for i, buffer in enumerate(buffers) if buffer is not None]
+        bound = min((buffers[i]['country'].iloc[-1], buffers[i]['Year'].iloc[-1]) for i in active)
+
+        pieces = []
+        for i in active:
+            count = _rows_up_to(buffers[i], *bound)
+            if count:
+                pieces.append(buffers[i].iloc[:count])
+                buffers[i] = buffers[i].iloc[count:].reset_index(drop=True)
+            if buffers[i].empty:
+                refill(i)
+        yield _sort_batch(pd.concat(pieces, ignore_index=True))
+
+
+def partition_path(partition_dir, country):
+    return os.path.join(partition_dir, f'country={quote(str(country), safe="")}', 'part-0.parquet')
+
+
+def write_country_partitions(blocks, partition_dir):
+    """Stream sorted blocks into one Parquet file per country; a country's writer is closed as soon as
+    the sorted stream moves past it, so only the current block is held in memory."""
+    writer, current = None, None
+    partitions = []
+    for block in blocks:
+        for country, rows in block.groupby('country', sort=False):
+            if country != current:
+                if writer is not None:
+                    writer.close()
+                path = partition_path(partition_dir, country)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                table = pa.Table.from_pandas(rows, preserve_index=False)
+                writer, current = pq.ParquetWriter(path, table.schema), country
+                partitions.append(path)
+                writer.write_table(table)
+            else:
+                writer.write_table(pa.Table.from_pandas(rows, preserve_index=False, schema=writer.schema))
+    if writer is not None:
+        writer.close()
+    return partitions
+
+
+def stream_collect_data(sources=SOURCES, partition_dir='../data/partitioned/collected', max_memory_mb=MAX_MEMORY_MB):
+    """Streaming counterpart of collect_data and set_column_data_types.
+
+    Sources are read in batches, typed per batch, externally merge-sorted by (country, Year)
+    and written as one Parquet partition per country. Returns the partition paths.
+    """
+    if os.path.exists(partition_dir):
+        shutil.rmtree(partition_dir)
+    with tempfile.TemporaryDirectory() as run_dir:
+        run_paths = write_sorted_runs(sources, run_dir, max_memory_mb)
+        partitions = write_country_partitions(merge_runs(run_paths, max_memory_mb), partition_dir)
+    print(f"Streaming collection completed: {len(partitions)} country partitions in '{partition_dir}'.")
+    return partitions
+
+
+def _fill_partition(input_path, output_path, global_medians):
+    data = remove_duplicates(pd.read_parquet(input_path))
+    data = fill_missing_values(data, global_medians=global_medians)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    data.to_parquet(output_path, index=False)
+    return output_path
+
+
+def _column_values(partitions, col, lo=-np.inf, hi=np.inf):
+    """Non-null values of one column within [lo, hi], one partition at a time."""
+    for path in partitions:
+        values = pd.read_parquet(path, columns=[col])[col].dropna().to_numpy(dtype=np.float64)
+        yield values[(values >= lo) & (values <= hi)]
+
+
+def _select_rank(partitions, col, rank, count, lo, hi, bins=HISTOGRAM_BINS, max_values=EXACT_VALUES):
+    """The rank-th smallest (0-based) of the `count` values of `col` in [lo, hi], in bounded memory.
+
+    Each pass histograms the interval with the minimum and maximum of every bin and narrows it
+    to the bin holding the rank. Once at most max_values values are left they are read and
+    selected exactly; an interval too narrow to split holds only a few distinct values, which
+    are counted instead.
+    """
+    while count > max_values and lo < hi:
+        edges = np.linspace(lo, hi, bins + 1)[1:-1]
+        if edges[-1] <= lo:
+            distinct = pd.concat([pd.Series(values).value_counts() for values in _column_values(partitions, col, lo, hi)])
+            distinct = distinct.groupby(level=0).sum().sort_index()
+            return distinct.index[np.searchsorted(np.cumsum(distinct.to_numpy()), rank, side='right')]
+        counts, mins, maxs = np.zeros(bins, dtype=np.int64), np.full(bins, np.inf), np.full(bins, -np.inf)
+        for values in _column_values(partitions, col, lo, hi):
+            positions = np.searchsorted(edges, values, side='right')
+            counts += np.bincount(positions, minlength=bins)
+            np.minimum.at(mins, positions, values)
+            np.maximum.at(maxs, positions, values)
+        cumulative = np.cumsum(counts)
+        chosen = np.searchsorted(cumulative, rank, side='right')
+        rank -= cumulative[chosen] - counts[chosen]
+        count, lo, hi = counts[chosen], mins[chosen], maxs[chosen]
+    if lo == hi:
+        return lo
+    values = np.concatenate(list(_column_values(partitions, col, lo, hi)))
+    return np.partition(values, rank)[rank]
+
+
+def _global_medians(partitions):
+    """Exact medians of the imputed columns across partitions.
+
+    Only one column of one partition is read at a time: a first pass takes the count, minimum
+    and maximum, then the middle values are found by histogram refinement (see _select_rank),
+    so memory does not grow with the number of partitions.
+    """
+    columns = ['Migrants (net)', 'Median Age', 'Fertility Rate', 'Urban  Pop %', 'Urban Population']
+    medians = {}
+    for col in columns:
+        count, lo, hi = 0, np.inf, -np.inf
+        for values in _column_values(partitions, col):
+            if len(values):
+                count, lo, hi = count + len(values), min(lo, values.min()), max(hi, values.max())
+        if count == 0:
+            medians[col] = np.nan
+            continue
+        middle = [_select_rank(partitions, col, rank, count, lo, hi) for rank in sorted({(count - 1) // 2, count // 2})]
+        medians[col] = np.mean(middle)
+    return pd.Series(medians)
+
+
+def stream_preprocess(partitions, output_dir='../data/partitioned/preprocessed', workers=1):
+    """Deduplicate and fill missing values partition by partition.
+
+    Duplicates and the group-level fills are keyed by country, so every partition is processed
+    independently (in `workers` processes). The last-resort global medians need all partitions,
+    so they are applied in a second pass after the group-level fills. The partitions are written
+    to a temporary directory that replaces `output_dir` at the end, so partitions of countries
+    no longer in the input do not survive.
+    """
+    relative = [os.path.relpath(path, os.path.dirname(os.path.dirname(path))) for path in partitions]
+    building_dir = output_dir.rstrip('/') + '.building'
+    if os.path.exists(building_dir):
+        shutil.rmtree(building_dir)
+    staged = [os.path.join(building_dir, '_staged', name) for name in relative]
+    building = [os.path.join(building_dir, name) for name in relative]
+
+    # Pass 1: partition-local deduplication and group fills, skipping the global median step
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(_fill_partition, partitions, staged, [{}] * len(partitions)))
+
+    # Pass 2: global medians for groups with no values at all
+    global_medians = _global_medians(staged)
+    for staged_path, output_path in zip(staged, building):
+        data = pd.read_parquet(staged_path)
+        data[global_medians.index] = data[global_medians.index].fillna(global_medians)
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        data.to_parquet(output_path, index=False)
+    shutil.rmtree(os.path.join(building_dir, '_staged'))
+
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(building_dir, exist_ok=True)
+    os.replace(building_dir, output_dir)
+    return [os.path.join(output_dir, name) for name in relative]
+
+
+def main():
+    partitions = stream_collect_data()
+    outputs = stream_preprocess(partitions, workers=os.cpu_count())
+    print(f"Streaming preprocessing completed: {len(outputs)} partitions written.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+
+from aggregation_cube import build_cube, query_cube
+
+
+def _data():
+    rng = np.random.default_rng(0)
+    rows = [(region, country, year, data_type)
+            for region, countries in [('Europe', ['Albania', 'Croatia']), ('Asia', ['China'])]
+            for country in countries for year in range(1995, 2026, 5) for data_type in ['Historical', 'Forecasted']]
+    data = pd.DataFrame(rows, columns=['Region', 'country', 'Year', 'DataType'])
+    data['Population'] = rng.integers(1_000, 10_000, len(data)).astype(float)
+    return data
+
+
+def _cube(data):
+    return build_cube(data, measures=['Population'])
+
+
+def test_group_by_decade():
+    data = _data()
+    result = query_cube(_cube(data), by=['Region', 'Decade'], stats=['mean', 'std'])
+    expected = (data.assign(Decade=data['Year'] // 10 * 10).groupby(['Region', 'Decade'])['Population']
+                .agg(['mean', 'std']).add_prefix('Population ').reset_index())
+    tm.assert_frame_equal(result, expected, check_dtype=False)
+
+
+def test_filter_on_decade():
+    data = _data()
+    result = query_cube(_cube(data), by=['country'], where={'Decade': [2000, 2010]}, stats=['sum', 'count'])
+    rows = data[(data['Year'] // 10 * 10).isin([2000, 2010])]
+    expected = rows.groupby('country')['Population'].agg(['sum', 'count']).add_prefix('Population ').reset_index()
+    tm.assert_frame_equal(result, expected, check_dtype=False)
+
+
+def test_filter_on_decade_without_grouping():
+    data = _data()
+    result = query_cube(_cube(data), where={'Decade': 2020, 'country': 'Albania'}, stats=['mean'])
+    rows = data[(data['Year'] >= 2020) & (data['country'] == 'Albania')]
+    assert result['Population'].iloc[0] == rows['Population'].mean()
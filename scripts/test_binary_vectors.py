@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from scipy.spatial import distance
+
+from binary_vectors import jaccard_pair, pack_bits, packed_tile, popcount, smc_pair
+
+
+def _flags(n, n_flags, seed=0):
+    rng = np.random.default_rng(seed)
+    flags = rng.random((n, n_flags)) < rng.uniform(0.05, 0.6, (n, 1))
+    flags[0] = False  # A vector with no set flag
+    return flags
+
+
+@pytest.mark.parametrize('n_flags', [1, 7, 64, 65, 200])
+def test_pairs_match_scipy(n_flags):
+    flags = _flags(12, n_flags)
+    words, count = pack_bits(flags)
+    assert count == n_flags
+    for i in range(len(flags)):
+        for j in range(len(flags)):
+            assert smc_pair(words[i], words[j], n_flags) == pytest.approx(1 - distance.hamming(flags[i], flags[j]))
+            if flags[i].any() or flags[j].any():
+                assert jaccard_pair(words[i], words[j]) == pytest.approx(1 - distance.jaccard(flags[i], flags[j]))
+            else:
+                assert jaccard_pair(words[i], words[j]) == 0
+
+
+@pytest.mark.parametrize('metric, scipy_metric', [('smc', 'hamming'), ('jaccard', 'jaccard')])
+def test_tile_matches_scipy(metric, scipy_metric):
+    A, B = _flags(20, 150), _flags(15, 150, seed=1)
+    (packed_A, n_flags), (packed_B, _) = pack_bits(A), pack_bits(B)
+    expected = 1 - distance.cdist(A, B, scipy_metric)
+    if metric == 'jaccard':
+        # scipy puts two all-zero vectors at distance 0; their Jaccard index here is 0
+        expected[~A.any(axis=1)[:, None] & ~B.any(axis=1)[None, :]] = 0
+    np.testing.assert_allclose(packed_tile(packed_A, packed_B, metric, n_flags), expected, rtol=1e-12)
+
+
+def test_popcount_without_bitwise_count(monkeypatch):
+    words, _ = pack_bits(_flags(10, 200))
+    expected = popcount(words)
+    monkeypatch.delattr(np, 'bitwise_count', raising=False)
+    np.testing.assert_array_equal(popcount(words), expected)
+    np.testing.assert_array_equal(expected, _flags(10, 200).sum(axis=1))
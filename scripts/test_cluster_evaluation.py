@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.datasets import make_blobs
+from sklearn.metrics import silhouette_score
+
+from cluster_evaluation import evaluate_k, sampled_silhouette, choose_k, elbow_k
+
+
+def test_parallel_evaluation_matches_serial_kmeans():
+    X, _ = make_blobs(n_samples=600, centers=3, random_state=0)
+    parallel = evaluate_k(X, range(1, 6), workers=3)
+    serial = evaluate_k(X, range(1, 6), workers=1)
+    pd.testing.assert_frame_equal(parallel, serial)
+    inertia = [KMeans(n_clusters=k, random_state=42).fit(X).inertia_ for k in range(1, 6)]
+    np.testing.assert_allclose(parallel['inertia'], inertia)
+
+
+def test_sampled_silhouette_is_exact_when_the_data_fits_in_one_sample():
+    X, labels = make_blobs(n_samples=500, centers=4, random_state=1)
+    estimate, lower, upper = sampled_silhouette(X, labels, sample_size=1000)
+    assert estimate == lower == upper
+    assert np.isclose(estimate, silhouette_score(X, labels))
+
+
+def test_sampled_silhouette_bounds_cover_the_exact_score_on_separated_blobs():
+    X, labels = make_blobs(n_samples=6000, centers=3, random_state=2)
+    estimate, lower, upper = sampled_silhouette(X, labels, sample_size=1500, repeats=8)
+    assert lower <= estimate <= upper
+    assert abs(estimate - silhouette_score(X, labels)) < 0.02
+
+
+def test_choose_k_finds_the_blob_count():
+    X, _ = make_blobs(n_samples=900, centers=3, cluster_std=0.5, random_state=3)
+    results = evaluate_k(X, range(1, 9), workers=1)
+    assert elbow_k(results) == 3
+    assert choose_k(results) == 3
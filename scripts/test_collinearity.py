@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+
+from collinearity import condition_indices, prune_collinear, vif
+
+
+def _data(seed=0, n=200):
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=(n, 3))
+    data = pd.DataFrame({'a': base[:, 0], 'b': base[:, 1], 'c': base[:, 2],
+                         # Nearly linear combinations of the others, at different strengths
+                         'd': base[:, 0] + base[:, 1] + rng.normal(0, 0.05, n),
+                         'e': 2 * base[:, 2] - base[:, 0] + rng.normal(0, 0.3, n),
+                         'f': base[:, 1] + rng.normal(0, 0.5, n)})
+    data.loc[rng.random(n) < 0.05, 'c'] = np.nan
+    return data
+
+
+def _ols_vif(data):
+    # One regression (with intercept) per feature, on the rows where every feature is present
+    complete = data.dropna()
+    factors = {}
+    for col in complete.columns:
+        X = np.column_stack([np.ones(len(complete)), complete.drop(columns=col).to_numpy()])
+        y = complete[col].to_numpy()
+        residuals = y - X @ np.linalg.lstsq(X, y, rcond=None)[0]
+        r2 = 1 - residuals @ residuals / ((y - y.mean()) @ (y - y.mean()))
+        factors[col] = 1 / (1 - r2)
+    return pd.Series(factors, name='VIF')
+
+
+def test_vif_matches_ols_r_squared():
+    data = _data()
+    tm.assert_series_equal(vif(data), _ols_vif(data), rtol=1e-6)
+
+
+def test_constant_feature_has_infinite_vif():
+    data = _data().assign(g=3.0)
+    factors = vif(data)
+
+    assert factors['g'] == np.inf
+    # The other features are unaffected by the constant one
+    tm.assert_series_equal(factors.drop('g'), vif(_data()))
+    assert 'g' not in condition_indices(data).columns
+
+
+def test_pruning_matches_recomputing_from_scratch():
+    data = _data()
+    names, dropped = prune_collinear(data, threshold=3)
+
+    remaining, expected = list(data.columns), []
+    while len(remaining) > 1:
+        factors = _ols_vif(data[remaining])
+        if factors.max() <= 3:
+            break
+        expected.append((factors.idxmax(), factors.max()))
+        remaining.remove(factors.idxmax())
+
+    assert names == remaining
+    assert dropped['feature'].tolist() == [feature for feature, _ in expected]
+    np.testing.assert_allclose(dropped['VIF'], [factor for _, factor in expected], rtol=1e-6)
+
+
+def test_constant_features_are_dropped_first_unless_kept():
+    data = _data().assign(g=3.0)
+    names, dropped = prune_collinear(data, threshold=3)
+    assert dropped['feature'].iloc[0] == 'g' and dropped['VIF'].iloc[0] == np.inf
+    assert names == prune_collinear(_data(), threshold=3)[0]
+
+    names, dropped = prune_collinear(data, threshold=3, keep=['g', 'd'])
+    assert 'g' in names and 'd' in names
+    assert not dropped['feature'].isin(['g', 'd']).any()
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from correlation_engine import correlation_matrix
+
+
+def _data(with_missing):
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(rng.normal(size=(400, 5)), columns=list('abcde'))
+    data['b'] += data['a']
+    data['c'] = np.round(data['c'] * 2)  # ties
+    if with_missing:
+        for col, share in zip('abcd', (0.1, 0.2, 0.05, 0.3)):
+            data.loc[rng.random(len(data)) < share, col] = np.nan
+        data.loc[data['a'].isna(), 'e'] = np.nan  # a and e share their missing rows
+    return data
+
+
+@pytest.mark.parametrize('method', ['pearson', 'spearman', 'kendall'])
+@pytest.mark.parametrize('with_missing', [False, True])
+def test_matches_dataframe_corr(method, with_missing):
+    data = _data(with_missing)
+    pd.testing.assert_frame_equal(correlation_matrix(data, method=method), data.corr(method=method),
+                                  check_exact=False, atol=1e-12)
+
+
+def test_min_periods_and_counts_match_pandas():
+    data = _data(True)
+    matrix, counts, _ = correlation_matrix(data, min_periods=300, return_details=True)
+    pd.testing.assert_frame_equal(matrix, data.corr(min_periods=300), check_exact=False, atol=1e-12)
+    expected = data.notna().astype(int).T @ data.notna().astype(int)
+    pd.testing.assert_frame_equal(counts, expected, check_names=False)
@@ -0,0 +1,123 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+import pytest
+
+from data_preprocessing import fill_missing_values, read_options, remove_duplicates, set_column_data_types
+
+RAW_DATASET = os.path.join(os.path.dirname(__file__), '..', 'data', 'original_merged_dataset.csv')
+
+
+def _raw(**overrides):
+    row = {'country': 'Albania', 'Year': '2020', 'Population': '2877797', 'Yearly %   Change': '-0.11 %',
+           'Yearly  Change': '-3120', 'Migrants (net)': '-14000', 'Median Age': '36.4', 'Fertility Rate': '1.62',
+           'Density (P/Km²)': '105', 'Urban  Pop %': '63.5 %', 'Urban Population': '1827524',
+           "Country's Share of  World Pop": '0.04 %', 'World Population': '7794798739', 'Rank': '140',
+           'DataType': 'Historical'}
+    rows = [row, {**row, **overrides}]
+    return pd.DataFrame(rows, dtype=object)
+
+
+def _old_set_column_data_types(data):
+    """The column conversions set_column_data_types replaced, one column at a time."""
+    for col in ['Population', 'Year', 'Density (P/Km²)', 'World Population', 'Rank']:
+        data[col] = data[col].astype(int)
+    for col in ['Yearly %   Change', 'Urban  Pop %', "Country's Share of  World Pop"]:
+        data[col] = data[col].str.replace('%', '').replace('N.A.', np.nan).astype(float) / 100
+    data['Yearly  Change'] = data['Yearly  Change'].replace('N.A.', np.nan).astype(float)
+    for col in ['Migrants (net)', 'Median Age', 'Fertility Rate']:
+        data[col] = data[col].replace(' ', np.nan).astype(float)
+    data['Urban Population'] = pd.to_numeric(data['Urban Population'].replace(' ', np.nan), errors='coerce')
+    data['country'] = data['country'].astype(str)
+    data['DataType'] = data['DataType'].astype(str)
+    return data
+
+
+def test_values_and_dtypes():
+    data = set_column_data_types(_raw(**{'Yearly %   Change': 'N.A.', 'Migrants (net)': ' ', 'Urban  Pop %': 'N.A.'}))
+    assert data['Population'].dtype == 'int64' and data['Rank'].dtype == 'int64'
+    assert data['Yearly %   Change'].tolist()[0] == pytest.approx(-0.0011)
+    assert data['Urban  Pop %'].tolist()[0] == pytest.approx(0.635)
+    assert np.isnan(data['Yearly %   Change'].iloc[1]) and np.isnan(data['Migrants (net)'].iloc[1])
+    assert np.isnan(data['Urban  Pop %'].iloc[1])
+
+
+@pytest.mark.parametrize('token', ['N.A.', ' ', 'n/a', '--', 'unknown'])
+def test_stray_urban_population_tokens_become_nan(token):
+    data = set_column_data_types(_raw(**{'Urban Population': token}))
+    assert data['Urban Population'].iloc[0] == 1827524
+    assert np.isnan(data['Urban Population'].iloc[1])
+
+
+def test_stray_tokens_elsewhere_still_raise():
+    with pytest.raises(ValueError):
+        set_column_data_types(_raw(**{'Median Age': 'unknown'}))
+
+
+def test_matches_old_conversions_on_raw_dataset():
+    raw = pd.read_csv(RAW_DATASET)
+    expected = _old_set_column_data_types(raw.copy())
+    result = set_column_data_types(pd.read_csv(RAW_DATASET, **read_options()))
+    tm.assert_frame_equal(result, expected, check_dtype=False)
+
+
+def _duplicates():
+    # Albania 2020 three times (the second row most complete), Croatia 2020 twice with equal
+    # completeness, and Albania 2020 once more as Forecasted (a different key)
+    return pd.DataFrame({'country': ['Croatia', 'Albania', 'Albania', 'Croatia', 'Albania', 'Albania', 'Malta'],
+                         'Year': [2020] * 7,
+                         'DataType': ['Historical'] * 5 + ['Forecasted', 'Historical'],
+                         'Median Age': [43.0, np.nan, 36.4, 44.0, 36.0, 37.0, 42.0],
+                         'Fertility Rate': [1.4, np.nan, 1.6, 1.5, np.nan, 1.7, np.nan]},
+                        index=[10, 11, 12, 13, 14, 15, 16])
+
+
+def test_duplicates_keep_the_most_complete_row():
+    data = _duplicates()
+    kept, discarded = remove_duplicates(data, return_discarded=True)
+
+    # Row order and index are preserved; on a tie the first row wins
+    assert kept.index.tolist() == [10, 12, 15, 16]
+    assert discarded.index.tolist() == [11, 13, 14]
+    tm.assert_frame_equal(pd.concat([kept, discarded]).sort_index(), data)
+
+
+def test_duplicates_without_discarded_rows():
+    data = _duplicates()
+    tm.assert_frame_equal(remove_duplicates(data), remove_duplicates(data, return_discarded=True)[0])
+
+
+def _gaps():
+    return pd.DataFrame({'country': ['Albania'] * 3 + ['Croatia'] * 2, 'DataType': ['Historical'] * 5,
+                         'Population': [100, 100, 100, 200, 200],
+                         'Urban  Pop %': [0.4, 0.5, 0.6, 0.5, 0.5],
+                         'Urban Population': [np.nan, 50.0, 60.0, 100.0, 100.0],
+                         'Migrants (net)': [1.0, 2.0, 3.0, 4.0, 5.0],
+                         'Median Age': [30.0, np.nan, 34.0, 40.0, 41.0],
+                         # No Albanian value at all, so only the global median can fill it
+                         'Fertility Rate': [np.nan, np.nan, np.nan, 1.0, 3.0]})
+
+
+def test_imputation_report_counts_every_strategy():
+    filled, report = fill_missing_values(_gaps(), return_report=True)
+
+    assert filled['Urban Population'].tolist() == [40.0, 50.0, 60.0, 100.0, 100.0]
+    assert filled['Median Age'].tolist() == [30.0, 32.0, 34.0, 40.0, 41.0]
+    assert filled['Fertility Rate'].tolist() == [2.0, 2.0, 2.0, 1.0, 3.0]
+    assert report.loc['Urban Population', 'urban_estimate'] == 1
+    assert report.loc['Median Age', 'group_median'] == 1
+    assert report.loc['Fertility Rate', 'global_median'] == 3
+    # Each missing cell is counted once, under the strategy that filled it
+    assert report.to_numpy().sum() == _gaps().isna().sum().sum() == 5
+    assert report['group_ffill_bfill'].sum() == 0
+
+
+def test_global_medians_can_be_given_or_skipped():
+    filled, report = fill_missing_values(_gaps(), return_report=True, global_medians={'Fertility Rate': 1.8})
+    assert filled['Fertility Rate'].tolist()[:3] == [1.8] * 3
+
+    filled, report = fill_missing_values(_gaps(), return_report=True, global_medians={})
+    assert filled['Fertility Rate'].isna().sum() == 3
+    assert report['global_median'].sum() == 0
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.spatial.distance import cdist
+
+from distance_engine import iter_tiles, pairwise_matrix
+
+
+def _vectors(n, seed=0):
+    rng = np.random.default_rng(seed)
+    # Far from the origin and on different scales, where the squared-norm form loses precision
+    return rng.normal(size=(n, 6)) * [1, 10, 0.1, 1000, 1, 5] + 50
+
+
+@pytest.mark.parametrize('memory_mb', [64, 1e-4])
+def test_euclidean_matches_scipy(memory_mb):
+    X = _vectors(120)
+    result = pairwise_matrix(X, dtype=np.float64, memory_mb=memory_mb)
+    np.testing.assert_allclose(result, cdist(X, X), rtol=1e-9, atol=1e-6)
+    assert (np.diag(result) == 0).all()
+
+
+def test_float32_euclidean_close_to_scipy():
+    X, Y = _vectors(80), _vectors(30, seed=1)
+    expected = cdist(X, Y)
+    result = pairwise_matrix(X, Y, dtype=np.float32)
+    assert result.dtype == np.float32
+    np.testing.assert_allclose(result, expected, rtol=1e-4, atol=1e-4 * expected.max())
+
+
+def test_float64_by_default():
+    X, Y = _vectors(80), _vectors(30, seed=1)
+    result = pairwise_matrix(X, Y)
+    assert result.dtype == np.float64
+    np.testing.assert_allclose(result, cdist(X, Y), rtol=1e-10)
+    assert all(tile.dtype == np.float64 for _, _, tile in iter_tiles(X, Y, memory_mb=1e-3))
+
+
+@pytest.mark.parametrize('p, scipy_metric', [(1, 'cityblock'), (3, 'minkowski'), (np.inf, 'chebyshev')])
+def test_minkowski_matches_scipy(p, scipy_metric):
+    X, Y = _vectors(70), _vectors(40, seed=1)
+    expected = cdist(X, Y, scipy_metric, **({'p': p} if scipy_metric == 'minkowski' else {}))
+    np.testing.assert_allclose(pairwise_matrix(X, Y, 'minkowski', p=p, dtype=np.float64, memory_mb=1e-3), expected,
+                               rtol=1e-12)
+
+
+@pytest.mark.parametrize('metric, scipy_metric', [('smc', 'hamming'), ('jaccard', 'jaccard')])
+def test_binary_similarities_match_scipy(metric, scipy_metric):
+    X = np.random.default_rng(0).normal(size=(50, 130))
+    result = pairwise_matrix(X, metric=metric, dtype=np.float64, memory_mb=1e-3)
+    np.testing.assert_allclose(result, 1 - cdist(X > 0, X > 0, scipy_metric), rtol=1e-12)
+
+
+def test_memmap_output(tmp_path):
+    X = _vectors(60)
+    path = str(tmp_path / 'matrix.npy')
+    pairwise_matrix(X, dtype=np.float64, out=path, memory_mb=1e-3)
+    np.testing.assert_allclose(np.load(path), cdist(X, X), rtol=1e-9, atol=1e-6)
+
+
+def test_dataframe_labels():
+    X = pd.DataFrame(_vectors(5), index=list('abcde'))
+    result = pairwise_matrix(X, dtype=np.float64)
+    assert list(result.index) == list(result.columns) == list('abcde')
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+from incremental_models import _chunk_seed_rows, _next_center, iter_chunks, load_or_fit_models
+
+COLUMNS = ['a', 'b', 'c', 'd']
+KEYS = ['country', 'Year']
+
+
+def _data(rows, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.normal(size=(rows, len(COLUMNS))), columns=COLUMNS)
+
+
+def _vintage(countries, years, seed):
+    """One row per country and year, sorted by (country, Year) like every dataset here."""
+    index = pd.MultiIndex.from_product([countries, years], names=KEYS)
+    data = _data(len(index), seed).set_index(index)
+    return data.reset_index().sort_values(KEYS, ignore_index=True)
+
+
+def _fit(data, path, keys=None):
+    return load_or_fit_models(data, COLUMNS, path=path, keys=keys, k_values=range(1, 4), chunk_rows=500, passes=1)
+
+
+def test_appended_rows_are_folded_in_once(tmp_path):
+    path = str(tmp_path / 'models.joblib')
+    first = _data(1200, 0)
+    assert _fit(first, path)['pca'].n_samples_seen_ == 1200
+
+    # Unchanged data is reused as-is
+    assert _fit(first, path)['pca'].n_samples_seen_ == 1200
+
+    # Only the appended rows are partial-fitted; the 1200 seen rows are not counted twice
+    appended = pd.concat([first, _data(300, 1)], ignore_index=True)
+    models = _fit(appended, path)
+    assert models['pca'].n_samples_seen_ == 1500
+    assert models['n_rows'] == 1500
+
+
+def test_new_year_inside_sorted_rows_is_partial_fitted(tmp_path):
+    path = str(tmp_path / 'models.joblib')
+    countries = [f'country {i:03d}' for i in range(100)]
+    first = _vintage(countries, range(2000, 2020), 0)
+    _fit(first, path, KEYS)
+
+    # The 2020 rows land inside every country's block of the sorted data
+    new_year = _vintage(countries, [2020], 1)
+    second = pd.concat([first, new_year]).sort_values(KEYS, ignore_index=True)
+    models = _fit(second, path, KEYS)
+    assert models['pca'].n_samples_seen_ == len(second)
+    assert models['n_rows'] == len(second)
+
+
+def test_changed_rows_trigger_a_full_refit(tmp_path):
+    path = str(tmp_path / 'models.joblib')
+    first = _data(1200, 0)
+    _fit(first, path)
+    changed = first.copy()
+    changed.iloc[10, 0] += 1
+    assert _fit(changed, path)['pca'].n_samples_seen_ == 1200
+    assert _fit(changed.iloc[:800], path)['pca'].n_samples_seen_ == 800
+
+
+def test_seed_rows_come_from_every_chunk():
+    data = pd.DataFrame(np.repeat(np.arange(4.0), 500)[:, None] * np.ones(len(COLUMNS)), columns=COLUMNS)
+    rng = np.random.default_rng(0)
+    seeds = np.vstack([_chunk_seed_rows(chunk, len(data), rng, seed_rows=100)
+                       for chunk in iter_chunks(data, COLUMNS, chunk_rows=500)])
+    assert np.bincount(seeds[:, 0].astype(int)).tolist() == [25, 25, 25, 25]
+
+
+def test_next_center_when_every_row_is_a_center():
+    rows = np.zeros((10, 2))
+    center = _next_center(rows[:1], rows, np.random.default_rng(0))
+    assert np.isfinite(center).all()
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+
+from oversampling import grouped_smote_resample, smote_resample, write_resampled
+
+
+def _data(seed=0):
+    rng = np.random.default_rng(seed)
+    labels = ['Low'] * 40 + ['Medium'] * 12 + ['High'] * 5
+    data = pd.DataFrame(rng.normal(size=(len(labels), 3)), columns=['a', 'b', 'c'])
+    data['label'] = pd.Categorical(labels, categories=['Low', 'Medium', 'High'])
+    data['DataType'] = np.where(np.arange(len(labels)) % 3 == 0, 'Forecasted', 'Historical')
+    return data
+
+
+def test_balances_every_class():
+    data = _data()
+    X, y = smote_resample(data[['a', 'b', 'c']], data['label'], workers=1)
+    assert y.value_counts().tolist() == [40, 40, 40]
+    tm.assert_frame_equal(X.iloc[:len(data)], data[['a', 'b', 'c']])
+
+
+def test_single_row_class_passes_through():
+    data = _data()
+    data = pd.concat([data, data.iloc[[0]].assign(label='High')], ignore_index=True)
+    data = data[(data['label'] != 'High') | (data.index == len(data) - 1)]
+    X, y = smote_resample(data[['a', 'b', 'c']], data['label'], workers=1)
+    assert (y == 'High').sum() == 1
+    assert (y == 'Medium').sum() == (y == 'Low').sum() == 40
+
+
+def test_grouped_resample_skips_single_row_classes():
+    data = _data()
+    # Within 'Forecasted', 'High' has a single row
+    high = data.index[data['label'] == 'High']
+    data.loc[high, 'DataType'] = ['Forecasted'] + ['Historical'] * (len(high) - 1)
+    resampled = grouped_smote_resample(data, ['a', 'b', 'c'], 'label', 'DataType', workers=1)
+    forecasted = resampled[resampled['DataType'] == 'Forecasted']
+    assert (forecasted['label'] == 'High').sum() == 1
+
+
+def test_written_rows_match_in_memory(tmp_path):
+    data = _data()
+    expected = grouped_smote_resample(data, ['a', 'b', 'c'], 'label', 'DataType', workers=1, batch_rows=7)
+    written = write_resampled(data, ['a', 'b', 'c'], 'label', tmp_path / 'resampled.parquet', group='DataType',
+                              batch_rows=7)
+    result = pd.read_parquet(tmp_path / 'resampled.parquet')
+    assert written == len(expected)
+    tm.assert_frame_equal(result, expected, check_categorical=False, check_dtype=False)
@@ -0,0 +1,42 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+
+from feature_selection import feature_engineering, feature_selection
+from parallel_features import FEATURE_COLUMNS
+from storage import apply_schema
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+
+def _synthetic():
+    rng = np.random.default_rng(0)
+    countries = np.repeat(['Albania', 'Croatia', 'Egypt', 'Malta', 'Tuvalu'], [30, 12, 45, 1, 7])
+    data = pd.DataFrame({'country': pd.Categorical(countries), 'Year': 0})
+    data['Population'] = rng.integers(0, 5_000_000, len(data)).astype(float)
+    data['Migrants (net)'] = rng.normal(0, 10_000, len(data))
+    data['Median Age'] = rng.uniform(15, 50, len(data))
+    # Interleave the countries, and add zero populations and missing values
+    data = data.sample(frac=1, random_state=0).reset_index(drop=True)
+    data.loc[[3, 17], 'Population'] = 0
+    data.loc[[5, 40], 'Migrants (net)'] = np.nan
+    return data
+
+
+def _assert_bit_identical(data):
+    serial = feature_engineering(data.copy())
+    parallel = feature_engineering(data.copy(), workers=3)
+    for col in FEATURE_COLUMNS:
+        np.testing.assert_array_equal(parallel[col].to_numpy().view(np.int64), serial[col].to_numpy().view(np.int64))
+    tm.assert_frame_equal(parallel, serial)
+
+
+def test_synthetic_rows_bit_identical():
+    _assert_bit_identical(_synthetic())
+
+
+def test_dataset_bit_identical():
+    data = apply_schema(pd.read_csv(os.path.join(DATA_DIR, 'dataset_02.csv')))
+    _assert_bit_identical(feature_selection(data))
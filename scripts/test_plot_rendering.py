@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from plot_rendering import binned_kde
+
+
+@pytest.mark.parametrize('values', [
+    np.random.default_rng(0).normal(size=5000),
+    # Few points and a bandwidth wider than the data range: the kernel is longer than the grid
+    np.array([0.0, 0.1, 0.15, 3.0]),
+    np.array([1.0, 1.0, 1.0, 1.2]),
+])
+@pytest.mark.parametrize('grid_size', [512, 16])
+def test_matches_direct_kde(values, grid_size):
+    grid, density = binned_kde(values, grid_size)
+    expected = stats.gaussian_kde(values, bw_method='scott')(grid)
+    step = grid[1] - grid[0]
+    bandwidth = values.std(ddof=1) * len(values) ** (-1 / 5)
+    # Binning moves every point by at most half a bin, and the kernel's slope is at most 1 / (h^2 sqrt(2 pi e))
+    bound = step / 2 / (bandwidth ** 2 * np.sqrt(2 * np.pi * np.e))
+    assert np.abs(density - expected).max() <= bound + 1e-12
+    assert np.argmax(density) == pytest.approx(np.argmax(expected), abs=1)
+
+
+def test_constant_values_have_no_density():
+    grid, density = binned_kde([2.0, 2.0, 2.0])
+    assert len(grid) == len(density) == 0
@@ -0,0 +1,84 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+
+from profiling import compute_profile, load_profile
+from storage import write_dataset
+
+
+def _data(seed=0):
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame({'country': np.repeat(['Albania', 'Croatia', 'Malta', 'Monaco'], 25),
+                         'Population': rng.lognormal(10, 1, 100).round(-2),
+                         'Fertility Rate': rng.normal(2, 0.5, 100).round(1)})
+    data.loc[rng.random(100) < 0.2, 'Fertility Rate'] = np.nan
+    # One group with a single value and one with none
+    data.loc[data['country'] == 'Malta', 'Fertility Rate'] = [1.5] + [np.nan] * 24
+    data.loc[data['country'] == 'Monaco', 'Fertility Rate'] = np.nan
+    return data
+
+
+def _pandas_skew_kurt(profile):
+    # The profile has the biased estimates; pandas reports the sample-size adjusted ones
+    n, g1, g2 = profile['count'], profile['skewness'], profile['kurtosis']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        skew = g1 * np.sqrt(n * (n - 1)) / (n - 2)
+        kurt = ((n + 1) * g2 + 6) * (n - 1) / ((n - 2) * (n - 3))
+    return skew.where(n >= 3), kurt.where(n >= 4)
+
+
+def test_grouped_profile_matches_pandas():
+    data = _data()
+    profile = compute_profile(data, ['Population', 'Fertility Rate'], by='country')
+    grouped = data.groupby('country')
+
+    for col in ['Population', 'Fertility Rate']:
+        part = profile.xs(col, level='column')
+        describe = grouped[col].describe()
+        for name, expected in [('count', 'count'), ('mean', 'mean'), ('std', 'std'), ('min', 'min'),
+                               ('q1', '25%'), ('median', '50%'), ('q3', '75%'), ('max', 'max')]:
+            tm.assert_series_equal(part[name], describe[expected], check_names=False, check_dtype=False)
+        tm.assert_series_equal(part['var'], grouped[col].var(), check_names=False)
+        tm.assert_series_equal(part['nulls'], grouped[col].apply(lambda s: s.isna().sum()), check_names=False,
+                               check_dtype=False)
+        skew, kurt = _pandas_skew_kurt(part)
+        tm.assert_series_equal(skew, grouped[col].skew(), check_names=False)
+        tm.assert_series_equal(kurt, grouped[col].apply(pd.Series.kurt), check_names=False)
+
+
+def test_empty_and_single_value_groups_have_no_spread():
+    profile = compute_profile(_data(), ['Fertility Rate'], by='country').xs('Fertility Rate', level='column')
+
+    assert profile.loc['Monaco', 'count'] == 0 and profile.loc['Malta', 'count'] == 1
+    assert profile.loc[['Malta', 'Monaco'], ['var', 'std']].isna().all().all()
+    assert profile.loc['Malta', 'mean'] == profile.loc['Malta', 'median'] == 1.5
+
+
+def test_ungrouped_profile_matches_describe():
+    data = _data()
+    profile = compute_profile(data)
+    describe = data[['Population', 'Fertility Rate']].describe().T
+
+    for name, expected in [('count', 'count'), ('mean', 'mean'), ('std', 'std'), ('q1', '25%'), ('q3', '75%')]:
+        tm.assert_series_equal(profile[name], describe[expected], check_names=False, check_dtype=False)
+    tm.assert_series_equal(profile['mode'], data[['Population', 'Fertility Rate']].mode().iloc[0], check_names=False)
+
+
+def test_profile_is_recomputed_when_the_dataset_changes(tmp_path):
+    csv_path = str(tmp_path / 'dataset_01.csv')
+    write_dataset(_data(), csv_path, export_csv=False)
+    first = load_profile(csv_path)
+    files = [f for f in os.listdir(tmp_path) if '.profile' in f]
+    assert len(files) == 1
+    # Read back from disk while the dataset is unchanged
+    tm.assert_frame_equal(load_profile(csv_path), first)
+
+    changed = _data(seed=1)
+    write_dataset(changed, csv_path, export_csv=False)
+    second = load_profile(csv_path)
+
+    assert [f for f in os.listdir(tmp_path) if '.profile' in f] != files
+    assert len([f for f in os.listdir(tmp_path) if '.profile' in f]) == 1
+    tm.assert_frame_equal(second, compute_profile(changed))
@@ -0,0 +1,49 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+
+import reference_data
+from data_aggregation import aggregate_data
+from reference_data import COUNTRY_REFERENCE_FILE, attach_regions, load_country_reference
+
+HERE = os.path.dirname(__file__)
+DATASET = os.path.join(HERE, '..', 'processed', 'preprocessed_data.csv')
+REFERENCE = os.path.join(HERE, COUNTRY_REFERENCE_FILE)
+
+
+def _old_regions(data):
+    """Region assignment as the hard-coded mapping did it: a plain map, NaN for unknown countries."""
+    mapping = load_country_reference(REFERENCE)['region'].astype(str).to_dict()
+    return data['country'].astype(str).map(mapping)
+
+
+def test_regions_match_the_old_mapping():
+    data = pd.read_csv(DATASET)
+    data = pd.concat([data, data.iloc[:3].assign(country='Atlantis')], ignore_index=True)
+    expected = _old_regions(data)
+    regions = attach_regions(data.copy(), REFERENCE)['Region']
+    tm.assert_series_equal(regions.astype(object).where(regions.notna(), np.nan), expected.rename('Region'), check_dtype=False)
+
+
+def test_aggregates_match_the_old_groupby(monkeypatch):
+    # aggregate_data reads the reference table relative to scripts/, as main.py runs it
+    monkeypatch.chdir(HERE)
+    data = pd.read_csv(DATASET)
+    sums = {'Urban Population'}
+    spec = {col: 'sum' if col in sums else 'mean' for col in data.columns
+            if col not in ('country', 'Year', 'DataType') and pd.api.types.is_numeric_dtype(data[col])}
+    old = data.assign(Region=_old_regions(data)).groupby(['Region', 'Year', 'DataType']).agg(spec).reset_index()
+
+    new = aggregate_data(data.copy())
+    new['Region'] = new['Region'].astype(str)
+    tm.assert_frame_equal(new[old.columns], old, check_dtype=False)
+
+
+def test_unmatched_countries_reported_once(capsys, monkeypatch):
+    monkeypatch.setattr(reference_data, '_reported_unmatched', set())
+    data = pd.DataFrame({'country': ['Albania', 'Atlantis']})
+    for _ in range(3):
+        attach_regions(data.copy(), REFERENCE)
+    assert capsys.readouterr().out.count('Atlantis') == 1
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+import pytest
+
+import rolling_windows
+from rolling_windows import grouped_rolling
+
+
+def _data(seed=0):
+    rng = np.random.default_rng(seed)
+    # Countries interleaved and of different lengths, with missing values and large offsets
+    countries = rng.choice(['Albania', 'Croatia', 'Malta'], size=90, p=[0.5, 0.3, 0.2])
+    data = pd.DataFrame({'country': countries, 'Population': 1e8 + rng.normal(0, 1e4, 90),
+                         'Fertility Rate': rng.normal(2, 0.5, 90)}, index=rng.permutation(90) + 100)
+    data.loc[data.index[rng.random(90) < 0.15], 'Fertility Rate'] = np.nan
+    return data
+
+
+def _expected(data, col, window, stat, min_periods=1, center=False):
+    grouped = data.groupby('country', sort=False)[col]
+    if stat == 'ewma':
+        expected = grouped.ewm(span=window, min_periods=min_periods).mean()
+    else:
+        expected = getattr(grouped.rolling(window, min_periods=min_periods, center=center), stat)()
+    return expected.droplevel(0).reindex(data.index)
+
+
+@pytest.mark.parametrize('window', [1, 3, 4, 20])
+@pytest.mark.parametrize('center', [False, True])
+def test_window_stats_match_pandas(window, center):
+    data = _data()
+    min_periods = min(2, window)
+    result = grouped_rolling(data, ['Population', 'Fertility Rate'], [window], stats=('mean', 'sum', 'std'),
+                             min_periods=min_periods, center=center)
+
+    for col in ['Population', 'Fertility Rate']:
+        for stat in ['mean', 'sum', 'std']:
+            tm.assert_series_equal(result[f'{col}_{stat}_{window}'], _expected(data, col, window, stat, min_periods, center),
+                                   check_names=False, rtol=1e-7)
+
+
+def test_direct_and_prefix_sums_agree(monkeypatch):
+    data = _data()
+    direct = grouped_rolling(data, ['Population', 'Fertility Rate'], [5, 8], stats=('mean', 'sum', 'std'))
+    monkeypatch.setattr(rolling_windows, 'DIRECT_WINDOW_LIMIT', 0)
+    prefix = grouped_rolling(data, ['Population', 'Fertility Rate'], [5, 8], stats=('mean', 'sum', 'std'))
+
+    tm.assert_frame_equal(direct, prefix, rtol=1e-7)
+
+
+@pytest.mark.parametrize('min_periods', [1, 3])
+def test_ewma_matches_pandas(min_periods):
+    data = _data()
+    result = grouped_rolling(data, ['Fertility Rate'], [3, 10], stats=('ewma', 'mean'), min_periods=min_periods)
+
+    for window in [3, 10]:
+        tm.assert_series_equal(result[f'Fertility Rate_ewma_{window}'],
+                               _expected(data, 'Fertility Rate', window, 'ewma', min_periods), check_names=False)
+
+
+def test_windows_reset_at_country_boundaries():
+    data = pd.DataFrame({'country': ['Albania'] * 3 + ['Croatia'] * 3, 'Population': [1.0, 2, 3, 100, 200, 300]})
+    result = grouped_rolling(data, ['Population'], [3], stats=('sum',), center=True)
+
+    # Centered windows at a country's first and last rows hold only that country's values
+    assert result['Population_sum_3'].tolist() == [3, 6, 5, 300, 600, 500]
+    tm.assert_index_equal(result.index, data.index)
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+import pytest
+from scipy.spatial.distance import cdist
+from sklearn.neighbors import BallTree
+
+from similar_countries import build_index, load_or_build_index, similar_countries, update_index
+
+FEATURES = ['a', 'b', 'c']
+
+
+def _data(countries=20, years=(2000, 2010, 2020), seed=0):
+    rng = np.random.default_rng(seed)
+    rows = pd.MultiIndex.from_product([[f'country {i:02d}' for i in range(countries)], years], names=['country', 'Year'])
+    data = pd.DataFrame(rng.normal(size=(len(rows), len(FEATURES))) * [1, 100, 0.01], index=rows, columns=FEATURES)
+    return data.reset_index()
+
+
+def _expected(data, index, country, year, metric, k, **kwargs):
+    rows = data[data['Year'] == year].sort_values('country')
+    vectors = (rows[FEATURES].to_numpy() - index['mean']) / index['std']
+    distances = cdist(vectors[rows['country'].to_numpy() == country], vectors, metric, **kwargs)[0]
+    frame = pd.DataFrame({'country': rows['country'].to_numpy(), 'distance': distances})
+    frame = frame[frame['country'] != country].sort_values('distance', kind='stable')
+    return frame.head(k).reset_index(drop=True)
+
+
+@pytest.mark.parametrize('metric, scipy_metric, kwargs', [
+    ('euclidean', 'euclidean', {}), ('manhattan', 'cityblock', {}), ('chebyshev', 'chebyshev', {}),
+    ('minkowski', 'minkowski', {'p': 3}), ('canberra', 'canberra', {}),
+])
+def test_queries_match_brute_force(metric, scipy_metric, kwargs):
+    data = _data()
+    index = build_index(data, FEATURES)
+    result = similar_countries(index, 'country 03', 2010, k=5, metric=metric, **kwargs)
+    expected = _expected(data, index, 'country 03', 2010, scipy_metric, 5, **kwargs)
+    tm.assert_frame_equal(result, expected, check_exact=False, rtol=1e-10)
+    # The KD-tree answer matches a ball tree over the same vectors
+    if metric in ('euclidean', 'manhattan', 'chebyshev'):
+        entry = index['years'][2010]
+        distances, positions = BallTree(entry['vectors'], metric=metric).query(entry['vectors'][[3]], k=6)
+        np.testing.assert_allclose(result['distance'], distances[0][1:])
+        assert result['country'].tolist() == entry['countries'][positions[0][1:]].tolist()
+
+
+def test_approximate_within_bound():
+    data = _data(countries=200)
+    index = build_index(data, FEATURES)
+    exact = similar_countries(index, 'country 10', 2020, k=10)
+    approximate = similar_countries(index, 'country 10', 2020, k=10, approximate=True, eps=0.5)
+    assert (approximate['distance'] <= 1.5 * exact['distance'].iloc[-1] + 1e-12).all()
+
+
+@pytest.mark.parametrize('k', [0, 1, 3, 50])
+def test_k_is_clamped(k):
+    index = build_index(_data(countries=4), FEATURES)
+    for metric in ('euclidean', 'canberra'):
+        result = similar_countries(index, 'country 01', 2000, k=k, metric=metric)
+        assert len(result) == min(k, 3)
+        assert 'country 01' not in result['country'].tolist()
+
+
+def test_year_with_one_country():
+    data = pd.concat([_data(), _data(countries=1, years=[2030])], ignore_index=True)
+    index = build_index(data, FEATURES)
+    for metric in ('euclidean', 'canberra'):
+        assert similar_countries(index, 'country 00', 2030, k=5, metric=metric).empty
+
+
+def test_update_rebuilds_only_changed_years():
+    data = _data()
+    index = build_index(data, FEATURES)
+    mean, std, tree_2000 = index['mean'].copy(), index['std'].copy(), index['years'][2000]['trees']['kd_tree']
+
+    changed = data.copy()
+    changed.loc[changed['Year'] == 2010, 'a'] += 1
+    added = pd.concat([changed, _data(years=[2030], seed=1)], ignore_index=True)
+    index, rebuilt = update_index(index, added)
+
+    assert sorted(rebuilt) == [2010, 2030]
+    assert index['years'][2000]['trees']['kd_tree'] is tree_2000
+    # New years are placed on the scale fixed at build time
+    np.testing.assert_array_equal(index['mean'], mean)
+    np.testing.assert_array_equal(index['std'], std)
+    rows = added[added['Year'] == 2030].sort_values('country')
+    np.testing.assert_allclose(index['years'][2030]['vectors'], (rows[FEATURES].to_numpy() - mean) / std)
+
+
+def test_persisted_index_is_reused_and_updated(tmp_path):
+    path = str(tmp_path / 'index.joblib')
+    data = _data()
+    first = load_or_build_index(data, path, features=FEATURES)
+    assert set(first['years']) == {2000, 2010, 2020}
+    assert set(load_or_build_index(pd.concat([data, _data(years=[2030])]), path, features=FEATURES)['years']) == {2000, 2010, 2020, 2030}
@@ -0,0 +1,87 @@
+import importlib
+import sys
+import textwrap
+
+import pandas as pd
+import pytest
+
+import stage_cache
+from stage_cache import code_fingerprint, run_stage, run_directory_stage, stage_was_cached
+
+
+@pytest.fixture
+def modules(tmp_path, monkeypatch):
+    """Write a stage module that calls a helper module, importable from tmp_path."""
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(stage_cache, 'CACHE_DIR', str(tmp_path / 'cache'))
+
+    def write(helper_factor):
+        (tmp_path / 'cache_helper.py').write_text(textwrap.dedent(f"""
+            FACTOR = {helper_factor}
+
+            def scale(data):
+                return data * FACTOR
+        """))
+        (tmp_path / 'cache_stage.py').write_text(textwrap.dedent("""
+            from cache_helper import scale
+
+            def stage(data):
+                return scale(data)
+        """))
+        importlib.invalidate_caches()
+        for name in ('cache_helper', 'cache_stage'):
+            sys.modules.pop(name, None)
+        return importlib.import_module('cache_stage')
+
+    yield write
+    for name in ('cache_helper', 'cache_stage'):
+        sys.modules.pop(name, None)
+
+
+def test_helper_changes_change_the_code_fingerprint(modules):
+    first = code_fingerprint(modules(2).stage)
+    assert code_fingerprint(modules(2).stage) == first
+    assert code_fingerprint(modules(3).stage) != first
+
+
+def test_library_modules_are_not_hashed():
+    assert code_fingerprint(pd.DataFrame) == code_fingerprint(pd.Series) == code_fingerprint(len)
+
+
+def test_run_stage_recomputes_when_a_helper_changes(modules):
+    data = pd.DataFrame({'x': [1, 2, 3]})
+    assert run_stage('scaled', modules(2).stage, data)['x'].tolist() == [2, 4, 6]
+    run_stage('scaled', modules(2).stage, data)
+    assert stage_was_cached('scaled')
+    assert run_stage('scaled', modules(3).stage, data)['x'].tolist() == [3, 6, 9]
+    assert not stage_was_cached('scaled')
+
+
+def test_run_stage_recomputes_when_a_listed_file_changes(modules, tmp_path):
+    reference = tmp_path / 'reference.csv'
+    reference.write_text('a\n1\n')
+    data = pd.DataFrame({'x': [1]})
+    stage = modules(2).stage
+    run_stage('with_file', stage, data, files=[str(reference)])
+    run_stage('with_file', stage, data, files=[str(reference)])
+    assert stage_was_cached('with_file')
+    reference.write_text('a\n2\n')
+    run_stage('with_file', stage, data, files=[str(reference)])
+    assert not stage_was_cached('with_file')
+
+
+def test_directory_stage_is_rebuilt_only_when_its_key_changes(modules, tmp_path):
+    calls = []
+
+    def write_files(data, output_dir):
+        calls.append(len(data))
+        (tmp_path / 'out').mkdir()
+        data.to_csv(tmp_path / 'out' / 'data.csv')
+
+    output_dir = str(tmp_path / 'out')
+    data = pd.DataFrame({'x': [1, 2]})
+    run_directory_stage('files', write_files, data, output_dir=output_dir)
+    run_directory_stage('files', write_files, data, output_dir=output_dir)
+    assert calls == [2] and stage_was_cached('files')
+    run_directory_stage('files', write_files, pd.DataFrame({'x': [1, 2, 3]}), output_dir=output_dir)
+    assert calls == [2, 3] and not stage_was_cached('files')
@@ -0,0 +1,60 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+import pytest
+
+import storage
+from storage import binary_path, dataset_exists, read_dataset, write_dataset
+
+
+def _data():
+    return pd.DataFrame({'country': ['Albania', 'Croatia'], 'Year': [2020, 2020], 'Population': [2_800_000, 4_000_000]})
+
+
+def test_csv_is_written_by_default(tmp_path):
+    csv_path = str(tmp_path / 'dataset_01.csv')
+    write_dataset(_data(), csv_path)
+    assert os.path.exists(csv_path) and os.path.exists(binary_path(csv_path))
+    tm.assert_frame_equal(pd.read_csv(csv_path), _data())
+
+
+def test_csv_export_can_be_turned_off(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, 'EXPORT_CSV', False)
+    csv_path = str(tmp_path / 'dataset_01.csv')
+    write_dataset(_data(), csv_path)
+    assert not os.path.exists(csv_path)
+    assert dataset_exists(csv_path)
+    tm.assert_frame_equal(read_dataset(csv_path, columns=['Year']), _data()[['Year']])
+
+
+def test_missing_csv_copy_counts_as_missing(tmp_path):
+    csv_path = str(tmp_path / 'dataset_01.csv')
+    write_dataset(_data(), csv_path)
+    os.remove(csv_path)
+    assert not dataset_exists(csv_path)
+
+
+def test_missing_dataset_says_to_run_main(tmp_path):
+    with pytest.raises(FileNotFoundError, match='run main.py first'):
+        read_dataset(str(tmp_path / 'dataset_01.csv'))
+
+
+def test_aggregated_means_round_trip(tmp_path):
+    # Regional means, as written by the aggregation stages: integer columns holding fractions
+    data = pd.DataFrame({'Region': ['Europe', 'Asia'], 'Year': [2020, 2020], 'Population': [4357739.7069, 1.5e7],
+                         'Rank': [110.034, 12.0], 'Density (P/Km²)': [85.25, 140.0]})
+    csv_path = str(tmp_path / 'regional_migration_forecast.csv')
+    write_dataset(data, csv_path)
+
+    for result in (read_dataset(csv_path), pd.read_csv(csv_path)):
+        for col in ['Population', 'Rank', 'Density (P/Km²)']:
+            np.testing.assert_array_equal(result[col].to_numpy(), data[col].to_numpy())
+    assert read_dataset(csv_path)['Year'].dtype == 'int64'
+
+
+def test_whole_floats_become_integers(tmp_path):
+    csv_path = str(tmp_path / 'dataset_01.csv')
+    write_dataset(_data().astype({'Population': float}), csv_path)
+    assert read_dataset(csv_path)['Population'].dtype == 'int64'
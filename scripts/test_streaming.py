@@ -0,0 +1,55 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import streaming
+from streaming import _global_medians, stream_preprocess
+
+FILL_COLUMNS = ['Migrants (net)', 'Median Age', 'Fertility Rate', 'Urban  Pop %', 'Urban Population']
+
+
+def _write_partitions(directory, frames):
+    paths = []
+    for country, frame in frames.items():
+        path = os.path.join(directory, f"country={country}", 'part.parquet')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        frame.to_parquet(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def _country_frame(country, rng, rows=400, missing=0.1):
+    frame = pd.DataFrame({'country': country, 'Year': np.arange(rows), 'DataType': 'Historical',
+                          'Population': rng.integers(1000, 10 ** 6, rows)})
+    for col in FILL_COLUMNS:
+        # Rounded values give many ties, which the refinement has to handle
+        values = np.round(rng.normal(size=rows) * 10, 1)
+        values[rng.random(rows) < missing] = np.nan
+        frame[col] = values
+    return frame
+
+
+@pytest.mark.parametrize('bins, max_values', [(4096, 100_000), (4, 10), (2, 1)])
+def test_global_medians_match_the_in_memory_median(tmp_path, monkeypatch, bins, max_values):
+    # Tiny bins and exact-selection limits force several refinement passes and the distinct-value path
+    monkeypatch.setattr(streaming._select_rank, '__defaults__', (bins, max_values))
+    rng = np.random.default_rng(0)
+    frames = {name: _country_frame(name, rng, rows=int(rng.integers(1, 300))) for name in 'ABCDEFG'}
+    frames['H'] = _country_frame('H', rng, missing=1.0)
+    paths = _write_partitions(tmp_path, frames)
+    expected = pd.concat(frames.values())[FILL_COLUMNS].median()
+    pd.testing.assert_series_equal(_global_medians(paths), expected, check_names=False)
+
+
+def test_stream_preprocess_drops_partitions_of_countries_no_longer_in_the_input(tmp_path):
+    rng = np.random.default_rng(1)
+    output_dir = str(tmp_path / 'preprocessed')
+    first = _write_partitions(tmp_path / 'run1', {name: _country_frame(name, rng, rows=20) for name in 'ABC'})
+    stream_preprocess(first, output_dir)
+    second = _write_partitions(tmp_path / 'run2', {name: _country_frame(name, rng, rows=20) for name in 'AB'})
+    outputs = stream_preprocess(second, output_dir)
+    assert sorted(os.listdir(output_dir)) == ['country=A', 'country=B']
+    assert all(os.path.exists(path) for path in outputs)
+    assert not os.path.exists(output_dir + '.building')
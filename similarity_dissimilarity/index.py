@@ -2,9 +2,18 @@ import pandas as pd
 from scipy.spatial.distance import euclidean, minkowski
 from sklearn.metrics import jaccard_score
 import numpy as np
+import os
+import sys
 
+sys.path.append('../scripts')
+from storage import read_dataset
+from binary_vectors import pack_bits, smc_pair, jaccard_pair
+from distance_engine import country_vectors, pairwise_matrix, nearest_pairs
+from similar_countries import FEATURES, load_or_build_index, similar_countries
 
-data = pd.read_csv('../data/dataset_05.csv')
+
+features = ['Population', 'Median Age', 'Annual_Population_Growth', 'Migrants (net)']
+data = read_dataset('../data/dataset_05.csv', columns=features + ['country', 'Year'])
 
 # Eucledian
 def euclidean_distance(point1, point2):
@@ -16,24 +25,16 @@ def minkowski_distance(point1, point2, p):
     return minkowski([point1], [point2], p)
 
 
-# SMC Function
+# SMC Function (flags bit-packed 64 per word and compared with popcount)
 def simple_matching_coefficient(data1, data2):
-    binary_data1 = (data1 > 0).astype(int)
-    binary_data2 = (data2 > 0).astype(int)
-
-    matches = sum(binary_data1 == binary_data2)
-    total = len(data1)
-    return matches / total
+    (binary_data1, n_flags), (binary_data2, _) = pack_bits(data1), pack_bits(data2)
+    return smc_pair(binary_data1, binary_data2, n_flags)
 
 
 # Jaccard Index Function
 def jaccard_index(data1, data2):
-    binary_data1 = (data1 > 0).astype(int)
-    binary_data2 = (data2 > 0).astype(int)
-
-    intersection = sum((binary_data1 & binary_data2))
-    union = sum((binary_data1 | binary_data2))
-    return intersection / union if union != 0 else 0
+    (binary_data1, _), (binary_data2, _) = pack_bits(data1), pack_bits(data2)
+    return jaccard_pair(binary_data1, binary_data2)
 
 
 
@@ -61,3 +62,25 @@ print('Jaccard Dissimilarity for Annual_Population_Growth and Migrants (net): '
 
 print('SMC for Annual_Population_Growth and Migrants (net): ' + str(smc))
 
+
+# Country-to-country comparison across all features, one vector per country
+results_dir = "./results"
+os.makedirs(results_dir, exist_ok=True)
+# Distances on z-scored features; SMC and Jaccard on the signs of the raw features, as above
+countries = country_vectors(data, features)
+raw_countries = country_vectors(data, features, standardize=False)
+
+for name, metric, params, similarity in [('Euclidean Distance', 'euclidean', {}, False),
+                                         ('Minkowski Distance (p=3)', 'minkowski', {'p': 3}, False),
+                                         ('SMC', 'smc', {}, True),
+                                         ('Jaccard Index', 'jaccard', {}, True)]:
+    matrix = pairwise_matrix(raw_countries if similarity else countries, metric=metric, **params)
+    matrix.to_csv(os.path.join(results_dir, f"country_{metric}.csv"))
+    print(f"\nMost similar countries by {name}:")
+    print(nearest_pairs(matrix, 5, similarity=similarity).to_string(index=False))
+
+
+# Nearest countries of one country-year from the persisted kNN index (rebuilt only for new years)
+index = load_or_build_index(read_dataset('../data/dataset_05.csv', columns=FEATURES + ['country', 'Year', 'DataType']))
+print("\nCountries most similar to Albania in 2020:")
+print(similar_countries(index, 'Albania', 2020, k=5).to_string(index=False))
@@ -1,62 +1,65 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
+import sys
 import pandas as pd
 from scipy.stats import skew
 
+sys.path.append('../scripts')
+from storage import read_dataset
+from plot_rendering import figure, figure_path, draw_histogram, render_figures
+from profiling import load_profile
 
+results_dir = "./results"
 
 
-def calculate_skewness(column, data):
+
+
+def calculate_skewness(column, data, profile=None):
+    # Precomputed profiles hold the same (biased) skewness as scipy's skew
+    if profile is not None:
+        return profile.loc[column, 'skewness']
     return skew(data[column].dropna())
 
 
 
 
 # Function to plot distributions for the specified columns
-def plot_distributions(columns, data):
+def plot_distributions(columns, data, profile=None, output_dir=results_dir):
+    figures = []
     for col in columns:
-        plt.figure(figsize=(10, 5))
-        sns.histplot(data[col].dropna(), kde=True, bins=30, color="blue")
-        plt.title(f"Distribution of {col} (Skewness: {skewness_values[col]:.2f})", fontsize=14)
-        plt.xlabel(col, fontsize=12)
-        plt.ylabel("Frequency", fontsize=12)
-        plt.grid(axis='y', linestyle='--', alpha=0.7)
-        plt.show()
+        figures.append(figure(figure_path(output_dir, f"distribution {col}"), draw_histogram, data[col].dropna(),
+                              f"Distribution of {col} (Skewness: {calculate_skewness(col, data, profile):.2f})", col))
+    return render_figures(figures)
 
 
 
 # Function to calculate and annotate mean, median, and mode
-def plot_distributions_with_stats(columns, data):
+def plot_distributions_with_stats(columns, data, profile, output_dir=results_dir):
+    figures = []
     for col in columns:
-        skewness = calculate_skewness(col, data)
-
-        plt.figure(figsize=(10, 5))
+        skewness = calculate_skewness(col, data, profile)
         column_data = data[col].dropna()
         
-        # Calculate statistics
-        mean_value = column_data.mean()
-        median_value = column_data.median()
-        mode_value = column_data.mode()[0] if not column_data.mode().empty else None
+        # Statistics come from the dataset's precomputed profile
+        mean_value = profile.loc[col, 'mean']
+        median_value = profile.loc[col, 'median']
+        mode_value = profile.loc[col, 'mode'] if pd.notna(profile.loc[col, 'mode']) else None
         
-        # Plot histogram
-        sns.histplot(column_data, kde=True, bins=30, color="blue")
-        plt.axvline(mean_value, color='red', linestyle='--', label=f'Mean: {mean_value:.2f}')
-        plt.axvline(median_value, color='green', linestyle='--', label=f'Median: {median_value:.2f}')
+        lines = [(mean_value, 'red', f'Mean: {mean_value:.2f}'), (median_value, 'green', f'Median: {median_value:.2f}')]
         if mode_value is not None:
-            plt.axvline(mode_value, color='purple', linestyle='--', label=f'Mode: {mode_value:.2f}')
+            lines.append((mode_value, 'purple', f'Mode: {mode_value:.2f}'))
         
-        # Annotate plot
-        plt.title(f"Distribution of {col} (Skewness: {skewness:.2f})", fontsize=14)
-        plt.xlabel(col, fontsize=12)
-        plt.ylabel("Frequency", fontsize=12)
-        plt.legend()
-        plt.grid(axis='y', linestyle='--', alpha=0.7)
-        plt.show()
+        # Histogram with KDE, annotated with the statistics
+        figures.append(figure(figure_path(output_dir, f"distribution {col}"), draw_histogram, column_data,
+                              f"Distribution of {col} (Skewness: {skewness:.2f})", col, lines=lines))
+    # Figures are written headless, in parallel, instead of blocking on plt.show()
+    return render_figures(figures)
 
 
 # Columns to visualize
 columns_to_check = ["Annual_Population_Growth", "Migration_Rate", "Density (P/Km²)", "Fertility Rate", "Median Age", "Yearly  Change"]
 
 
-data = pd.read_csv('../data/dataset_05.csv')
-plot_distributions_with_stats(columns_to_check, data)
+if __name__ == "__main__":
+    data = read_dataset('../data/dataset_05.csv', columns=columns_to_check)
+    profile = load_profile('../data/dataset_05.csv', columns=columns_to_check)
+    plot_distributions_with_stats(columns_to_check, data, profile)
+    print(f"Distribution plots saved in '{results_dir}'")
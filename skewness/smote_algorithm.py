@@ -1,15 +1,21 @@
 import numpy as np
 import pandas as pd
-from imblearn.over_sampling import SMOTE
-import matplotlib.pyplot as plt
-import seaborn as sns
+import sys
 
-# Read dataset
-data = pd.read_csv('../data/dataset_05.csv')
+sys.path.append('../scripts')
+from storage import read_dataset
+from profiling import load_profile
+from oversampling import grouped_smote_resample
+from plot_rendering import figure, panel_figure, figure_path, draw_histogram, draw_dots, draw_category_dots, render_figures
+
+results_dir = "./results"
 
 # Columns to analyze
 columns_to_check = ["Annual_Population_Growth", "Migration_Rate", "Density (P/Km²)", "Fertility Rate", "Median Age", "Yearly  Change"]
 
+# Read dataset (DataType keeps historical and forecasted rows apart when resampling)
+data = read_dataset('../data/dataset_05.csv', columns=columns_to_check + ['DataType'])
+
 # Ensure the columns exist in the dataset
 missing_columns = [col for col in columns_to_check if col not in data.columns]
 if missing_columns:
@@ -21,11 +27,12 @@ else:
     # Handle missing values
     filtered_data = filtered_data.fillna(filtered_data.mean())
     
-    # Calculate Range, Variance, Mode, and Median
-    range_values = filtered_data.max() - filtered_data.min()
-    variance_values = filtered_data.var()
-    mode_values = filtered_data.mode().iloc[0]  # Getting the first mode
-    median_values = filtered_data.median()
+    # Range, Variance, Mode, and Median from the dataset's precomputed profile
+    profile = load_profile('../data/dataset_05.csv', columns=columns_to_check).reindex(columns_to_check).rename_axis(None)
+    range_values = profile['range'].rename(None)
+    variance_values = profile['var'].rename(None)
+    mode_values = profile['mode'].rename(None)  # The first (smallest) mode
+    median_values = profile['median'].rename(None)
 
     print("\nRange of Columns:")
     print(range_values)
@@ -45,75 +52,40 @@ else:
     filtered_data['Growth_Category'] = pd.cut(filtered_data['Annual_Population_Growth'], bins=bins, labels=labels)
 
     # SMOTE works on categorical target
-    X = filtered_data.drop(columns=['Annual_Population_Growth', 'Growth_Category'])
-    y = filtered_data['Growth_Category']
-    
-    # Apply SMOTE
-    smote = SMOTE(random_state=42)
-    X_resampled, y_resampled = smote.fit_resample(X, y)
+    features = [col for col in columns_to_check if col != 'Annual_Population_Growth']
+    filtered_data['DataType'] = data['DataType']
 
-    # Convert resampled data back to DataFrame
-    resampled_data = pd.DataFrame(X_resampled, columns=X.columns)
-    resampled_data['Growth_Category'] = y_resampled
+    # Apply SMOTE within each DataType, so forecasted rows are never interpolated with historical ones
+    resampled_data = grouped_smote_resample(filtered_data, features, 'Growth_Category', 'DataType')
 
-    # Plot histograms and dot plots separately for "Before SMOTE" and "After SMOTE"
+    # Histograms and dot plots for "Before SMOTE" and "After SMOTE", one figure per column
     def plot_hist_and_dots(columns, original_data, resampled_data):
+        figures = []
         for col in columns:
             if col in original_data.columns and col in resampled_data.columns:
-                plt.figure(figsize=(12, 12))
-
-                # Histogram - Before SMOTE
-                plt.subplot(2, 2, 1)
-                sns.histplot(original_data[col].dropna(), kde=True, bins=30, color="blue", label="Before SMOTE")
-                plt.title(f"Before SMOTE: {col} (Skewness: {original_data[col].skew():.2f})", fontsize=12)
-                plt.xlabel(col, fontsize=10)
-                plt.ylabel("Frequency", fontsize=10)
-                plt.grid(axis='y', linestyle='--', alpha=0.7)
-
-                # Histogram - After SMOTE
-                plt.subplot(2, 2, 2)
-                sns.histplot(resampled_data[col].dropna(), kde=True, bins=30, color="green", label="After SMOTE")
-                plt.title(f"After SMOTE: {col} (Skewness: {resampled_data[col].skew():.2f})", fontsize=12)
-                plt.xlabel(col, fontsize=10)
-                plt.ylabel("Frequency", fontsize=10)
-                plt.grid(axis='y', linestyle='--', alpha=0.7)
-
-                # Dot Plot - Before SMOTE
-                plt.subplot(2, 2, 3)
-                plt.scatter(original_data[col], np.random.normal(0, 0.02, size=len(original_data[col])),
-                            alpha=0.6, color="blue", label="Before SMOTE")
-                plt.title(f"Dot Plot - Before SMOTE: {col}", fontsize=12)
-                plt.xlabel(col, fontsize=10)
-                plt.ylabel("Density (Dots)", fontsize=10)
-                plt.grid(axis='y', linestyle='--', alpha=0.7)
-
-                # Dot Plot - After SMOTE
-                plt.subplot(2, 2, 4)
-                plt.scatter(resampled_data[col], np.random.normal(0, 0.02, size=len(resampled_data[col])),
-                            alpha=0.6, color="green", label="After SMOTE")
-                plt.title(f"Dot Plot - After SMOTE: {col}", fontsize=12)
-                plt.xlabel(col, fontsize=10)
-                plt.ylabel("Density (Dots)", fontsize=10)
-                plt.grid(axis='y', linestyle='--', alpha=0.7)
-
-                plt.tight_layout()
-                plt.show()
+                panels = [
+                    (draw_histogram, (original_data[col].dropna(), f"Before SMOTE: {col} (Skewness: {original_data[col].skew():.2f})", col),
+                     {'color': "blue"}),
+                    (draw_histogram, (resampled_data[col].dropna(), f"After SMOTE: {col} (Skewness: {resampled_data[col].skew():.2f})", col),
+                     {'color': "green"}),
+                    (draw_dots, (original_data[col], f"Dot Plot - Before SMOTE: {col}", col), {'color': "blue"}),
+                    (draw_dots, (resampled_data[col], f"Dot Plot - After SMOTE: {col}", col), {'color': "green"}),
+                ]
+                figures.append(panel_figure(figure_path(results_dir, f"smote {col}"), panels, (2, 2)))
+        return figures
 
     # Plot histograms and dot plots for each column
     print("Histograms and Dot Plots Before and After SMOTE:")
-    plot_hist_and_dots(
+    figures = plot_hist_and_dots(
         [col for col in columns_to_check if col != 'Annual_Population_Growth'],  # Exclude the target column
         filtered_data,
         resampled_data,
     )
 
     # Visualize the distribution of Growth_Category after SMOTE (Dot Plot)
-    plt.figure(figsize=(10, 5))
-    sns.scatterplot(x=resampled_data['Growth_Category'].astype(str),
-                    y=np.random.normal(0, 0.02, size=len(resampled_data['Growth_Category'])),
-                    color="purple", alpha=0.6)
-    plt.title("Distribution of Growth Category After SMOTE", fontsize=14)
-    plt.xlabel("Growth Category", fontsize=12)
-    plt.ylabel("Density (Dots)", fontsize=12)
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.show()
+    figures.append(figure(figure_path(results_dir, "growth category after smote"), draw_category_dots,
+                          resampled_data['Growth_Category'], "Distribution of Growth Category After SMOTE", "Growth Category"))
+
+    # All figures are written headless, in parallel worker processes
+    render_figures(figures)
+    print(f"SMOTE plots saved in '{results_dir}'")
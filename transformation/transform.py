@@ -1,11 +1,16 @@
+import sys
 import pandas as pd
 import numpy as np
 from transformation_functions import *
-df = pd.read_csv("../data/dataset_01.csv")
 
+sys.path.append('../scripts')
+from storage import read_dataset, write_dataset
 
-# 1. Smoothing(remove noise from data): Smooth Yearly Change attribute using moving averages.
-df['Yearly Change Smoothed(moving-averages)'] = smoothing_by_moving_averages(df['Yearly  Change'])
+df = read_dataset("../data/dataset_01.csv")
+
+
+# 1. Smoothing(remove noise from data): Smooth Yearly Change attribute using moving averages within each country.
+df['Yearly Change Smoothed(moving-averages)'] = smoothing_by_moving_averages(df['Yearly  Change'], df['country'])
 
 
 # 2. Attribute construction: Construct World Urban Population by summing urban population for each country grouped by Year.
@@ -32,6 +37,6 @@ df['Yearly Change Binned'] = binning_by_boundaries(df['Yearly  Change'], 3, ['Lo
 
 
 # Save the transformed dataset
-df.to_csv("transformed_dataset.csv", index=False)
+write_dataset(df, "transformed_dataset.csv")
 
 print("Data transformations completed and saved to 'transformed_dataset.csv'.")
\ No newline at end of file
@@ -1,9 +1,17 @@
+import sys
 import pandas as pd
 import numpy as np
 
+sys.path.append('../scripts')
+from rolling_windows import grouped_rolling
 
-def smoothing_by_moving_averages(df):
-    return df.rolling(window=3, min_periods=1).mean()
+
+def smoothing_by_moving_averages(df, groups=None, window=3):
+    # Without groups the window runs over the whole column and crosses country boundaries
+    if groups is None:
+        return df.rolling(window=window, min_periods=1).mean()
+    frame = pd.DataFrame({'value': df, 'group': groups})
+    return grouped_rolling(frame, ['value'], [window], group='group')[f'value_mean_{window}']
 
 def aggregate_urban_population(df):
     return df.groupby('Year')['Urban Population'].sum().reset_index()